@@ -212,7 +212,20 @@ class SubscriptionSettingsForm(forms.ModelForm):
     '''
     class Meta(object):
         model = Profile
-        fields = Profile.SUBSCRIPTION_FIELDS
+        fields = Profile.SUBSCRIPTION_FIELDS + ('notification_digest', )
+
+    def __init__(self, *args, **kwargs):
+        super(SubscriptionSettingsForm, self).__init__(*args, **kwargs)
+        self.fields['notification_digest'].required = False
+
+    def clean_notification_digest(self):
+        '''
+        Defaults to immediate notifications if not specified.
+        '''
+        value = self.cleaned_data.get('notification_digest')
+        if value in (None, ''):
+            return Profile.DIGEST_NONE
+        return value
 
 
 class UserForm(forms.ModelForm):
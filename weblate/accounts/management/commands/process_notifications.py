@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2014 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <http://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from django.core.management.base import BaseCommand
+from optparse import make_option
+from weblate.accounts.models import Notification
+
+
+class Command(BaseCommand):
+    help = 'sends queued notifications'
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--stats',
+            action='store_true',
+            dest='stats',
+            default=False,
+            help='Only show queue statistics'
+        ),
+    )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.stdout.write(
+                'Queued notifications: {0}'.format(
+                    Notification.objects.count()
+                )
+            )
+            return
+
+        Notification.objects.send_queued()
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+from django.conf import settings
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('accounts', '0002_auto_20140923_1543'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('email', models.CharField(max_length=254)),
+                ('language', models.CharField(max_length=10, blank=True)),
+                ('notification', models.CharField(max_length=100)),
+                ('payload', models.TextField()),
+                ('payload_hash', models.CharField(max_length=32)),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('recipient', models.ForeignKey(to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+            },
+            bases=(models.Model,),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='notification_digest',
+            field=models.IntegerField(default=0, help_text='Digests are used only if notifications are sent in background.', verbose_name='Notification digest', choices=[(0, 'Send notifications immediately'), (1, 'Hourly digest'), (2, 'Daily digest')]),
+            preserve_default=True,
+        ),
+    ]
@@ -31,16 +31,31 @@ from django.contrib.auth.models import Group, User, Permission
 from django.db.models.signals import post_syncdb
 from django.utils import translation as django_translation
 from django.template.loader import render_to_string
-from django.core.mail import EmailMultiAlternatives
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core import serializers
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Min, Q
+from django.db.models.query import QuerySet
+from django.utils import timezone
+from datetime import timedelta
+from contextlib import contextmanager
+import json
+import hashlib
+import threading
+import uuid
 
 from social.apps.django_app.default.models import UserSocialAuth
 
 from weblate.lang.models import Language
-from weblate.trans.util import get_site_url
+from weblate.trans.util import get_site_url, iterate_chunks
 from weblate.accounts.avatar import get_user_display
 import weblate
+from weblate import appsettings
 from weblate.appsettings import ANONYMOUS_USER_NAME, SITE_TITLE
 
+# Per thread state of notification_batch
+NOTIFICATION_BATCH = threading.local()
+
 
 def notify_merge_failure(subproject, error, status):
     '''
@@ -106,13 +121,23 @@ def notify_new_translation(unit, oldunit, user):
     '''
     Notify subscribed users about new translation
     '''
+    notify_new_translations([unit], {unit.id: oldunit}, user)
+
+
+def notify_new_translations(units, oldunits, user):
+    '''
+    Notify subscribed users about new translations of units in single
+    translation, oldunits is dictionary of old units indexed by id.
+    '''
+    translation = units[0].translation
     subscriptions = Profile.objects.subscribed_any_translation(
-        unit.translation.subproject.project,
-        unit.translation.language,
+        translation.subproject.project,
+        translation.language,
         user
     )
-    for subscription in subscriptions:
-        subscription.notify_any_translation(unit, oldunit)
+    with notification_batch():
+        for subscription in subscriptions:
+            subscription.notify_any_translations(units, oldunits)
 
 
 def notify_new_contributor(unit, user):
@@ -175,25 +200,40 @@ def notify_new_comment(unit, comment, user, report_source_bugs):
         )
 
 
-def send_notification_email(language, email, notification,
-                            translation_obj=None, context=None, headers=None,
-                            user=None, info=None):
+def get_notification_headers(headers=None, user=None):
     '''
-    Renders and sends notification email.
+    Returns headers for notification email.
+    '''
+    headers = dict(headers or {})
+    headers['Auto-Submitted'] = 'auto-generated'
+    headers['X-AutoGenerated'] = 'yes'
+    headers['Precedence'] = 'bulk'
+    headers['X-Mailer'] = 'Weblate {}'.format(weblate.VERSION)
+
+    # Reply to header
+    if user is not None:
+        headers['Reply-To'] = user.email
+
+    return headers
+
+
+def get_notification_recipients(email):
+    '''
+    Returns list of recipients for notification email.
+    '''
+    if email == 'ADMINS':
+        return [a[1] for a in settings.ADMINS]
+    return [email]
+
+
+def render_notification(language, notification, translation_obj=None,
+                        context=None):
+    '''
+    Renders notification, returns tuple of subject, text and html body.
     '''
     cur_language = django_translation.get_language()
-    context = context or {}
-    headers = headers or {}
+    context = dict(context or {})
     try:
-        if info is None:
-            info = translation_obj.__unicode__()
-        weblate.logger.info(
-            'sending notification %s on %s to %s',
-            notification,
-            info,
-            email
-        )
-
         # Load user language
         if language is not None:
             django_translation.activate(language)
@@ -227,39 +267,374 @@ def send_notification_email(language, email, notification,
             'mail/{}.html'.format(notification),
             context
         )
+    finally:
+        django_translation.activate(cur_language)
 
-        # Define headers
-        headers['Auto-Submitted'] = 'auto-generated'
-        headers['X-AutoGenerated'] = 'yes'
-        headers['Precedence'] = 'bulk'
-        headers['X-Mailer'] = 'Weblate {}'.format(weblate.VERSION)
+    return subject, body, html_body
 
-        # Reply to header
-        if user is not None:
-            headers['Reply-To'] = user.email
 
-        # List of recipients
-        if email == 'ADMINS':
-            emails = [a[1] for a in settings.ADMINS]
-        else:
-            emails = [email]
+def create_notification_email(subject, body, html_body, emails, headers):
+    '''
+    Creates email message with text and html part.
+    '''
+    email = EmailMultiAlternatives(
+        settings.EMAIL_SUBJECT_PREFIX + subject,
+        body,
+        to=emails,
+        headers=headers,
+    )
+    email.attach_alternative(
+        html_body,
+        'text/html'
+    )
+    return email
+
+
+def send_notification_email(language, email, notification,
+                            translation_obj=None, context=None, headers=None,
+                            user=None, info=None, recipient=None):
+    '''
+    Renders and sends notification email.
+
+    With OFFLOAD_NOTIFICATIONS the notifications for subscribed users are
+    only stored in the queue and sent later by process_notifications.
+    '''
+    if info is None:
+        info = translation_obj.__unicode__()
 
-        # Create message
-        email = EmailMultiAlternatives(
-            settings.EMAIL_SUBJECT_PREFIX + subject,
-            body,
-            to=emails,
-            headers=headers,
+    headers = get_notification_headers(headers, user)
+
+    if appsettings.OFFLOAD_NOTIFICATIONS and recipient is not None:
+        weblate.logger.info(
+            'queueing notification %s on %s to %s',
+            notification,
+            info,
+            email
         )
-        email.attach_alternative(
-            html_body,
-            'text/html'
+        Notification.objects.enqueue(
+            language, email, notification, translation_obj, context,
+            headers, recipient
         )
+        return
+
+    weblate.logger.info(
+        'sending notification %s on %s to %s',
+        notification,
+        info,
+        email
+    )
 
-        # Send it out
+    subject, body, html_body = render_notification(
+        language, notification, translation_obj, context
+    )
+
+    email = create_notification_email(
+        subject, body, html_body, get_notification_recipients(email), headers
+    )
+
+    # Send it out, batch sends it on exit
+    messages = getattr(NOTIFICATION_BATCH, 'messages', None)
+    if messages is not None:
+        messages.append(email)
+    else:
         email.send(fail_silently=False)
+
+
+@contextmanager
+def notification_batch():
+    '''
+    Context manager collecting notifications and sending or queueing all
+    of them on exit using single connection or query.
+    '''
+    if getattr(NOTIFICATION_BATCH, 'messages', None) is not None:
+        yield
+        return
+    NOTIFICATION_BATCH.messages = []
+    NOTIFICATION_BATCH.queued = []
+    try:
+        yield
+        messages = NOTIFICATION_BATCH.messages
+        queued = NOTIFICATION_BATCH.queued
     finally:
-        django_translation.activate(cur_language)
+        NOTIFICATION_BATCH.messages = None
+        NOTIFICATION_BATCH.queued = None
+    if queued:
+        Notification.objects.bulk_create(queued)
+    if messages:
+        get_connection().send_messages(messages)
+
+
+def pack_value(value):
+    '''
+    Converts value to be stored in notification queue.
+    '''
+    if isinstance(value, models.Model):
+        return {'model': serializers.serialize('python', [value])[0]}
+    elif isinstance(value, QuerySet):
+        return {
+            'queryset': value.model._meta.app_label,
+            'name': value.model._meta.object_name,
+            'pks': list(value.values_list('pk', flat=True)),
+        }
+    return {'value': value}
+
+
+def unpack_value(value):
+    '''
+    Converts value stored in notification queue back.
+    '''
+    if 'model' in value:
+        return list(
+            serializers.deserialize('python', [value['model']])
+        )[0].object
+    elif 'queryset' in value:
+        model = models.get_model(value['queryset'], value['name'])
+        return model.objects.filter(pk__in=value['pks'])
+    return value['value']
+
+
+class NotificationManager(models.Manager):
+    def enqueue(self, language, email, notification, translation_obj,
+                context, headers, recipient=None):
+        '''
+        Stores notification in the queue.
+        '''
+        payload = json.dumps(
+            {
+                'translation': pack_value(translation_obj),
+                'context': dict([
+                    (key, pack_value(value))
+                    for key, value in (context or {}).items()
+                ]),
+                'headers': headers,
+            },
+            cls=DjangoJSONEncoder,
+            sort_keys=True,
+        )
+        notification = self.model(
+            recipient=recipient,
+            email=email,
+            language=language or '',
+            notification=notification,
+            payload=payload,
+            payload_hash=hashlib.md5(payload.encode('utf-8')).hexdigest(),
+        )
+        # Batch stores it on exit
+        queued = getattr(NOTIFICATION_BATCH, 'queued', None)
+        if queued is not None:
+            queued.append(notification)
+        else:
+            notification.save(force_insert=True)
+
+    def get_ready(self, now=None):
+        '''
+        Returns list of notifications which should be sent now.
+
+        Notifications for users with digest are sent once the oldest one
+        is older than the digest interval.
+        '''
+        if now is None:
+            now = timezone.now()
+        ready = Q(
+            recipient__profile__notification_digest=Profile.DIGEST_NONE
+        )
+        unclaimed = self.unclaimed(now)
+        for digest, interval in Profile.DIGEST_INTERVALS.items():
+            recipients = unclaimed.filter(
+                recipient__profile__notification_digest=digest
+            ).values(
+                'recipient'
+            ).annotate(
+                Min('created')
+            ).filter(
+                created__min__lte=now - interval
+            ).values_list(
+                'recipient', flat=True
+            )
+            ready |= Q(recipient__in=list(recipients))
+        return unclaimed.filter(ready).select_related(
+            'recipient__profile'
+        ).order_by('id')
+
+    def unclaimed(self, now):
+        '''
+        Returns notifications not being sent by other process, claims
+        older than Notification.CLAIM_TIMEOUT are ignored as the process
+        has probably crashed.
+        '''
+        return self.filter(
+            Q(claim='') | Q(claimed__lt=now - Notification.CLAIM_TIMEOUT)
+        )
+
+    def claim_ready(self, now):
+        '''
+        Claims notifications which should be sent now and returns them.
+
+        The claim is conditional update without joins, so notifications
+        claimed meanwhile by concurrent process are skipped.
+        '''
+        token = uuid.uuid4().hex
+        ready = list(self.get_ready(now).values_list('pk', flat=True))
+        for chunk in iterate_chunks(ready):
+            self.unclaimed(now).filter(pk__in=chunk).update(
+                claim=token, claimed=now
+            )
+        return self.filter(claim=token).select_related(
+            'recipient__profile'
+        ).order_by('id')
+
+    def send_queued(self, now=None):
+        '''
+        Sends notifications which are ready using single connection.
+
+        Notifications are rendered once for each language, digests are
+        merged into single email. Each email is sent separately and only
+        sent notifications are removed from the queue, notifications which
+        can not be rendered are dropped. Notifications are claimed before
+        sending, so concurrent runs do not send them twice. Returns number
+        of sent emails.
+        '''
+        if now is None:
+            now = timezone.now()
+        notifications = list(self.claim_ready(now))
+        if not notifications:
+            return 0
+
+        rendered = {}
+        # List of (email, notification ids)
+        messages = []
+        digests = {}
+        dropped = []
+        for notification in notifications:
+            key = (
+                notification.notification,
+                notification.payload_hash,
+                notification.language
+            )
+            if key not in rendered:
+                try:
+                    rendered[key] = notification.render()
+                except Exception as error:
+                    weblate.logger.error(
+                        'failed to render notification %s: %s',
+                        notification,
+                        error
+                    )
+                    rendered[key] = None
+            if rendered[key] is None:
+                dropped.append(notification.pk)
+                continue
+            subject, body, html_body, headers = rendered[key]
+
+            profile = notification.recipient.profile
+            if profile.notification_digest != Profile.DIGEST_NONE:
+                items, pks = digests.setdefault(
+                    notification.recipient, ([], [])
+                )
+                items.append((subject, body, html_body))
+                pks.append(notification.pk)
+                continue
+
+            messages.append((
+                create_notification_email(
+                    subject, body, html_body,
+                    get_notification_recipients(notification.email),
+                    headers
+                ),
+                [notification.pk]
+            ))
+
+        for recipient, (items, pks) in digests.items():
+            try:
+                messages.append((create_digest_email(recipient, items), pks))
+            except Exception as error:
+                weblate.logger.error(
+                    'failed to render digest for %s: %s', recipient, error
+                )
+                dropped.extend(pks)
+
+        if dropped:
+            self.filter(pk__in=dropped).delete()
+
+        sent = 0
+        connection = get_connection()
+        connection.open()
+        try:
+            for message, pks in messages:
+                try:
+                    connection.send_messages([message])
+                except Exception as error:
+                    # Keep in the queue to be sent later
+                    weblate.logger.error(
+                        'failed to send notification to %s: %s',
+                        ', '.join(message.to),
+                        error
+                    )
+                    self.filter(pk__in=pks).update(claim='', claimed=None)
+                    continue
+                self.filter(pk__in=pks).delete()
+                sent += 1
+        finally:
+            connection.close()
+
+        return sent
+
+
+def create_digest_email(recipient, items):
+    '''
+    Creates single email from list of rendered notifications.
+    '''
+    subject, body, html_body = render_notification(
+        recipient.profile.language,
+        'digest',
+        context={'items': items, 'count': len(items)}
+    )
+    return create_notification_email(
+        subject, body, html_body,
+        [recipient.email],
+        get_notification_headers()
+    )
+
+
+class Notification(models.Model):
+    '''
+    Notification waiting in the queue to be sent.
+    '''
+    recipient = models.ForeignKey(User)
+    email = models.CharField(max_length=254)
+    language = models.CharField(max_length=10, blank=True)
+    notification = models.CharField(max_length=100)
+    payload = models.TextField()
+    payload_hash = models.CharField(max_length=32)
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+    claim = models.CharField(max_length=32, blank=True, db_index=True)
+    claimed = models.DateTimeField(null=True, blank=True)
+
+    objects = NotificationManager()
+
+    # Time after which claim of crashed process is ignored
+    CLAIM_TIMEOUT = timedelta(hours=1)
+
+    def __unicode__(self):
+        return u'{0} - {1}'.format(self.notification, self.email)
+
+    def render(self):
+        '''
+        Renders queued notification, returns tuple of subject, text and
+        html body and headers.
+        '''
+        payload = json.loads(self.payload)
+        context = dict([
+            (key, unpack_value(value))
+            for key, value in payload['context'].items()
+        ])
+        subject, body, html_body = render_notification(
+            self.language or None,
+            self.notification,
+            unpack_value(payload['translation']),
+            context
+        )
+        return subject, body, html_body, payload['headers']
 
 
 class VerifiedEmail(models.Model):
@@ -399,6 +774,30 @@ class Profile(models.Model):
         default=False
     )
 
+    DIGEST_NONE = 0
+    DIGEST_HOURLY = 1
+    DIGEST_DAILY = 2
+
+    DIGEST_CHOICES = (
+        (DIGEST_NONE, _('Send notifications immediately')),
+        (DIGEST_HOURLY, _('Hourly digest')),
+        (DIGEST_DAILY, _('Daily digest')),
+    )
+
+    DIGEST_INTERVALS = {
+        DIGEST_HOURLY: timedelta(hours=1),
+        DIGEST_DAILY: timedelta(days=1),
+    }
+
+    notification_digest = models.IntegerField(
+        verbose_name=_('Notification digest'),
+        choices=DIGEST_CHOICES,
+        default=DIGEST_NONE,
+        help_text=_(
+            'Digests are used only if notifications are sent in background.'
+        ),
+    )
+
     SUBSCRIPTION_FIELDS = (
         'subscribe_any_translation',
         'subscribe_new_string',
@@ -460,25 +859,42 @@ class Profile(models.Model):
             translation_obj,
             context,
             headers,
-            user=user
+            user=user,
+            recipient=self.user,
         )
 
     def notify_any_translation(self, unit, oldunit):
         '''
         Sends notification on translation.
         '''
-        if oldunit.translated:
-            template = 'changed_translation'
-        else:
-            template = 'new_translation'
-        self.notify_user(
-            template,
-            unit.translation,
-            {
-                'unit': unit,
-                'oldunit': oldunit,
-            }
-        )
+        self.notify_any_translations([unit], {unit.id: oldunit})
+
+    def notify_any_translations(self, units, oldunits):
+        '''
+        Sends notifications on translations of units in single
+        translation, access is checked only once.
+        '''
+        translation = units[0].translation
+        if not translation.has_acl(self.user):
+            return
+        for unit in units:
+            oldunit = oldunits[unit.id]
+            if oldunit.translated:
+                template = 'changed_translation'
+            else:
+                template = 'new_translation'
+            send_notification_email(
+                self.language,
+                self.user.email,
+                template,
+                translation,
+                {
+                    'unit': unit,
+                    'oldunit': oldunit,
+                },
+                {},
+                recipient=self.user,
+            )
 
     def notify_new_language(self, subproject, language, user):
         '''
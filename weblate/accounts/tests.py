@@ -30,9 +30,16 @@ from django.core import mail
 from django.conf import settings
 from django.core.management import call_command
 from django.http import HttpRequest, HttpResponseRedirect
+from django.utils import timezone
+from django.test.utils import override_settings
+from django.core.mail.backends.locmem import EmailBackend
+from datetime import timedelta
+import smtplib
+import copy
 
 from weblate.accounts.models import (
     Profile,
+    Notification,
     notify_merge_failure,
     notify_new_string,
     notify_new_suggestion,
@@ -384,9 +391,9 @@ class ProfileTest(ViewTestCase):
         self.assertRedirects(response, reverse('profile'))
 
 
-class NotificationTest(ViewTestCase):
+class NotificationBaseTest(ViewTestCase):
     def setUp(self):
-        super(NotificationTest, self).setUp()
+        super(NotificationBaseTest, self).setUp()
         self.user.email = 'noreply@weblate.org'
         self.user.save()
         profile = Profile.objects.get(user=self.user)
@@ -409,6 +416,8 @@ class NotificationTest(ViewTestCase):
             password='secondpassword'
         )
 
+
+class NotificationTest(NotificationBaseTest):
     def test_notify_merge_failure(self):
         notify_merge_failure(
             self.subproject,
@@ -546,6 +555,137 @@ class NotificationTest(ViewTestCase):
         )
 
 
+class FailingEmailBackend(EmailBackend):
+    '''
+    Email backend failing to send first message.
+    '''
+    failed = False
+
+    def send_messages(self, messages):
+        if not FailingEmailBackend.failed:
+            FailingEmailBackend.failed = True
+            raise smtplib.SMTPException('Testing failure')
+        return super(FailingEmailBackend, self).send_messages(messages)
+
+
+class NotificationQueueTest(NotificationBaseTest):
+    def setUp(self):
+        super(NotificationQueueTest, self).setUp()
+        appsettings.OFFLOAD_NOTIFICATIONS = True
+
+    def tearDown(self):
+        super(NotificationQueueTest, self).tearDown()
+        appsettings.OFFLOAD_NOTIFICATIONS = False
+
+    def assertQueued(self, count):
+        self.assertEqual(Notification.objects.count(), count)
+
+    def test_notify_new_string(self):
+        notify_new_string(self.get_translation())
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertQueued(1)
+
+        call_command('process_notifications')
+        self.assertQueued(0)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(
+            mail.outbox[0].subject,
+            '[Weblate] New string to translate in Test/Test - Czech'
+        )
+
+    def test_notify_new_translation(self):
+        unit = self.get_unit()
+        oldunit = copy.copy(unit)
+        unit.target = 'Nazdar svete!\n'
+        notify_new_translation(unit, oldunit, self.second_user())
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertQueued(1)
+
+        call_command('process_notifications')
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('Nazdar svete!', mail.outbox[0].body)
+
+    def test_digest(self):
+        profile = Profile.objects.get(user=self.user)
+        profile.notification_digest = Profile.DIGEST_HOURLY
+        profile.save()
+
+        notify_new_string(self.get_translation())
+        notify_new_contributor(self.get_unit(), self.second_user())
+        self.assertQueued(2)
+
+        # Digest is not yet due
+        self.assertEqual(Notification.objects.send_queued(), 0)
+        self.assertQueued(2)
+
+        self.assertEqual(
+            Notification.objects.send_queued(
+                timezone.now() + timedelta(hours=2)
+            ),
+            1
+        )
+        self.assertQueued(0)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(
+            mail.outbox[0].subject,
+            '[Weblate] 2 notifications from Weblate'
+        )
+        self.assertIn('New contributor', mail.outbox[0].body)
+
+    def test_invalid(self):
+        notify_new_string(self.get_translation())
+        Notification.objects.create(
+            recipient=self.user,
+            email=self.user.email,
+            notification='new_string',
+            payload='{}',
+            payload_hash='invalid',
+        )
+        self.assertQueued(2)
+
+        # Notification which can not be rendered is dropped
+        self.assertEqual(Notification.objects.send_queued(), 1)
+        self.assertQueued(0)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_claimed(self):
+        notify_new_string(self.get_translation())
+        # Claimed by concurrent process
+        Notification.objects.update(claim='other', claimed=timezone.now())
+
+        self.assertEqual(Notification.objects.send_queued(), 0)
+        self.assertQueued(1)
+        self.assertEqual(len(mail.outbox), 0)
+
+        # Claim of crashed process expires
+        self.assertEqual(
+            Notification.objects.send_queued(
+                timezone.now() + timedelta(hours=2)
+            ),
+            1
+        )
+        self.assertQueued(0)
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(
+        EMAIL_BACKEND='weblate.accounts.tests.FailingEmailBackend'
+    )
+    def test_send_failure(self):
+        FailingEmailBackend.failed = False
+        notify_new_string(self.get_translation())
+        notify_new_contributor(self.get_unit(), self.second_user())
+        self.assertQueued(2)
+
+        # Failed notification stays in the queue
+        self.assertEqual(Notification.objects.send_queued(), 1)
+        self.assertQueued(1)
+        self.assertEqual(len(mail.outbox), 1)
+
+        self.assertEqual(Notification.objects.send_queued(), 1)
+        self.assertQueued(0)
+        self.assertEqual(len(mail.outbox), 2)
+
+
 class CaptchaTest(UnitTestCase):
     def test_decode(self):
         question = '1 + 1'
@@ -57,6 +57,9 @@ MT_GOOGLE_KEY = getvalue('MT_GOOGLE_KEY', None)
 # tmserver URL
 MT_TMSERVER = getvalue('MT_TMSERVER', None)
 
+# Timeout for machine translation requests in seconds
+MT_TIMEOUT = getvalue('MT_TIMEOUT', 5)
+
 # Path where git repositories are stored, it needs to be writable
 GIT_ROOT = getvalue('GIT_ROOT', os.path.join(BASE_DIR, 'repos'))
 
@@ -78,6 +81,12 @@ ENABLE_SHARING = getvalue('ENABLE_SHARING', True)
 # Whether to run hooks in background
 BACKGROUND_HOOKS = getvalue('BACKGROUND_HOOKS', True)
 
+# Whether to propagate translations to other subprojects in background
+BACKGROUND_PROPAGATION = getvalue('BACKGROUND_PROPAGATION', False)
+
+# Whether to queue hook updates for process_updates command
+OFFLOAD_UPDATES = getvalue('OFFLOAD_UPDATES', False)
+
 # Number of nearby messages to show in each direction
 NEARBY_MESSAGES = getvalue('NEARBY_MESSAGES', 5)
 
@@ -87,9 +96,27 @@ SIMILAR_MESSAGES = getvalue('SIMILAR_MESSAGES', 5)
 # Enable lazy commits
 LAZY_COMMITS = getvalue('LAZY_COMMITS', True)
 
+# Store edits only to database and write files later
+WRITE_BEHIND = getvalue('WRITE_BEHIND', False)
+
+# Number of pending units in translation causing file write
+WRITE_BEHIND_UNITS = getvalue('WRITE_BEHIND_UNITS', 100)
+
 # Offload indexing
 OFFLOAD_INDEXING = getvalue('OFFLOAD_INDEXING', False)
 
+# Whether to queue notifications for process_notifications command
+OFFLOAD_NOTIFICATIONS = getvalue('OFFLOAD_NOTIFICATIONS', False)
+
+# Number of processes used for parsing translation files
+IMPORT_WORKERS = getvalue('IMPORT_WORKERS', 1)
+
+# Total size of translation files kept parsed in memory
+STORE_CACHE_SIZE = getvalue('STORE_CACHE_SIZE', 10 * 1024 * 1024)
+
+# Lifetime of cached translation stats rollups
+STATS_CACHE_TIMEOUT = getvalue('STATS_CACHE_TIMEOUT', 300)
+
 # Translation locking
 AUTO_LOCK = getvalue('AUTO_LOCK', True)
 AUTO_LOCK_TIME = getvalue('AUTO_LOCK_TIME', 60)
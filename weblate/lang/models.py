@@ -385,7 +385,8 @@ class Language(models.Model, PercentMixin):
             return self._percents
 
         # Get translations percents
-        result = self.translation_set.get_percents()
+        from weblate.trans.stats import get_percents
+        result = get_percents(language=self)
 
         # Update cache
         self._percents = result
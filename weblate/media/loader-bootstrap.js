@@ -1,5 +1,8 @@
 var loading = 0;
 var mt_loaded = false;
+var zen_next = null;
+var zen_waiting = false;
+var zen_save_timer = null;
 
 function inc_loading() {
     if (loading === 0) {
@@ -61,6 +64,44 @@ function text_change(e) {
 
 function process_machine_translation(data, textStatus, jqXHR) {
     dec_loading();
+    show_machine_translation(data);
+}
+
+function load_machine_translations(url) {
+    /* Results are streamed as one JSON object per line */
+    var processed = 0;
+    var process_lines = function (text) {
+        var end = text.lastIndexOf('\n') + 1;
+        if (end <= processed) {
+            return;
+        }
+        text.substring(processed, end).split('\n').forEach(function (line) {
+            if (line) {
+                show_machine_translation(JSON.parse(line));
+            }
+        });
+        processed = end;
+    };
+    inc_loading();
+    $.ajax({
+        url: url,
+        xhr: function () {
+            var xhr = $.ajaxSettings.xhr();
+            xhr.addEventListener('progress', function () {
+                process_lines(xhr.responseText);
+            });
+            return xhr;
+        },
+        success: function (data, textStatus, jqXHR) {
+            dec_loading();
+            process_lines(data);
+        },
+        error: failed_machine_translation,
+        dataType: 'text'
+    });
+}
+
+function show_machine_translation(data) {
     if (data.responseStatus == 200) {
         data.translations.forEach(function (el, idx, ar) {
             var new_row = $('<tr/>').data('quality', el.quality);
@@ -180,6 +221,130 @@ function load_table_sorting() {
     });
 }
 
+function zen_unit_rows(unit, lang, dir) {
+    var $status = $('<tr/>').attr('id', 'row-status-' + unit.checksum);
+    $status.append($('<td/>').text(unit.position));
+    $status.append($('<td/>').text(unit.context));
+    $status.append(
+        $('<td/>').append(
+            $('<span class="inline-message"/>').attr('id', 'messages-' + unit.checksum)
+        ).append(
+            $('<a class="btn btn-default btn-xs"/>').attr('href', unit.url).text(gettext('Edit'))
+        )
+    );
+
+    var $edit = $('<tr/>').attr('id', 'row-edit-' + unit.checksum);
+    var $source = $('<td class="translatetext"/>');
+    unit.source.forEach(function (el, idx, ar) {
+        $source.append($('<div/>').text(el));
+    });
+    var $form = $('<form/>');
+    $form.append($('<input type="hidden" name="checksum"/>').val(unit.checksum));
+    unit.target.forEach(function (el, idx, ar) {
+        $form.append(
+            $('<textarea class="translation-editor form-control"/>').attr('name', 'target_' + idx).attr('lang', lang).attr('dir', dir).val(el)
+        );
+    });
+    $form.append(
+        $('<label/>').append(
+            $('<input type="checkbox" name="fuzzy"/>').prop('checked', unit.fuzzy)
+        ).append(' ' + gettext('Fuzzy'))
+    );
+    $edit.append($('<td/>'));
+    $edit.append($source);
+    $edit.append($('<td class="translator"/>').append($form));
+
+    return $status.add($edit);
+}
+
+function zen_prefetch() {
+    var $loader = $('#zen-units');
+    var cursor = $loader.data('cursor');
+    zen_next = null;
+    if (! cursor) {
+        return;
+    }
+    $.getJSON($loader.attr('href'), {cursor: cursor}, function (data) {
+        zen_next = data;
+        if (zen_waiting) {
+            zen_show_next();
+        }
+    });
+}
+
+function zen_show_next() {
+    var $tbody = $('.zen tbody');
+    if (zen_next === null) {
+        zen_waiting = true;
+        $('#loading-next').show();
+        return;
+    }
+    zen_waiting = false;
+    $('#loading-next').hide();
+    zen_next.units.forEach(function (el, idx, ar) {
+        $tbody.append(zen_unit_rows(el, zen_next.lang, zen_next.dir));
+    });
+    $('#zen-units').data('cursor', zen_next.next || '');
+    if (! zen_next.next) {
+        $tbody.append(
+            $('<tr><td colspan="3" id="last-section"></td></tr>').find('td').append(
+                $('<div class="alert alert-info"/>').text(gettext('You have reached end of translating.'))
+            ).end()
+        );
+    }
+    zen_prefetch();
+}
+
+function zen_save() {
+    var $rows = $('.translation-modified');
+    var edits = [];
+    zen_save_timer = null;
+    $rows.each(function (idx) {
+        var $row = $(this);
+        edits.push({
+            checksum: $row.find('[name=checksum]').val(),
+            target: $row.find('.translation-editor').map(function () {
+                return $(this).val();
+            }).get(),
+            fuzzy: $row.find('[name=fuzzy]').prop('checked')
+        });
+    });
+    if (edits.length == 0) {
+        return;
+    }
+    $rows.removeClass('translation-modified').addClass('translation-saving');
+    $.post(
+        $('#zen-save').attr('href'),
+        {
+            payload: JSON.stringify(edits),
+            csrfmiddlewaretoken: $('input[name=csrfmiddlewaretoken]').first().val()
+        },
+        function (data) {
+            $.each(data.units, function (checksum, result) {
+                var $messages = $('#messages-' + checksum);
+                $messages.empty();
+                result.messages.forEach(function (el, idx, ar) {
+                    $messages.append($('<div/>').text(el));
+                });
+                $('#row-edit-' + checksum).removeClass('translation-saving');
+                if (result.saved) {
+                    $('#row-edit-' + checksum).addClass('translation-saved');
+                }
+            });
+        }
+    ).fail(function () {
+        $rows.removeClass('translation-saving').addClass('translation-modified');
+    });
+}
+
+function zen_editor(e) {
+    $(this).parents('tr').removeClass('translation-saved').addClass('translation-modified');
+    if (zen_save_timer !== null) {
+        window.clearTimeout(zen_save_timer);
+    }
+    zen_save_timer = window.setTimeout(zen_save, 1000);
+}
+
 $(function () {
     /* AJAX loading of tabs/pills */
     $(document).on('show.bs.tab', '[data-toggle="tab"][data-href], [data-toggle="pill"][data-href]', function (e) {
@@ -210,15 +375,7 @@ $(function () {
             return;
         }
         mt_loaded = true;
-        MACHINE_TRANSLATION_SERVICES.forEach(function (el, idx, ar) {
-            inc_loading();
-            $.ajax({
-                url: $('#js-translate').attr('href') + '?service=' + el,
-                success: process_machine_translation,
-                error: failed_machine_translation,
-                dataType: 'json'
-            });
-        });
+        load_machine_translations($('#js-translate-all').attr('href'));
     });
 
     /* Git commit tooltip */
@@ -392,4 +549,26 @@ $(function () {
 
     /* Table sorting */
     load_table_sorting();
+
+    /* Zen mode */
+    if ($('.zen').length > 0) {
+        $(window).scroll(function () {
+            if ($(window).scrollTop() >= $(document).height() - (2 * $(window).height())) {
+                if ($('#last-section').length > 0 || zen_waiting) {
+                    return;
+                }
+                zen_show_next();
+            }
+        });
+        $(document).on('change', '.zen .translation-editor', zen_editor);
+        $(document).on('change', '.zen [name=fuzzy]', zen_editor);
+
+        $(window).on('beforeunload', function () {
+            if ($('.translation-modified, .translation-saving').length > 0) {
+                return gettext('There are some unsaved changes, are you sure you want to leave?');
+            }
+        });
+
+        zen_prefetch();
+    }
 });
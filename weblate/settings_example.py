@@ -388,6 +388,9 @@ MT_GOOGLE_KEY = None
 # tmserver URL
 MT_TMSERVER = None
 
+# Timeout for machine translation requests in seconds
+MT_TIMEOUT = 5
+
 # Path where git repositories are stored, it needs to be writable
 GIT_ROOT = os.path.join(BASE_DIR, 'repos')
 
@@ -421,15 +424,34 @@ ENABLE_HOOKS = True
 # Whether to run hooks in background
 BACKGROUND_HOOKS = True
 
+# Whether to propagate translations to other subprojects in background
+BACKGROUND_PROPAGATION = False
+
+# Queue hook updates for process_updates command
+OFFLOAD_UPDATES = False
+
 # Number of nearby messages to show in each direction
 NEARBY_MESSAGES = 5
 
 # Enable lazy commits
 LAZY_COMMITS = True
 
+# Write edits to files in batches
+WRITE_BEHIND = False
+WRITE_BEHIND_UNITS = 100
+
 # Offload indexing
 OFFLOAD_INDEXING = False
 
+# Queue notifications for process_notifications command
+OFFLOAD_NOTIFICATIONS = False
+
+# Number of processes for parsing translation files
+IMPORT_WORKERS = 1
+
+# Total size of translation files kept parsed in memory
+STORE_CACHE_SIZE = 10 * 1024 * 1024
+
 # Translation locking
 AUTO_LOCK = True
 AUTO_LOCK_TIME = 60
@@ -45,13 +45,10 @@ class ProjectAdmin(admin.ModelAdmin):
         """
         Recalculates checks for selected resources.
         """
-        cnt = 0
         units = Unit.objects.filter(
             translation__subproject__project__in=queryset
         )
-        for unit in units.iterator():
-            unit.run_checks()
-            cnt += 1
+        cnt = Unit.objects.run_checks_units(units)
         self.message_user(request, "Updated checks for %d units." % cnt)
 
     def force_commit(self, request, queryset):
@@ -85,13 +82,10 @@ class SubProjectAdmin(admin.ModelAdmin):
         """
         Recalculates checks for selected resources.
         """
-        cnt = 0
         units = Unit.objects.filter(
             translation__subproject__in=queryset
         )
-        for unit in units.iterator():
-            unit.run_checks()
-            cnt += 1
+        cnt = Unit.objects.run_checks_units(units)
         self.message_user(
             request,
             "Updated checks for %d units." % cnt
@@ -30,6 +30,10 @@ from weblate import appsettings
 from weblate.accounts.avatar import HAS_LIBRAVATAR
 from weblate.accounts.forms import HAS_ICU
 from weblate.trans.util import get_configuration_errors, get_clean_env
+from weblate.trans.lockstats import get_lock_stats, LOCK_BUCKET_LABELS
+from weblate.trans.machine import MACHINE_TRANSLATION_SERVICES
+from weblate.trans.machine.pool import POOL
+from weblate.trans.machine.stats import get_machine_stats
 import weblate
 import django
 
@@ -181,12 +185,28 @@ def performance(request):
         'order-cell',
     ))
 
+    # Repository lock statistics
+    lock_stats = get_lock_stats([
+        subproject.get_full_slug()
+        for subproject in SubProject.objects.select_related('project')
+    ])
+
+    # Machine translation statistics
+    machine_stats = get_machine_stats([
+        MACHINE_TRANSLATION_SERVICES[name]
+        for name in sorted(MACHINE_TRANSLATION_SERVICES)
+    ])
+
     return render(
         request,
         "admin/performance.html",
         {
             'checks': checks,
-            'errors': get_configuration_errors()
+            'errors': get_configuration_errors(),
+            'lock_stats': lock_stats,
+            'lock_buckets': LOCK_BUCKET_LABELS,
+            'machine_stats': machine_stats,
+            'machine_pool': POOL,
         }
     )
 
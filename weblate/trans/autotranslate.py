@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2014 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <http://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+'''
+Automatic translation based on existing translations.
+'''
+
+from django.db.models import F
+from weblate.accounts.models import Profile
+from weblate.trans.models.unit import Unit
+from weblate.trans.models.changes import Change
+from weblate.trans.search import update_index_units
+from weblate.trans.memory import update_memory_units
+
+
+def get_auto_units(translation, inconsistent=False, overwrite=False):
+    '''
+    Returns units in translation to be automatically translated.
+    '''
+    if inconsistent:
+        return translation.unit_set.filter_type('inconsistent', translation)
+    elif overwrite:
+        return translation.unit_set.all()
+    return translation.unit_set.filter(translated=False)
+
+
+def get_auto_sources(translation, subproject=None):
+    '''
+    Returns translated units to be used as source for translation.
+
+    When subproject is not given, all other translations in the project
+    are used.
+    '''
+    sources = Unit.objects.filter(
+        translation__language=translation.language,
+        translated=True
+    )
+    if subproject is None:
+        return sources.filter(
+            translation__subproject__project=translation.subproject.project
+        ).exclude(
+            translation=translation
+        )
+    return sources.filter(translation__subproject=subproject)
+
+
+def auto_translate(translation, user, request=None, subproject=None,
+                   inconsistent=False, overwrite=False):
+    '''
+    Automatically translates units from other translations.
+
+    All matching translations are written to the file at once and
+    committed in single commit. Returns number of updated units.
+    '''
+    translation.commit_pending(request)
+
+    units = get_auto_units(translation, inconsistent, overwrite)
+    sources = get_auto_sources(translation, subproject)
+
+    # Map checksum to translation, first matching unit is used
+    translations = {}
+    matching = sources.filter(
+        checksum__in=units.values('checksum')
+    ).values_list(
+        'checksum', 'target', 'fuzzy'
+    )
+    for checksum, target, fuzzy in matching:
+        if checksum not in translations:
+            translations[checksum] = (target, fuzzy)
+
+    # Apply translations to units
+    changed = []
+    for unit in units.iterator():
+        if unit.checksum not in translations:
+            continue
+        target, fuzzy = translations[unit.checksum]
+        # No save if translation is same
+        if unit.fuzzy == fuzzy and unit.target == target:
+            continue
+        unit.translation = translation
+        unit.target = target
+        unit.fuzzy = fuzzy
+        changed.append(unit)
+
+    if not changed:
+        return 0
+
+    if request is not None:
+        translation.update_lock(request)
+
+    # Store all units to the file
+    updated = translation.update_units(changed, request, user)
+    if not updated:
+        return 0
+
+    # Create single change object for whole merge
+    Change.objects.create(
+        action=Change.ACTION_AUTO,
+        translation=translation,
+        user=user,
+        author=user
+    )
+
+    # Update database
+    for unit, pounit in updated:
+        unit.translated = pounit.is_translated()
+        unit.flags = pounit.get_flags()
+        unit.save(backend=True, same_content=True, same_state=True)
+
+    updated_units = [unit for unit, pounit in updated]
+    Unit.objects.run_checks_batch([
+        (unit, False, False, False) for unit in updated_units
+    ])
+    update_index_units(updated_units, [])
+    update_memory_units(translation.language.code, updated_units)
+
+    # Update stats
+    translation.update_stats()
+    translation.invalidate_cache()
+    # Users without profile (eg. anonymous) are not counted
+    Profile.objects.filter(user=user).update(
+        translated=F('translated') + len(updated)
+    )
+
+    return len(updated)
@@ -18,7 +18,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 '''
-Wrapper for Sum to work with PostgreSQL database.
+Wrappers for Sum to work with boolean fields.
 
 See also https://code.djangoproject.com/ticket/17564
 '''
@@ -51,3 +51,48 @@ class BooleanSum(Sum):
             col, source=source, is_summary=is_summary, **self.extra
         )
         query.aggregates[alias] = aggregate
+
+
+class SQLConditionalSum(BaseSQLSum):
+    '''
+    Sums field only in rows where boolean column is set.
+    '''
+    sql_template = (
+        '%(function)s(CASE WHEN %(condition)s THEN %(field)s ELSE 0 END)'
+    )
+
+    def __init__(self, col, condition, **kwargs):
+        super(SQLConditionalSum, self).__init__(col, **kwargs)
+        self.condition = condition
+
+    def as_sql(self, qn, connection):
+        '''
+        Renders condition using same table alias as summed column.
+        '''
+        return self.sql_template % {
+            'function': self.sql_function,
+            'field': '.'.join([qn(c) for c in self.col]),
+            'condition': '.'.join([qn(self.col[0]), qn(self.condition)]),
+        }, []
+
+
+class ConditionalSum(Sum):
+    '''
+    Sum of field for rows where given boolean field is set.
+    '''
+    def __init__(self, lookup, condition, **extra):
+        super(ConditionalSum, self).__init__(lookup, **extra)
+        self.condition = condition
+
+    def add_to_query(self, query, alias, col, source, is_summary):
+        '''
+        Generates query to use SQLConditionalSum class.
+        '''
+        aggregate = SQLConditionalSum(
+            col,
+            source.model._meta.get_field(self.condition).column,
+            source=source,
+            is_summary=is_summary,
+            **self.extra
+        )
+        query.aggregates[alias] = aggregate
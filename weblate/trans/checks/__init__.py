@@ -26,3 +26,15 @@ CHECKS = {}
 for path in appsettings.CHECK_LIST:
     cls = load_class(path)
     CHECKS[cls.check_id] = cls()
+
+
+def get_cache_keys(units):
+    '''
+    Returns check cache keys needed for checking units.
+    '''
+    return [
+        key
+        for unit in units if unit.translated
+        for check in CHECKS.values() if check.use_cache
+        for key in check.get_cache_keys(unit)
+    ]
@@ -18,7 +18,8 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
-from django.core.cache import cache
+from weblate.trans.checks.cache import CHECK_CACHE
+import hashlib
 import weblate
 
 
@@ -33,6 +34,8 @@ class Check(object):
     source = False
     ignore_untranslated = True
     severity = 'info'
+    # Whether check caches data computed from source string
+    use_cache = False
 
     def __init__(self):
         id_dash = self.check_id.replace('_', '-')
@@ -107,28 +110,43 @@ class Check(object):
         '''
         return weblate.get_doc_url('user/checks', self.doc_id)
 
-    def get_cache_key(self, unit, cache_slot=0):
+    def get_cache_data(self, source, unit):
+        '''
+        Returns data which cached value depends on.
+        '''
+        return source
+
+    def get_cache_key(self, source, unit):
         '''
         Generates key for a cache.
         '''
-        return 'check-%s-%d-%s-%d' % (
+        return 'check-%s-%s' % (
             self.check_id,
-            unit.translation.subproject.project.id,
-            unit.checksum,
-            cache_slot
+            hashlib.md5(
+                self.get_cache_data(source, unit).encode('utf-8')
+            ).hexdigest()
         )
 
-    def get_cache(self, unit, cache_slot=0):
+    def get_cache_keys(self, unit):
+        '''
+        Returns cache keys for all source strings of an unit.
+        '''
+        return [
+            self.get_cache_key(source, unit)
+            for source in unit.get_source_plurals()[:2]
+        ]
+
+    def get_cache(self, source, unit):
         '''
         Returns cached result.
         '''
-        return cache.get(self.get_cache_key(unit, cache_slot))
+        return CHECK_CACHE.get(self.get_cache_key(source, unit))
 
-    def set_cache(self, unit, value, cache_slot=0):
+    def set_cache(self, source, unit, value):
         '''
         Sets cache.
         '''
-        return cache.set(self.get_cache_key(unit, cache_slot), value)
+        CHECK_CACHE.set(self.get_cache_key(source, unit), value)
 
 
 class TargetCheck(Check):
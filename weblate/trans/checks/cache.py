@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2014 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <http://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+'''
+Two level cache for source string data computed by checks.
+
+Values are kept in in-process LRU cache in front of the shared cache.
+Keys are based on check and hash of the source string, so the values
+survive re-creating units and are shared between projects.
+'''
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from django.core.cache import cache
+import threading
+
+# Number of values kept in process memory
+CHECK_CACHE_SIZE = 10000
+
+# How long are values kept in shared cache
+CHECK_CACHE_TIMEOUT = 7 * 24 * 3600
+
+
+class LRUCache(object):
+    '''
+    Simple thread safe LRU cache.
+    '''
+    def __init__(self, size):
+        self.size = size
+        self.lock = threading.Lock()
+        self.data = OrderedDict()
+
+    def get(self, key):
+        '''
+        Returns cached value or None.
+        '''
+        with self.lock:
+            try:
+                value = self.data.pop(key)
+            except KeyError:
+                return None
+            self.data[key] = value
+            return value
+
+    def set(self, key, value):
+        '''
+        Stores value, evicting least recently used ones.
+        '''
+        with self.lock:
+            self.data.pop(key, None)
+            self.data[key] = value
+            while len(self.data) > self.size:
+                self.data.popitem(last=False)
+
+    def clear(self):
+        '''
+        Removes all values.
+        '''
+        with self.lock:
+            self.data.clear()
+
+    def __len__(self):
+        return len(self.data)
+
+
+class CheckCache(object):
+    '''
+    LRU cache in front of shared cache with batched access.
+
+    Within batch, keys are fetched from the shared cache at once and
+    new values are written at once when the batch is finished.
+    '''
+    def __init__(self, size=CHECK_CACHE_SIZE):
+        self.local = LRUCache(size)
+        self.state = threading.local()
+
+    def get(self, key):
+        '''
+        Returns cached value or None.
+        '''
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        # Key was already looked up within current batch
+        if key in getattr(self.state, 'missing', ()):
+            return None
+        value = cache.get(key)
+        if value is not None:
+            self.local.set(key, value)
+        return value
+
+    def set(self, key, value):
+        '''
+        Stores value in the cache.
+        '''
+        self.local.set(key, value)
+        pending = getattr(self.state, 'pending', None)
+        if pending is None:
+            cache.set(key, value, CHECK_CACHE_TIMEOUT)
+        else:
+            pending[key] = value
+
+    @contextmanager
+    def batch(self, keys):
+        '''
+        Context manager prefetching keys and delaying writes.
+        '''
+        nested = getattr(self.state, 'pending', None) is not None
+        if not nested:
+            self.state.pending = {}
+            self.state.missing = set()
+
+        lookup = [key for key in keys if self.local.get(key) is None]
+        if lookup:
+            found = cache.get_many(lookup)
+            for key, value in found.items():
+                self.local.set(key, value)
+            self.state.missing.update(
+                [key for key in lookup if key not in found]
+            )
+
+        try:
+            yield
+        finally:
+            if not nested:
+                pending = self.state.pending
+                self.state.pending = None
+                self.state.missing = set()
+                if pending:
+                    cache.set_many(pending, CHECK_CACHE_TIMEOUT)
+
+
+CHECK_CACHE = CheckCache()
@@ -61,21 +61,15 @@ class ConsistencyCheck(TargetCheck):
     severity = 'warning'
 
     def check_target_unit(self, sources, targets, unit):
-        from weblate.trans.models import Unit
         # Do not check consistency if user asked not to have it
         if not unit.translation.subproject.allow_translation_propagation:
             return False
-        related = Unit.objects.same(unit)
-        if not related.exists():
-            return False
-
-        if not unit.translated:
-            related = related.filter(translated=True)
 
-        for unit2 in related.iterator():
-            if unit2.target != unit.target:
-                if unit2.translation.subproject.allow_translation_propagation:
-                    return True
+        for dummy, target, translated, propagate in unit.get_same_units():
+            if not unit.translated and not translated:
+                continue
+            if target != unit.target and propagate:
+                return True
 
         return False
 
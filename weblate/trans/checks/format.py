@@ -20,6 +20,7 @@
 
 from django.utils.translation import ugettext_lazy as _
 from weblate.trans.checks.base import TargetCheck
+from weblate.trans.checks.cache import LRUCache
 import re
 
 PYTHON_PRINTF_MATCH = re.compile(
@@ -98,6 +99,39 @@ PYTHON_BRACE_MATCH = re.compile(
     re.VERBOSE
 )
 
+# Number of parsed source strings kept in process memory
+FORMAT_CACHE_SIZE = 10000
+
+# Source text -> dictionary of parsed format strings indexed by flag
+FORMAT_CACHE = LRUCache(FORMAT_CACHE_SIZE)
+
+
+class FormatString(object):
+    '''
+    Format strings found in a text.
+    '''
+    def __init__(self, text, check):
+        self.text = text
+        spans = []
+        names = []
+        # Avoid regexp scan for texts without any format string
+        if check.marker in text:
+            for match in check.regexp.finditer(text):
+                name = match.group(1)
+                # We ignore %% as this is really not relevant. However it
+                # needs to be matched to prevent handling %%s as %s.
+                if name == '%':
+                    continue
+                spans.append(match.span())
+                names.append(name)
+        self.spans = tuple(spans)
+        self.names = tuple(names)
+        self.name_set = frozenset(names)
+        self.uses_position = (
+            len(names) == 0
+            or any([check.is_position_based(x) for x in names])
+        )
+
 
 class BaseFormatCheck(TargetCheck):
     '''
@@ -105,8 +139,16 @@ class BaseFormatCheck(TargetCheck):
     '''
     flag = None
     regexp = None
+    # Character every format string starts with
+    marker = '%'
     severity = 'danger'
 
+    def parse_format(self, text):
+        '''
+        Returns parsed format strings from text.
+        '''
+        return parse_formats(text, [self])[self.flag]
+
     def check_target_unit(self, sources, targets, unit):
         '''
         Checks single unit, handling plurals.
@@ -115,22 +157,19 @@ class BaseFormatCheck(TargetCheck):
         if self.flag not in unit.all_flags:
             return False
 
+        # Parsed once for all format checks
+        src_formats, tgt_formats = get_unit_formats(unit, sources, targets)
+        sources = [formats[self.flag] for formats in src_formats]
+        targets = [formats[self.flag] for formats in tgt_formats]
+
         # Special case languages with single plural form
         if len(sources) > 1 and len(targets) == 1:
-            return self.check_format(
-                sources[1],
-                targets[0],
-                unit,
-                1,
-                False
-            )
+            return self.compare_formats(sources[1], targets[0], False)
 
         # Check singular
-        singular_check = self.check_format(
+        singular_check = self.compare_formats(
             sources[0],
             targets[0],
-            unit,
-            0,
             len(sources) > 1
         )
         if singular_check:
@@ -142,13 +181,7 @@ class BaseFormatCheck(TargetCheck):
 
         # Check plurals against plural from source
         for target in targets[1:]:
-            plural_check = self.check_format(
-                sources[1],
-                target,
-                unit,
-                1,
-                False
-            )
+            plural_check = self.compare_formats(sources[1], target, False)
             if plural_check:
                 return True
 
@@ -159,45 +192,26 @@ class BaseFormatCheck(TargetCheck):
         '''
         Generic checker for format strings.
         '''
-        if len(target) == 0 or len(source) == 0:
-            return False
-
-        uses_position = True
+        return self.compare_formats(
+            self.parse_format(source),
+            parse_formats(target, [self], False)[self.flag],
+            ignore_missing
+        )
 
-        # Try geting source parsing from cache
-        src_matches = self.get_cache(unit, cache_slot)
+    def compare_formats(self, src_format, tgt_format, ignore_missing):
+        '''
+        Compares parsed format strings of source and target.
+        '''
+        if len(tgt_format.text) == 0 or len(src_format.text) == 0:
+            return False
 
-        # New style cache
-        if type(src_matches) is tuple:
-            uses_position, src_matches = src_matches
+        # Order matters only for position based format strings in source
+        if src_format.uses_position:
+            src_matches = src_format.names
+            tgt_matches = tgt_format.names
         else:
-            src_matches = None
-
-        # We ignore %% in the matches as this is really not relevant. However
-        # it needs to be matched to prevent handling %%s as %s.
-
-        # Cache miss, so calculate value
-        if src_matches is None:
-            src_matches = [
-                x[0]
-                for x in self.regexp.findall(source)
-                if x[0] != '%'
-            ]
-            if src_matches:
-                uses_position = max(
-                    [self.is_position_based(x) for x in src_matches]
-                )
-            self.set_cache(unit, (uses_position, src_matches), cache_slot)
-
-        tgt_matches = [
-            x[0]
-            for x in self.regexp.findall(target)
-            if x[0] != '%'
-        ]
-
-        if not uses_position:
-            src_matches = set(src_matches)
-            tgt_matches = set(tgt_matches)
+            src_matches = src_format.name_set
+            tgt_matches = tgt_format.name_set
 
         if src_matches != tgt_matches:
             # We can ignore missing format strings
@@ -269,6 +283,77 @@ class PythonBraceFormatCheck(BaseFormatCheck):
     description = _('Format string does not match source')
     flag = 'python-brace-format'
     regexp = PYTHON_BRACE_MATCH
+    marker = '{'
 
     def is_position_based(self, string):
         return string == ''
+
+
+FORMAT_CHECKS = (
+    PythonFormatCheck(),
+    PythonBraceFormatCheck(),
+    PHPFormatCheck(),
+    CFormatCheck(),
+)
+
+
+def parse_formats(text, checks, cached=True):
+    '''
+    Returns dictionary of parsed format strings in text indexed by flag
+    of given format checks.
+
+    Parsed source strings are cached, targets are rarely checked again.
+    '''
+    result = None
+    if cached:
+        result = FORMAT_CACHE.get(text)
+    if result is None:
+        result = {}
+    missing = [check for check in checks if check.flag not in result]
+    for check in missing:
+        result[check.flag] = FormatString(text, check)
+    if cached and missing:
+        FORMAT_CACHE.set(text, result)
+    return result
+
+
+def get_unit_formats(unit, sources, targets):
+    '''
+    Returns lists of parsed format strings in sources and targets.
+
+    All format flags of the unit are parsed in single pass and the result
+    is kept on the unit, so that following format checks do not have to
+    parse the strings again.
+    '''
+    key = (tuple(sources), tuple(targets))
+    parsed = getattr(unit, '_format_strings', None)
+    if parsed is None or parsed[0] != key:
+        checks = [
+            check for check in FORMAT_CHECKS if check.flag in unit.all_flags
+        ]
+        parsed = (
+            key,
+            [parse_formats(source, checks) for source in sources],
+            [parse_formats(target, checks, False) for target in targets],
+        )
+        unit._format_strings = parsed
+    return parsed[1], parsed[2]
+
+
+def highlight_format(text, flags):
+    '''
+    Returns sorted list of non overlapping (start, end) positions of format
+    strings in text for given flags.
+    '''
+    checks = [check for check in FORMAT_CHECKS if check.flag in flags]
+    parsed = parse_formats(text, checks)
+    spans = []
+    for check in checks:
+        spans.extend(parsed[check.flag].spans)
+    result = []
+    last = 0
+    for start, end in sorted(spans):
+        if start >= last:
+            result.append((start, end))
+            last = end
+    return result
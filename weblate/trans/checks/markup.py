@@ -47,14 +47,15 @@ class BBCodeCheck(TargetCheck):
     name = _('Mismatched BBcode')
     description = _('BBcode in translation does not match source')
     severity = 'warning'
+    use_cache = True
 
     def check_single(self, source, target, unit, cache_slot):
         # Try geting source parsing from cache
-        src_match = self.get_cache(unit, cache_slot)
+        src_match = self.get_cache(source, unit)
         # Cache miss
         if src_match is None:
             src_match = BBCODE_MATCH.findall(source)
-            self.set_cache(unit, src_match, cache_slot)
+            self.set_cache(source, unit, src_match)
         # Any BBCode in source?
         if len(src_match) == 0:
             return False
@@ -77,6 +78,7 @@ class XMLTagsCheck(TargetCheck):
     name = _('XML tags mismatch')
     description = _('XML tags in translation do not match source')
     severity = 'warning'
+    use_cache = True
 
     def parse_xml(self, text):
         '''
@@ -87,7 +89,7 @@ class XMLTagsCheck(TargetCheck):
 
     def check_single(self, source, target, unit, cache_slot):
         # Try getting source string data from cache
-        source_tags = self.get_cache(unit, cache_slot)
+        source_tags = self.get_cache(source, unit)
 
         # Source is not XML
         if source_tags == []:
@@ -97,16 +99,16 @@ class XMLTagsCheck(TargetCheck):
         if source_tags is None:
             # Quick check if source looks like XML
             if '<' not in source or len(XML_MATCH.findall(source)) == 0:
-                self.set_cache(unit, [], cache_slot)
+                self.set_cache(source, unit, [])
                 return False
             # Check if source is XML
             try:
                 source_tree = self.parse_xml(source)
                 source_tags = [x.tag for x in source_tree]
-                self.set_cache(unit, source_tags, cache_slot)
+                self.set_cache(source, unit, source_tags)
             except SyntaxError:
                 # Source is not valid XML, we give up
-                self.set_cache(unit, [], cache_slot)
+                self.set_cache(source, unit, [])
                 return False
 
         # Check target
@@ -957,20 +957,29 @@ class SameCheck(TargetCheck):
     name = _('Not translated')
     description = _('Source and translated strings are same')
     severity = 'warning'
+    use_cache = True
+
+    def get_cache_data(self, source, unit):
+        '''
+        Result depends on unit comment and flags as well.
+        '''
+        return u'\n'.join(
+            [source, unit.comment] + sorted(unit.all_flags)
+        )
 
     def should_ignore(self, source, unit, cache_slot):
         '''
         Check whether given unit should be ignored.
         '''
         # Use cache if available
-        result = self.get_cache(unit, cache_slot)
+        result = self.get_cache(source, unit)
         if result is not None:
             return result
 
         # Ignore some docbook tags
         if unit.comment.startswith('Tag: '):
             if unit.comment[5:] in DB_TAGS:
-                self.set_cache(unit, True, cache_slot)
+                self.set_cache(source, unit, True)
                 return True
 
         # Lower case source
@@ -992,13 +1001,14 @@ class SameCheck(TargetCheck):
             else:
                 # Check if we have any word which is not in blacklist
                 # (words which are often same in foreign language)
+                result = True
                 for word in SPLIT_RE.split(stripped):
                     if not test_word(word):
-                        return False
-                return True
+                        result = False
+                        break
 
         # Store in cache
-        self.set_cache(unit, result, cache_slot)
+        self.set_cache(source, unit, result)
 
         return result
 
@@ -19,7 +19,6 @@
 #
 
 from django.utils.translation import ugettext_lazy as _
-from django.db.models import Count
 from weblate.trans.checks.base import SourceCheck
 import re
 
@@ -72,15 +71,4 @@ class MultipleFailingCheck(SourceCheck):
     severity = 'warning'
 
     def check_source(self, source, unit):
-        from weblate.trans.models.unitdata import Check
-        related = Check.objects.filter(
-            contentsum=unit.contentsum,
-            project=unit.translation.subproject.project
-        ).exclude(
-            language__isnull=True
-        ).values(
-            'language'
-        ).annotate(
-            Count('language')
-        )
-        return len(related) >= 2
+        return unit.get_failing_languages() >= 2
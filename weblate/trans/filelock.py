@@ -1,10 +1,14 @@
 # Written by Evan Fosmark
 # see http://www.evanfosmark.com/
 # Released under BSD license
+#
+# Modified to use fcntl.flock, so that the lock is released by the kernel
+# when the process holding it dies.
 
 import os
 import time
 import errno
+import fcntl
 
 
 class FileLockException(Exception):
@@ -14,55 +18,79 @@ class FileLockException(Exception):
 class FileLock(object):
     """
     A file locking mechanism that has context-manager support so
-    you can use it in a with statement. This should be relatively cross
-    compatible as it doesn't rely on msvcrt or fcntl for the locking.
+    you can use it in a with statement. The lock is held using flock on
+    the lock file, which is never removed, so no stale lock is left behind
+    when process crashes.
+
+    Optional callback is called on release with time spent waiting for
+    the lock and time the lock was held (both in seconds).
     """
 
-    def __init__(self, file_name, timeout=10, delay=.05):
+    def __init__(self, file_name, timeout=10, delay=.05, callback=None):
         """
         Prepare the file locker. Specify the file to lock and optionally
-        the maximum timeout and the delay between each attempt to lock.
+        the maximum timeout and the maximal delay between each attempt to
+        lock.
         """
         self.is_locked = False
         self.lockfile = os.path.join(os.getcwd(), "%s.lock" % file_name)
         self.file_name = file_name
         self.timeout = timeout
         self.delay = delay
+        self.callback = callback
         self.handle = None
+        self.wait_time = 0
+        self.acquire_time = 0
+
+    def try_lock(self):
+        """
+        Tries to lock the file without blocking, returns whether it was
+        successful.
+        """
+        try:
+            fcntl.flock(self.handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except IOError as error:
+            if error.errno not in (errno.EAGAIN, errno.EACCES):
+                raise
+            return False
 
     def acquire(self):
         """
         Acquire the lock, if possible. If the lock is in use, it check again
-        every `wait` seconds. It does this until it either gets the lock or
-        exceeds `timeout` number of seconds, in which case it throws
-        an exception.
+        with increasing delay up to `delay` seconds. It does this until it
+        either gets the lock or exceeds `timeout` number of seconds, in
+        which case it throws an exception.
         """
         start_time = time.time()
-        while True:
-            try:
-                self.handle = os.open(
-                    self.lockfile,
-                    os.O_CREAT | os.O_EXCL | os.O_RDWR
-                )
-                break
-            except OSError as error:
-                if error.errno != errno.EEXIST:
-                    raise
-                if (time.time() - start_time) >= self.timeout:
-                    raise FileLockException("Timeout occured.")
-                time.sleep(self.delay)
+        self.handle = os.open(self.lockfile, os.O_CREAT | os.O_RDWR)
+        delay = 0.001
+        while not self.try_lock():
+            if (time.time() - start_time) >= self.timeout:
+                os.close(self.handle)
+                self.handle = None
+                raise FileLockException("Timeout occured.")
+            time.sleep(delay)
+            delay = min(delay * 2, self.delay)
+        self.acquire_time = time.time()
+        self.wait_time = self.acquire_time - start_time
         self.is_locked = True
 
     def release(self):
         """
-        Get rid of the lock by deleting the lockfile.
+        Get rid of the lock by unlocking and closing the lockfile.
         When working in a `with` statement, this gets automatically
         called at the end.
         """
         if self.is_locked:
+            fcntl.flock(self.handle, fcntl.LOCK_UN)
             os.close(self.handle)
-            os.unlink(self.lockfile)
+            self.handle = None
             self.is_locked = False
+            if self.callback is not None:
+                self.callback(
+                    self.wait_time, time.time() - self.acquire_time
+                )
 
     def __enter__(self):
         """
@@ -83,7 +111,6 @@ class FileLock(object):
 
     def __del__(self):
         """
-        Make sure that the FileLock instance doesn't leave a lockfile
-        lying around.
+        Make sure that the FileLock instance doesn't keep the lock.
         """
         self.release()
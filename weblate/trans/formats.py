@@ -33,8 +33,12 @@ from translate.storage import factory
 from weblate.trans.util import get_string, join_plural, add_configuration_error
 from translate.misc import quote
 from weblate.trans.util import get_clean_env
+from weblate import appsettings
+from collections import OrderedDict
 import weblate
 import subprocess
+import threading
+import os
 import os.path
 import re
 import hashlib
@@ -340,6 +344,124 @@ class FileUnit(object):
         self.unit.markfuzzy(fuzzy)
 
 
+def parse_units(format_id, filename, template_filename, language_code):
+    '''
+    Parses translation file and returns list of translatable units.
+
+    Used for parsing files in separate processes.
+    '''
+    fileformat = FILE_FORMATS[format_id]
+    template_store = None
+    if template_filename is not None:
+        template_store = fileformat.load(template_filename)
+    store = fileformat(filename, template_store, language_code=language_code)
+    return [unit for unit in store.all_units() if unit.is_translatable()]
+
+
+class StoreCache(object):
+    '''
+    Process wide LRU cache of parsed stores.
+
+    Stores are indexed by loader class and filename and are valid as long
+    as modification time, size and inode of the file are same. The size
+    of cache is limited by total size of cached files.
+    '''
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_signature(filename):
+        '''
+        Returns signature of file used to detect changes.
+        '''
+        stat = os.stat(filename)
+        return (stat.st_mtime, stat.st_size, stat.st_ino)
+
+    def get(self, cls, filename):
+        '''
+        Returns cached store or None if not cached or outdated.
+        '''
+        key = (cls, os.path.abspath(filename))
+        signature = self.get_signature(filename)
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is None or entry[0] != signature:
+                if entry is not None:
+                    self.size -= entry[0][1]
+                self.misses += 1
+                return None
+            # Move to the end as most recently used
+            self.entries[key] = entry
+            self.hits += 1
+            return entry[1]
+
+    def put(self, cls, filename, store):
+        '''
+        Stores parsed store in cache, evicting least recently used
+        ones over the size limit.
+        '''
+        key = (cls, os.path.abspath(filename))
+        signature = self.get_signature(filename)
+        limit = appsettings.STORE_CACHE_SIZE
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.size -= entry[0][1]
+            if signature[1] > limit:
+                return
+            self.entries[key] = (signature, store)
+            self.size += signature[1]
+            while self.size > limit:
+                dummy, entry = self.entries.popitem(last=False)
+                self.size -= entry[0][1]
+
+    def invalidate(self, filename):
+        '''
+        Removes all stores for given file.
+        '''
+        filename = os.path.abspath(filename)
+        with self.lock:
+            for key in self.entries.keys():
+                if key[1] == filename:
+                    self.size -= self.entries.pop(key)[0][1]
+
+    def discard(self, store):
+        '''
+        Removes given store object, used when it was modified in memory.
+        '''
+        with self.lock:
+            for key, entry in self.entries.items():
+                if entry[1] is store:
+                    self.size -= self.entries.pop(key)[0][1]
+
+    def clear(self):
+        '''
+        Removes all cached stores.
+        '''
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def get_stats(self):
+        '''
+        Returns dictionary with cache statistics.
+        '''
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'stores': len(self.entries),
+                'size': self.size,
+            }
+
+
+STORE_CACHE = StoreCache()
+
+
 class FileFormat(object):
     '''
     Generic object defining file format loader.
@@ -371,6 +493,15 @@ class FileFormat(object):
         # Add missing mode attribute to Django file wrapper
         if not isinstance(storefile, basestring):
             storefile.mode = 'r'
+            return cls.parse_store(storefile)
+
+        # Use already parsed store if file was not changed
+        if appsettings.STORE_CACHE_SIZE:
+            store = STORE_CACHE.get(cls, storefile)
+            if store is None:
+                store = cls.parse_store(storefile)
+                STORE_CACHE.put(cls, storefile, store)
+            return store
 
         return cls.parse_store(storefile)
 
@@ -441,6 +572,9 @@ class FileFormat(object):
                 raise Exception(
                     'Could not find template unit for new unit!'
                 )
+            # Template unit will be modified, so the store can not be
+            # shared anymore
+            STORE_CACHE.discard(self.template_store)
             add = True
         else:
             add = False
@@ -509,6 +643,10 @@ class FileFormat(object):
         Saves underlaying store to disk.
         '''
         self.store.save()
+        # Cache store matching new file content
+        if (appsettings.STORE_CACHE_SIZE
+                and isinstance(self.storefile, basestring)):
+            STORE_CACHE.put(self.__class__, self.storefile, self.store)
 
     def all_units(self):
         '''
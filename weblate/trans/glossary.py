@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2014 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <http://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+'''
+In memory glossary index used for matching dictionary words in units.
+
+Each process keeps index of dictionary for project and language, which is
+built on first use. Single words are matched using hash map of lower
+cased words, multi word terms are matched as sequences of tokens.
+Changes are propagated to other processes using version stored in the
+cache, loaded glossaries are additionally reloaded after GLOSSARY_TTL
+seconds in case the cache is not shared between processes. Only
+GLOSSARY_SIZE most recently used glossaries are kept in memory.
+'''
+
+from django.core.cache import cache
+from whoosh.analysis import (
+    StandardAnalyzer, StemmingAnalyzer, RegexTokenizer, LowercaseFilter
+)
+from collections import OrderedDict
+from contextlib import contextmanager
+import threading
+import time
+import uuid
+
+# Maximal number of glossaries kept in memory
+GLOSSARY_SIZE = 100
+
+# Maximal age of loaded glossary in seconds
+GLOSSARY_TTL = 300
+
+# Loaded glossaries, indexed by (project id, language id), least recently
+# used first
+GLOSSARY = OrderedDict()
+GLOSSARY_LOCK = threading.Lock()
+
+# Per thread state for deferred invalidation
+DEFERRED = threading.local()
+
+# Analyzers used for extracting single words:
+# - standard analyzer simply splits words
+# - stemming extracts stems, to catch things like plurals
+WORD_ANALYZERS = (StandardAnalyzer(), StemmingAnalyzer())
+
+# Analyzer used for matching multi word terms
+PHRASE_ANALYZER = RegexTokenizer() | LowercaseFilter()
+
+
+def get_version_key(project_id, language_id):
+    '''
+    Returns cache key for glossary version.
+    '''
+    return 'glossary-%d-%d' % (project_id, language_id)
+
+
+def get_unit_texts(unit):
+    '''
+    Returns list of texts in unit to match against glossary.
+    '''
+    return unit.get_source_plurals() + [unit.context]
+
+
+def get_phrase(text):
+    '''
+    Returns tuple of tokens in text.
+    '''
+    return tuple([token.text for token in PHRASE_ANALYZER(text)])
+
+
+class Glossary(object):
+    '''
+    Glossary for single project and language.
+    '''
+    def __init__(self, project_id, language_id):
+        self.project_id = project_id
+        self.language_id = language_id
+        self.version = None
+        self.loaded = None
+        # Entry id -> (source, target)
+        self.entries = {}
+        # Lower cased word -> list of entry ids
+        self.words = {}
+        # Tuple of tokens -> list of entry ids
+        self.phrases = {}
+        # Lengths of indexed phrases
+        self.lengths = set()
+
+    def load(self):
+        '''
+        Loads all words from the dictionary.
+        '''
+        from weblate.trans.models.dictionary import Dictionary
+        self.version = cache.get(
+            get_version_key(self.project_id, self.language_id)
+        )
+        self.loaded = time.time()
+        words = Dictionary.objects.filter(
+            project_id=self.project_id,
+            language_id=self.language_id,
+        ).values_list('id', 'source', 'target')
+        for pk, source, target in words:
+            self.add(pk, source, target)
+
+    def is_outdated(self):
+        '''
+        Checks whether glossary was changed by other process or is
+        too old.
+        '''
+        if time.time() - self.loaded > GLOSSARY_TTL:
+            return True
+        return cache.get(
+            get_version_key(self.project_id, self.language_id)
+        ) != self.version
+
+    def add(self, pk, source, target):
+        '''
+        Adds word to the index.
+        '''
+        self.entries[pk] = (source, target)
+        if len(source.split()) > 1:
+            phrase = get_phrase(source)
+            if len(phrase) > 1:
+                self.phrases.setdefault(phrase, []).append(pk)
+                self.lengths.add(len(phrase))
+                return
+        self.words.setdefault(source.lower(), []).append(pk)
+
+    def match(self, texts):
+        '''
+        Returns set of entry ids matching any of texts.
+        '''
+        result = set()
+        for text in texts:
+            for analyzer in WORD_ANALYZERS:
+                for token in analyzer(text):
+                    result.update(self.words.get(token.text, ()))
+            if not self.lengths:
+                continue
+            tokens = get_phrase(text)
+            for length in self.lengths:
+                for pos in range(len(tokens) - length + 1):
+                    result.update(
+                        self.phrases.get(tokens[pos:pos + length], ())
+                    )
+        return result
+
+    def get_words(self, texts):
+        '''
+        Returns list of (id, source, target) matching any of texts.
+        '''
+        result = [
+            (pk, ) + self.entries[pk] for pk in self.match(texts)
+        ]
+        result.sort(key=lambda item: item[1])
+        return result
+
+
+def get_glossary(project_id, language_id):
+    '''
+    Returns loaded glossary for project and language.
+    '''
+    key = (project_id, language_id)
+    glossary = GLOSSARY.pop(key, None)
+    if glossary is None or glossary.is_outdated():
+        glossary = Glossary(project_id, language_id)
+        glossary.load()
+    # Move to the end as most recently used
+    GLOSSARY[key] = glossary
+    while len(GLOSSARY) > GLOSSARY_SIZE:
+        GLOSSARY.popitem(last=False)
+    return glossary
+
+
+def get_words(project_id, language_id, texts):
+    '''
+    Looks up glossary words in texts.
+    '''
+    with GLOSSARY_LOCK:
+        return get_glossary(project_id, language_id).get_words(texts)
+
+
+def invalidate_glossary(project_id, language_id):
+    '''
+    Invalidates glossary after it has been changed.
+    '''
+    pending = getattr(DEFERRED, 'pending', None)
+    if pending is not None:
+        pending.add((project_id, language_id))
+        return
+    cache.set(
+        get_version_key(project_id, language_id), str(uuid.uuid4())
+    )
+    with GLOSSARY_LOCK:
+        GLOSSARY.pop((project_id, language_id), None)
+
+
+@contextmanager
+def deferred_invalidation():
+    '''
+    Context manager collecting glossary invalidations and performing
+    them once on exit, used for bulk changes.
+    '''
+    nested = getattr(DEFERRED, 'pending', None) is not None
+    if not nested:
+        DEFERRED.pending = set()
+    try:
+        yield
+    finally:
+        if not nested:
+            pending = DEFERRED.pending
+            DEFERRED.pending = None
+            for project_id, language_id in pending:
+                invalidate_glossary(project_id, language_id)
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2014 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <http://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+'''
+Histograms of time spent waiting for and holding repository locks.
+
+Counters are stored in the cache, so that they are shared between
+processes and can be shown on the admin performance page.
+'''
+
+from django.core.cache import cache
+from weblate.trans.util import increment_counter
+
+# Upper bounds of histogram buckets in seconds, last bucket is unbounded
+LOCK_BUCKETS = (0.001, 0.01, 0.1, 1, 10)
+
+# Labels for the buckets
+LOCK_BUCKET_LABELS = (
+    '< 1 ms', '< 10 ms', '< 100 ms', '< 1 s', '< 10 s', '>= 10 s'
+)
+
+# How long are the counters kept
+LOCK_STATS_TIMEOUT = 30 * 24 * 3600
+
+
+def get_bucket(value):
+    '''
+    Returns index of histogram bucket for value.
+    '''
+    for pos, bound in enumerate(LOCK_BUCKETS):
+        if value < bound:
+            return pos
+    return len(LOCK_BUCKETS)
+
+
+def get_stats_key(name, kind, bucket):
+    '''
+    Returns cache key for histogram counter.
+    '''
+    return 'lock-stats-%s-%s-%d' % (name, kind, bucket)
+
+
+def record_lock(name, wait, hold):
+    '''
+    Records time spent waiting for the lock and holding it.
+    '''
+    increment_counter(
+        get_stats_key(name, 'wait', get_bucket(wait)), LOCK_STATS_TIMEOUT
+    )
+    increment_counter(
+        get_stats_key(name, 'hold', get_bucket(hold)), LOCK_STATS_TIMEOUT
+    )
+
+
+def get_lock_stats(names):
+    '''
+    Returns list of (name, wait histogram, hold histogram) for locks
+    which were used.
+    '''
+    keys = [
+        get_stats_key(name, kind, bucket)
+        for name in names
+        for kind in ('wait', 'hold')
+        for bucket in range(len(LOCK_BUCKET_LABELS))
+    ]
+    values = cache.get_many(keys)
+    result = []
+    for name in names:
+        histograms = [
+            [
+                values.get(get_stats_key(name, kind, bucket), 0)
+                for bucket in range(len(LOCK_BUCKET_LABELS))
+            ]
+            for kind in ('wait', 'hold')
+        ]
+        if any(histograms[0]):
+            result.append((name, histograms[0], histograms[1]))
+    return result
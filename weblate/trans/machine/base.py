@@ -24,11 +24,22 @@ Base code for machine translation services.
 from django.core.cache import cache
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from weblate import appsettings
+from weblate.trans.machine.pool import POOL
+from weblate.trans.machine.stats import record_hit, record_request
+import Queue
+import hashlib
 import json
+import threading
+import time
 import urllib
 import urllib2
 import weblate
 
+# How long are translations cached
+MT_CACHE_TIMEOUT = 7 * 24 * 3600
+
 
 class MachineTranslationError(Exception):
     '''
@@ -48,6 +59,9 @@ class MachineTranslation(object):
     '''
     name = 'MT'
     default_languages = []
+    # Service uses local database, its results are not cached and it is
+    # queried from the request thread
+    local = False
 
     def __init__(self):
         '''
@@ -83,20 +97,28 @@ class MachineTranslation(object):
 
         # Create request object with custom headers
         request = urllib2.Request(url)
-        request.timeout = 0.5
         request.add_header('User-Agent', weblate.USER_AGENT)
+        if http_post:
+            request.add_header(
+                'Content-Type', 'application/x-www-form-urlencoded'
+            )
         # Optional authentication
         if not skip_auth:
             self.authenticate(request)
 
-        # Fire request
+        # Fire request using pooled connection
         if http_post:
-            handle = urllib2.urlopen(request, params)
+            text = POOL.request(
+                'POST', url, params, dict(request.header_items()),
+                appsettings.MT_TIMEOUT
+            )
         else:
-            handle = urllib2.urlopen(request)
+            text = POOL.request(
+                'GET', url, None, dict(request.header_items()),
+                appsettings.MT_TIMEOUT
+            )
 
-        # Read and possibly convert response
-        text = handle.read()
+        # Possibly convert response
         # Needed for Microsoft
         if text.startswith('\xef\xbb\xbf'):
             text = text.decode('UTF-8-sig')
@@ -197,6 +219,16 @@ class MachineTranslation(object):
         '''
         return language in self.supported_languages
 
+    def get_cache_key(self, language, text):
+        '''
+        Returns cache key for translations of text.
+        '''
+        return 'mt-%s-%s-%s' % (
+            self.mtid,
+            language,
+            hashlib.md5(text.encode('utf-8')).hexdigest(),
+        )
+
     def translate(self, language, text, unit, user):
         '''
         Returns list of machine translations.
@@ -207,12 +239,20 @@ class MachineTranslation(object):
         if not self.is_supported(language):
             return []
 
+        if not self.local:
+            cache_key = self.get_cache_key(language, text)
+            result = cache.get(cache_key)
+            if result is not None:
+                record_hit(self.mtid)
+                return result
+
+        start = time.time()
         try:
             translations = self.download_translations(
                 language, text, unit, user
             )
 
-            return [
+            result = [
                 {
                     'text': trans[0],
                     'quality': trans[1],
@@ -222,6 +262,7 @@ class MachineTranslation(object):
                 for trans in translations
             ]
         except Exception as exc:
+            record_request(self.mtid, time.time() - start, True)
             weblate.logger.error(
                 'Failed to fetch translations from %s (%s: %s)',
                 self.name,
@@ -237,3 +278,94 @@ class MachineTranslation(object):
                 exc.__class__.__name__,
                 str(exc)
             ))
+
+        record_request(self.mtid, time.time() - start)
+        # Empty result might be temporary failure of the service
+        if not self.local and result:
+            cache.set(cache_key, result, MT_CACHE_TIMEOUT)
+        return result
+
+
+def iterate_services(services, language, text, unit, user, timeout=None):
+    '''
+    Queries machine translation services in parallel.
+
+    Yields (service, translations, error) tuples as the services reply,
+    services not replying within timeout are reported as failed at the end.
+    '''
+    if timeout is None:
+        timeout = appsettings.MT_TIMEOUT
+    deadline = time.time() + timeout
+    results = Queue.Queue()
+
+    def worker(service):
+        '''
+        Queries single service.
+        '''
+        try:
+            return (
+                service,
+                service.translate(language, text, unit, user),
+                None
+            )
+        except Exception as exc:
+            return (
+                service,
+                [],
+                '%s: %s' % (exc.__class__.__name__, str(exc))
+            )
+
+    def thread_worker(service):
+        '''
+        Queries single service in separate thread.
+        '''
+        try:
+            results.put(worker(service))
+        finally:
+            connection.close()
+
+    pending = set()
+    for service in services:
+        if service.local:
+            continue
+        thread = threading.Thread(target=thread_worker, args=(service,))
+        thread.daemon = True
+        thread.start()
+        pending.add(service.mtid)
+
+    # Local services are queried while waiting for remote ones
+    for service in services:
+        if service.local:
+            yield worker(service)
+
+    while pending:
+        try:
+            result = results.get(timeout=max(0, deadline - time.time()))
+        except Queue.Empty:
+            break
+        pending.discard(result[0].mtid)
+        yield result
+
+    for service in services:
+        if service.mtid in pending:
+            yield (
+                service,
+                [],
+                'Request timed out after %d seconds' % timeout
+            )
+
+
+def translate_services(services, language, text, unit, user, timeout=None):
+    '''
+    Queries machine translation services in parallel.
+
+    Returns list of (service, translations, error) tuples in order of
+    services, see iterate_services.
+    '''
+    results = dict([
+        (service.mtid, (service, translations, error))
+        for service, translations, error in iterate_services(
+            services, language, text, unit, user, timeout
+        )
+    ])
+    return [results[service.mtid] for service in services]
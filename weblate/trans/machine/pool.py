@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2014 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <http://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+'''
+Pool of persistent HTTP connections for machine translation services.
+
+Idle connections are kept open, so that following requests to the same
+service do not have to establish new TCP and TLS session.
+'''
+
+import httplib
+import socket
+import threading
+import urllib
+import urllib2
+import urlparse
+
+# Maximal number of idle connections kept for single host
+POOL_SIZE = 4
+
+
+def get_proxy(scheme, host):
+    '''
+    Returns proxy host to use for given URL or None.
+    '''
+    proxy = urllib.getproxies().get(scheme)
+    if proxy is None or urllib.proxy_bypass(host.split(':')[0]):
+        return None
+    return urlparse.urlsplit(proxy).netloc
+
+
+class ConnectionPool(object):
+    '''
+    Keeps idle keep-alive connections grouped by scheme and host.
+    '''
+    def __init__(self, size=POOL_SIZE):
+        self.size = size
+        self.lock = threading.Lock()
+        self.connections = {}
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, key, timeout, fresh=False):
+        '''
+        Returns tuple of connection for the key and whether it was reused.
+        '''
+        with self.lock:
+            idle = self.connections.get(key)
+            if idle and not fresh:
+                self.reused += 1
+                connection = idle.pop()
+                connection.timeout = timeout
+                if connection.sock is not None:
+                    connection.sock.settimeout(timeout)
+                return connection, True
+            self.created += 1
+
+        scheme, host, proxy = key
+        if scheme == 'https':
+            connection_class = httplib.HTTPSConnection
+        else:
+            connection_class = httplib.HTTPConnection
+        if proxy is None:
+            return connection_class(host, timeout=timeout), False
+        connection = connection_class(proxy, timeout=timeout)
+        if scheme == 'https':
+            connection.set_tunnel(host)
+        return connection, False
+
+    def release(self, key, connection):
+        '''
+        Returns connection to the pool or closes it if pool is full.
+        '''
+        with self.lock:
+            idle = self.connections.setdefault(key, [])
+            if len(idle) < self.size:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def clear(self):
+        '''
+        Closes all idle connections.
+        '''
+        with self.lock:
+            connections = self.connections
+            self.connections = {}
+        for idle in connections.values():
+            for connection in idle:
+                connection.close()
+
+    def request(self, method, url, body=None, headers=None, timeout=None):
+        '''
+        Performs HTTP request and returns response body.
+        '''
+        scheme, host, path, query, dummy = urlparse.urlsplit(url)
+        proxy = get_proxy(scheme, host)
+        key = (scheme, host, proxy)
+
+        if proxy is not None and scheme != 'https':
+            target = url
+        else:
+            target = path or '/'
+            if query:
+                target = '%s?%s' % (target, query)
+
+        fresh = False
+        while True:
+            connection, reused = self.acquire(key, timeout, fresh)
+            try:
+                connection.request(method, target, body, headers or {})
+                response = connection.getresponse()
+                data = response.read()
+            except socket.timeout:
+                connection.close()
+                raise
+            except (httplib.HTTPException, socket.error):
+                connection.close()
+                # Server has closed idle connection, retry with new one
+                if reused:
+                    fresh = True
+                    continue
+                raise
+            break
+
+        if response.will_close:
+            connection.close()
+        else:
+            self.release(key, connection)
+
+        if response.status >= 400:
+            raise urllib2.HTTPError(
+                url, response.status, response.reason, response.msg, None
+            )
+
+        return data
+
+
+POOL = ConnectionPool()
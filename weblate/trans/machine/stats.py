@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2014 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <http://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+'''
+Statistics of machine translation cache hits and service latency shown
+on the admin performance page.
+'''
+
+from django.core.cache import cache
+from weblate.trans.util import increment_counter
+
+# How long are the counters kept
+MT_STATS_TIMEOUT = 30 * 24 * 3600
+
+
+def get_stats_key(mtid, kind):
+    '''
+    Returns cache key for service counter.
+    '''
+    return 'mt-stats-%s-%s' % (mtid, kind)
+
+
+def increment(key, delta=1):
+    '''
+    Increments service counter.
+    '''
+    increment_counter(key, MT_STATS_TIMEOUT, delta)
+
+
+def record_hit(mtid):
+    '''
+    Records translation served from the cache.
+    '''
+    increment(get_stats_key(mtid, 'hits'))
+
+
+def record_request(mtid, elapsed, failed=False):
+    '''
+    Records request to the service and time it took.
+    '''
+    increment(get_stats_key(mtid, 'requests'))
+    increment(get_stats_key(mtid, 'time'), int(elapsed * 1000))
+    if failed:
+        increment(get_stats_key(mtid, 'errors'))
+
+
+def get_machine_stats(services):
+    '''
+    Returns list of dictionaries with statistics for services which
+    were used.
+    '''
+    kinds = ('hits', 'requests', 'time', 'errors')
+    values = cache.get_many([
+        get_stats_key(service.mtid, kind)
+        for service in services
+        for kind in kinds
+    ])
+    result = []
+    for service in services:
+        stats = dict([
+            (kind, values.get(get_stats_key(service.mtid, kind), 0))
+            for kind in kinds
+        ])
+        total = stats['hits'] + stats['requests']
+        if total == 0:
+            continue
+        stats['name'] = service.name
+        stats['hit_rate'] = 100 * stats['hits'] / total
+        if stats['requests']:
+            stats['latency'] = stats['time'] / stats['requests']
+        else:
+            stats['latency'] = 0
+        result.append(stats)
+    return result
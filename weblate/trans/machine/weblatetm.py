@@ -19,19 +19,35 @@
 #
 
 from weblate.trans.machine.base import MachineTranslation
-from weblate.trans.models.unit import Unit
+from weblate.trans.models.project import Project
+from weblate.trans.memory import lookup
+from weblate.trans.util import split_plural
 
 
-def format_unit_match(unit, quality):
+def format_memory_matches(matches, unit, user):
     '''
-    Formats unit to translation service result.
+    Formats translation memory matches to translation service result.
+
+    The ACL is checked once for each project.
     '''
-    return (
-        unit.get_target_plurals()[0],
-        quality,
-        'Weblate (%s)' % unicode(unit.translation.subproject),
-        unit.get_source_plurals()[0],
-    )
+    allowed = {}
+    result = []
+    for quality, pk, source, target, origin, project_id in matches:
+        if pk == unit.id:
+            continue
+        if project_id not in allowed:
+            allowed[project_id] = Project.objects.get(
+                pk=project_id
+            ).has_acl(user)
+        if not allowed[project_id]:
+            continue
+        result.append((
+            split_plural(target)[0],
+            quality,
+            'Weblate (%s)' % origin,
+            split_plural(source)[0],
+        ))
+    return result
 
 
 class WeblateTranslation(MachineTranslation):
@@ -39,6 +55,7 @@ class WeblateTranslation(MachineTranslation):
     Translation service using strings already translated in Weblate.
     '''
     name = 'Weblate'
+    local = True
 
     def convert_language(self, language):
         '''
@@ -56,13 +73,11 @@ class WeblateTranslation(MachineTranslation):
         '''
         Downloads list of possible translations from a service.
         '''
-        matching_units = Unit.objects.same_source(unit)
-
-        return [
-            format_unit_match(munit, 100)
-            for munit in matching_units
-            if munit.has_acl(user)
-        ]
+        matches = lookup(
+            unit.translation.language.code,
+            unit.get_source_plurals()[0],
+        )
+        return format_memory_matches(matches, unit, user)
 
 
 class WeblateSimilarTranslation(MachineTranslation):
@@ -70,6 +85,7 @@ class WeblateSimilarTranslation(MachineTranslation):
     Translation service using strings already translated in Weblate.
     '''
     name = 'Weblate similarity'
+    local = True
 
     def convert_language(self, language):
         '''
@@ -87,10 +103,9 @@ class WeblateSimilarTranslation(MachineTranslation):
         '''
         Downloads list of possible translations from a service.
         '''
-        matching_units = Unit.objects.more_like_this(unit)
-
-        return [
-            format_unit_match(munit, 50)
-            for munit in matching_units
-            if munit.has_acl(user)
-        ]
+        matches = lookup(
+            unit.translation.language.code,
+            unit.get_source_plurals()[0],
+            exact=False,
+        )
+        return format_memory_matches(matches, unit, user)[:5]
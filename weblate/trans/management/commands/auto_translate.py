@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2014 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <http://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from django.core.management.base import CommandError
+from django.contrib.auth.models import User
+from optparse import make_option
+from weblate.trans.management.commands import WeblateLangCommand
+from weblate.trans.models import SubProject
+from weblate.trans.autotranslate import auto_translate
+from weblate.appsettings import ANONYMOUS_USER_NAME
+
+
+class Command(WeblateLangCommand):
+    help = 'performs automatic translation based on other subprojects'
+    option_list = WeblateLangCommand.option_list + (
+        make_option(
+            '--user',
+            default=ANONYMOUS_USER_NAME,
+            help='User who will be used as author of the changes'
+        ),
+        make_option(
+            '--source',
+            default=None,
+            help='Source subproject (project/subproject) to use, '
+            'by default all other subprojects in project are used'
+        ),
+        make_option(
+            '--overwrite',
+            default=False,
+            action='store_true',
+            help='Overwrite existing translations'
+        ),
+        make_option(
+            '--inconsistent',
+            default=False,
+            action='store_true',
+            help='Process only inconsistent translations'
+        ),
+    )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError('User does not exist!')
+
+        subproject = None
+        if options['source'] is not None:
+            parts = options['source'].split('/')
+            if len(parts) != 2:
+                raise CommandError('Invalid source subproject!')
+            try:
+                subproject = SubProject.objects.get(
+                    project__slug=parts[0],
+                    slug=parts[1]
+                )
+            except SubProject.DoesNotExist:
+                raise CommandError('Source subproject does not exist!')
+
+        for translation in self.get_translations(*args, **options):
+            if translation.subproject.locked:
+                continue
+            if translation.subproject == subproject:
+                continue
+            updated = auto_translate(
+                translation,
+                user,
+                subproject=subproject,
+                inconsistent=options['inconsistent'],
+                overwrite=options['overwrite'],
+            )
+            if updated:
+                self.stdout.write(
+                    'Updated %d strings in %s' % (updated, translation)
+                )
@@ -19,17 +19,76 @@
 #
 
 from weblate.trans.models import SubProject, Project
+from weblate.trans.formats import STORE_CACHE
+from weblate.trans.checks.format import FORMAT_CHECKS, FORMAT_CACHE
 from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from optparse import make_option
 import cProfile
 import pstats
+import time
+
+# Flags and templates for generating strings for format checks benchmark
+FORMAT_TEMPLATES = (
+    ('c-format', u'%d files in %s', u'%d souborů v %s'),
+    (
+        'python-format',
+        u'Copied %(count)d of %(total)d items',
+        u'Zkopírováno %(count)d z %(total)d'
+    ),
+    (
+        'python-brace-format',
+        u'Hello {0}, you have {count} messages',
+        u'Ahoj {0}, máte {count} zpráv'
+    ),
+    ('php-format', u'Order %2$s before %1$s', u'Seřadit %1$s před %2$s'),
+    ('c-format', u'Progress: %.1f%% done', u'Průběh: %.1f%% hotovo'),
+    (
+        'python-brace-format',
+        u'{name} updated {count} strings',
+        u'{name} aktualizoval řetězce'
+    ),
+    (
+        'python-format',
+        u'Plain string without placeholders',
+        u'Prostý řetězec bez parametrů'
+    ),
+)
+
+
+class FormatUnit(object):
+    '''
+    Minimal unit used for benchmarking format checks.
+    '''
+    translated = True
+
+    def __init__(self, flag):
+        self.all_flags = [flag]
+
+
+def get_format_corpus(count, distinct):
+    '''
+    Generates list of (sources, targets, unit) for format checks benchmark.
+
+    The corpus repeats given number of distinct strings.
+    '''
+    units = {}
+    strings = []
+    for pos in range(min(count, distinct)):
+        flag, source, target = FORMAT_TEMPLATES[pos % len(FORMAT_TEMPLATES)]
+        if flag not in units:
+            units[flag] = FormatUnit(flag)
+        suffix = u' #%d' % pos
+        strings.append(([source + suffix], [target + suffix], units[flag]))
+    return [strings[pos % len(strings)] for pos in range(count)]
 
 
 class Command(BaseCommand):
     '''
     Runs simple project import to perform benchmarks.
     '''
-    help = 'performs import benchmark'
+    help = 'performs import or format checks benchmark'
     args = '<project> <repo> <mask>'
     option_list = BaseCommand.option_list + (
         make_option(
@@ -46,9 +105,36 @@ class Command(BaseCommand):
             default=20,
             help='number of profile stats to show',
         ),
+        make_option(
+            '--format-checks',
+            type='int',
+            dest='format_checks',
+            default=0,
+            help='run format checks on given number of generated strings '
+            'instead of import benchmark',
+        ),
+        make_option(
+            '--format-distinct',
+            type='int',
+            dest='format_distinct',
+            default=0,
+            help='number of distinct source strings for format checks '
+            '(defaults to all strings being distinct)',
+        ),
+        make_option(
+            '--format-uncached',
+            action='store_true',
+            dest='format_uncached',
+            default=False,
+            help='parse format strings again for every string, '
+            'to compare with cached parsing',
+        ),
     )
 
     def handle(self, *args, **options):
+        if options['format_checks']:
+            self.benchmark_format(options)
+            return
         if len(args) < 3:
             raise CommandError('Missing arguments!')
         project = Project.objects.get(slug=args[0])
@@ -58,16 +144,73 @@ class Command(BaseCommand):
             slug='benchmark'
         ).delete()
         profiler = cProfile.Profile()
-        subproject = profiler.runcall(
-            SubProject.objects.create,
-            name='Benchmark',
-            slug='benchmark',
-            repo=args[1],
-            filemask=args[2],
-            project=project
-        )
+        with CaptureQueriesContext(connection) as queries:
+            subproject = profiler.runcall(
+                SubProject.objects.create,
+                name='Benchmark',
+                slug='benchmark',
+                repo=args[1],
+                filemask=args[2],
+                project=project
+            )
         stats = pstats.Stats(profiler)
         stats.sort_stats(options['profile_sort'])
         stats.print_stats(options['profile_count'])
+        self.stdout.write(
+            'Executed {0} database queries'.format(len(queries))
+        )
+        self.stdout.write(
+            'Parsed stores cache: {hits} hits, {misses} misses'.format(
+                **STORE_CACHE.get_stats()
+            )
+        )
         # Delete after testing
         subproject.delete()
+
+    def benchmark_format(self, options):
+        '''
+        Runs all format checks on generated strings.
+        '''
+        corpus = get_format_corpus(
+            options['format_checks'],
+            options['format_distinct'] or options['format_checks']
+        )
+        FORMAT_CACHE.clear()
+        start = time.time()
+        if options['profile_count']:
+            profiler = cProfile.Profile()
+            failing = profiler.runcall(
+                self.run_format_checks, corpus, options['format_uncached']
+            )
+        else:
+            failing = self.run_format_checks(
+                corpus, options['format_uncached']
+            )
+        elapsed = time.time() - start
+        if options['profile_count']:
+            stats = pstats.Stats(profiler)
+            stats.sort_stats(options['profile_sort'])
+            stats.print_stats(options['profile_count'])
+        self.stdout.write(
+            'Checked {0} strings in {1:.2f} s, {2} failing checks'.format(
+                len(corpus), elapsed, failing
+            )
+        )
+        self.stdout.write(
+            'Parsed format strings cache: {0} entries'.format(
+                len(FORMAT_CACHE)
+            )
+        )
+
+    def run_format_checks(self, corpus, uncached):
+        '''
+        Runs format checks on the corpus, returns number of failures.
+        '''
+        failing = 0
+        for sources, targets, unit in corpus:
+            if uncached:
+                FORMAT_CACHE.clear()
+            for check in FORMAT_CHECKS:
+                if check.check_target(sources, targets, unit):
+                    failing += 1
+        return failing
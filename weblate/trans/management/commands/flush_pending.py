@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2014 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <http://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from weblate.trans.management.commands import WeblateLangCommand
+
+
+class Command(WeblateLangCommand):
+    help = 'writes changes stored only in database to translation files'
+
+    def handle(self, *args, **options):
+        translations = self.get_translations(
+            *args, **options
+        ).filter(
+            unit__pending=True
+        ).distinct()
+
+        for translation in translations:
+            if int(options['verbosity']) >= 1:
+                self.stdout.write('Writing %s' % translation)
+            translation.flush_pending(None)
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2014 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <http://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from optparse import make_option
+from weblate.trans.models import RepositoryUpdate
+import threading
+
+
+class Command(BaseCommand):
+    help = 'processes queued repository updates'
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--workers',
+            type='int',
+            dest='workers',
+            default=4,
+            help='Number of repositories to update in parallel'
+        ),
+        make_option(
+            '--stats',
+            action='store_true',
+            dest='stats',
+            default=False,
+            help='Only show queue statistics'
+        ),
+    )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            stats = RepositoryUpdate.objects.get_stats()
+            self.stdout.write('Pending updates: {0}'.format(stats['pending']))
+            self.stdout.write('Running updates: {0}'.format(stats['running']))
+            self.stdout.write('Queue latency: {0}'.format(stats['latency']))
+            return
+
+        if options['workers'] <= 1:
+            self.worker()
+            return
+
+        threads = [
+            threading.Thread(target=self.thread_worker)
+            for i in range(options['workers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def worker(self):
+        '''
+        Processes updates until the queue is empty.
+        '''
+        while True:
+            update = RepositoryUpdate.objects.claim()
+            if update is None:
+                return
+            update.process()
+
+    def thread_worker(self):
+        '''
+        Worker thread, using own database connection.
+        '''
+        try:
+            self.worker()
+        finally:
+            connection.close()
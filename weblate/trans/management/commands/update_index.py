@@ -19,36 +19,152 @@
 #
 
 from django.core.management.base import BaseCommand
+from optparse import make_option
 from weblate.trans.models import IndexUpdate, Unit
-from weblate.trans.search import update_index
+from weblate.trans.search import IndexUpdater
+from weblate.trans.util import iterate_chunks
+import weblate
+import time
 
 
 class Command(BaseCommand):
     help = 'updates index for fulltext search'
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--batch',
+            type='int',
+            dest='batch',
+            default=1000,
+            help='Number of updates to process at once'
+        ),
+        make_option(
+            '--daemon',
+            action='store_true',
+            dest='daemon',
+            default=False,
+            help='Keep running and process updates as they come'
+        ),
+        make_option(
+            '--sleep',
+            type='int',
+            dest='sleep',
+            default=10,
+            help='Seconds to wait for new updates in daemon mode'
+        ),
+        make_option(
+            '--commit',
+            type='int',
+            dest='commit',
+            default=60,
+            help='Seconds between index commits in daemon mode'
+        ),
+        make_option(
+            '--optimize',
+            type='int',
+            dest='optimize',
+            default=86400,
+            help='Seconds between merging index segments in daemon mode'
+        ),
+        make_option(
+            '--stats',
+            action='store_true',
+            dest='stats',
+            default=False,
+            help='Only show queue statistics'
+        ),
+    )
 
     def handle(self, *args, **options):
-        indexupdates = set()
-        unit_ids = set()
-        source_unit_ids = set()
+        if options['stats']:
+            stats = IndexUpdate.objects.get_stats()
+            self.stdout.write('Pending updates: {0}'.format(stats['pending']))
+            self.stdout.write('Index lag: {0}'.format(stats['latency']))
+            return
 
-        # Grab all updates from the database
-        for update in IndexUpdate.objects.iterator():
-            indexupdates.add(update.pk)
-            unit_ids.add(update.unit_id)
+        updater = IndexUpdater(limit=options['batch'])
 
-            if update.source:
-                source_unit_ids.add(update.unit_id)
+        # Updates already added to the writers, but not yet committed
+        self.processed = []
+        self.last_id = 0
 
-        # Filter matching units
+        last_commit = last_optimize = time.time()
+
+        try:
+            while True:
+                processed = self.process_batch(updater, options['batch'])
+
+                if processed:
+                    stats = IndexUpdate.objects.get_stats()
+                    weblate.logger.info(
+                        'indexed %d units, %d pending, lag %s',
+                        processed,
+                        stats['pending'],
+                        stats['latency'],
+                    )
+                    if (options['daemon'] and
+                            time.time() - last_commit > options['commit']):
+                        self.commit(updater.commit)
+                        last_commit = time.time()
+                    continue
+
+                if not options['daemon']:
+                    break
+
+                # Nothing to do, flush buffers, release index locks and wait
+                if time.time() - last_optimize > options['optimize']:
+                    self.commit(updater.optimize)
+                    last_optimize = time.time()
+                else:
+                    self.commit(updater.close)
+                last_commit = time.time()
+                time.sleep(options['sleep'])
+        finally:
+            self.commit(updater.close)
+
+    def commit(self, method):
+        '''
+        Writes index to disk using given method and removes committed
+        updates from the queue.
+        '''
+        method()
+        for chunk in iterate_chunks(self.processed):
+            IndexUpdate.objects.filter(id__in=chunk).delete()
+        self.processed = []
+
+    def process_batch(self, updater, size):
+        '''
+        Processes single batch of updates, returns number of processed
+        updates.
+
+        The updates are removed from the queue only once the index is
+        committed, so they are processed again if the indexer crashes.
+        '''
+        updates = list(
+            IndexUpdate.objects.filter(
+                id__gt=self.last_id
+            ).order_by('id').values_list(
+                'id', 'unit_id', 'source'
+            )[:size]
+        )
+        if not updates:
+            return 0
+
+        source_ids = set(
+            [unit_id for pk, unit_id, source in updates if source]
+        )
         units = Unit.objects.filter(
-            id__in=unit_ids
+            id__in=[unit_id for pk, unit_id, source in updates]
+        ).select_related(
+            'translation__language'
         )
-        source_units = Unit.objects.filter(
-            id__in=source_unit_ids
+        units = list(units)
+
+        updater.update(
+            units,
+            [unit for unit in units if unit.id in source_ids]
         )
 
-        # Udate index
-        update_index(units, source_units)
+        self.processed.extend([pk for pk, unit_id, source in updates])
+        self.last_id = updates[-1][0]
 
-        # Delete processed updates
-        IndexUpdate.objects.filter(id__in=indexupdates).delete()
+        return len(updates)
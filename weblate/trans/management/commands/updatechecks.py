@@ -19,6 +19,7 @@
 #
 
 from weblate.trans.management.commands import WeblateLangCommand
+from weblate.trans.models import Unit
 
 
 class Command(WeblateLangCommand):
@@ -27,6 +28,5 @@ class Command(WeblateLangCommand):
     def handle(self, *args, **options):
         units = self.get_units(*args, **options)
 
-        # Invoke check for every unit
-        for unit in units.iterator():
-            unit.run_checks()
+        # Invoke checks for all units in batches
+        Unit.objects.run_checks_units(units)
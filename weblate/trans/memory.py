@@ -0,0 +1,459 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2014 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <http://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+'''
+In memory translation memory built from translated units.
+
+Each process keeps per language index of translations keyed by source
+string. Fuzzy matches are found using trigrams of normalized source
+strings and scored by difflib. Changes done in other processes are
+detected using version counter stored in the cache, ids of changed units
+are stored in the cache for each version as well, so that only changed
+units are reloaded.
+'''
+
+from django.core.cache import cache
+from weblate.trans.util import split_plural
+import difflib
+import itertools
+import threading
+import time
+
+# Loaded memories, indexed by language code
+MEMORY = {}
+# Per language locks serializing loading of memories
+LOAD_LOCKS = {}
+# Protects MEMORY and LOAD_LOCKS dictionaries
+MEMORY_LOCK = threading.Lock()
+
+# Minimal number of seconds between reloads caused by other processes
+RELOAD_INTERVAL = 60
+
+# Maximal number of changes applied incrementally, memory is loaded
+# again otherwise
+MAX_CHANGES = 1000
+
+# How long are version counters and changed unit ids kept in the cache
+VERSION_TIMEOUT = 30 * 24 * 3600
+CHANGES_TIMEOUT = 24 * 3600
+
+# Maximal number of candidates scored for fuzzy match
+FUZZY_CANDIDATES = 50
+
+# Maximal number of trigram postings scanned for fuzzy match, only the
+# rarest trigrams are used for finding candidates
+FUZZY_POSTINGS = 5000
+
+# Number of units loaded from the database in single query
+LOAD_BATCH = 5000
+
+
+def normalize(text):
+    '''
+    Normalizes source string for lookup.
+    '''
+    return u' '.join(text.lower().split())
+
+
+def get_trigrams(text):
+    '''
+    Returns set of trigrams in normalized text.
+    '''
+    padded = u'  %s ' % text
+    return set([padded[pos:pos + 3] for pos in range(len(padded) - 2)])
+
+
+def get_version_key(code):
+    '''
+    Returns cache key for memory version.
+    '''
+    return 'translation-memory-%s' % code
+
+
+def get_changes_key(code, version):
+    '''
+    Returns cache key for unit changed in given memory version.
+    '''
+    return 'translation-memory-%s-%d' % (code, version)
+
+
+def get_version(code):
+    '''
+    Returns current memory version for language.
+    '''
+    return cache.get(get_version_key(code))
+
+
+def next_version(code):
+    '''
+    Increments memory version for language and returns new value.
+
+    The counter starts from current time, so that versions are not reused
+    after the counter has expired.
+    '''
+    key = get_version_key(code)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Counter does not exist yet or has expired
+        version = int(time.time() * 1000)
+        if cache.add(key, version, VERSION_TIMEOUT):
+            return version
+        # Other process has started the counter meanwhile
+        return cache.incr(key)
+
+
+class TranslationMemory(object):
+    '''
+    Translation memory for single language.
+    '''
+    def __init__(self, code):
+        self.code = code
+        self.lock = threading.Lock()
+        self.version = None
+        self.timestamp = 0
+        # Unit id -> (first source plural, source, target, origin,
+        # project id)
+        self.entries = {}
+        # First source plural -> set of unit ids
+        self.sources = {}
+        # Normalized source -> set of first source plurals
+        self.normalized = {}
+        # Trigram -> set of normalized sources
+        self.trigrams = {}
+
+    def load(self):
+        '''
+        Loads all translated units in the language.
+
+        The units are loaded in batches to avoid fetching whole language
+        in single query.
+        '''
+        self.version = get_version(self.code)
+        self.timestamp = time.time()
+        self.entries = {}
+        self.sources = {}
+        self.normalized = {}
+        self.trigrams = {}
+        last = 0
+        while True:
+            rows = self.get_units(after=last)
+            for row in rows:
+                self.add(*row)
+            if len(rows) < LOAD_BATCH:
+                break
+            last = rows[-1][0]
+
+    def get_units(self, ids=None, after=None):
+        '''
+        Returns list of (id, source, target, origin, project id) for
+        translated units in the language, optionally limited to ids or to
+        batch of units following given id.
+        '''
+        from weblate.trans.models.unit import Unit
+        units = Unit.objects.filter(
+            translation__language__code=self.code,
+            translated=True,
+        )
+        if ids is not None:
+            units = units.filter(id__in=ids)
+        if after is not None:
+            units = units.filter(id__gt=after).order_by('id')[:LOAD_BATCH]
+        units = units.values_list(
+            'id',
+            'source',
+            'target',
+            'translation__subproject__project__name',
+            'translation__subproject__name',
+            'translation__subproject__project_id',
+        )
+        return [
+            (
+                pk, source, target, u'%s/%s' % (project, subproject),
+                project_id
+            )
+            for pk, source, target, project, subproject, project_id in units
+        ]
+
+    def is_outdated(self):
+        '''
+        Checks whether memory was changed by other process.
+        '''
+        if time.time() - self.timestamp < RELOAD_INTERVAL:
+            return False
+        if get_version(self.code) == self.version:
+            self.timestamp = time.time()
+            return False
+        return True
+
+    def get_changes(self, version):
+        '''
+        Returns set of unit ids changed since loaded version or None if
+        these are not known and memory has to be loaded again.
+        '''
+        if self.version is None or version is None:
+            return None
+        if not 0 <= version - self.version <= MAX_CHANGES:
+            return None
+        keys = [
+            get_changes_key(self.code, pos)
+            for pos in range(self.version + 1, version + 1)
+        ]
+        changes = cache.get_many(keys)
+        if len(changes) != len(keys):
+            return None
+        result = set()
+        for ids in changes.values():
+            result.update(ids)
+        if len(result) > MAX_CHANGES:
+            return None
+        return result
+
+    def update(self, ids, version):
+        '''
+        Reloads given units from the database.
+        '''
+        units = self.get_units(ids) if ids else []
+        with self.lock:
+            for pk in ids:
+                self.remove(pk)
+            for row in units:
+                self.add(*row)
+            self.version = version
+            self.timestamp = time.time()
+
+    def add(self, pk, source, target, origin, project_id):
+        '''
+        Adds or replaces translation in the memory.
+        '''
+        self.remove(pk)
+        key = split_plural(source)[0]
+        self.entries[pk] = (key, source, target, origin, project_id)
+        if key not in self.sources:
+            self.sources[key] = set()
+            normalized = normalize(key)
+            if normalized not in self.normalized:
+                self.normalized[normalized] = set()
+                for trigram in get_trigrams(normalized):
+                    self.trigrams.setdefault(trigram, set()).add(normalized)
+            self.normalized[normalized].add(key)
+        self.sources[key].add(pk)
+
+    def remove(self, pk):
+        '''
+        Removes translation from the memory.
+        '''
+        if pk not in self.entries:
+            return
+        key = self.entries.pop(pk)[0]
+        self.sources[key].discard(pk)
+        if self.sources[key]:
+            return
+        del self.sources[key]
+        normalized = normalize(key)
+        self.normalized[normalized].discard(key)
+        if not self.normalized[normalized]:
+            del self.normalized[normalized]
+            for trigram in get_trigrams(normalized):
+                self.trigrams[trigram].discard(normalized)
+
+    def lookup(self, text, exact=True, threshold=75):
+        '''
+        Returns list of (quality, id, source, target, origin, project id)
+        matching text.
+
+        Either exact matches or only fuzzy ones are returned.
+        '''
+        if exact:
+            with self.lock:
+                return [
+                    (100, pk) + self.entries[pk][1:]
+                    for pk in self.sources.get(text, ())
+                ]
+
+        with self.lock:
+            candidates = self.get_candidates(normalize(text))
+            matches = [
+                (key, [(pk,) + self.entries[pk][1:] for pk in pks])
+                for key, pks in candidates
+                if key != text
+            ]
+
+        # Score candidates outside of the lock
+        result = []
+        for key, entries in matches:
+            quality = int(
+                100 * difflib.SequenceMatcher(None, text, key).ratio()
+            )
+            if quality < threshold:
+                continue
+            for entry in entries:
+                result.append((quality,) + entry)
+        result.sort(key=lambda item: item[0], reverse=True)
+        return result
+
+    def get_candidates(self, normalized):
+        '''
+        Returns list of (first source plural, unit ids) sharing most
+        trigrams with normalized text.
+
+        Only rarest trigrams are used, so that the number of scanned
+        postings is limited.
+        '''
+        trigrams = sorted(
+            [
+                trigram for trigram in get_trigrams(normalized)
+                if self.trigrams.get(trigram)
+            ],
+            key=lambda trigram: len(self.trigrams[trigram])
+        )
+        shared = {}
+        scanned = 0
+        for trigram in trigrams:
+            postings = self.trigrams[trigram]
+            if scanned and scanned + len(postings) > FUZZY_POSTINGS:
+                break
+            scanned += len(postings)
+            for candidate in itertools.islice(postings, FUZZY_POSTINGS):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        candidates = sorted(
+            shared, key=lambda item: shared[item], reverse=True
+        )[:FUZZY_CANDIDATES]
+
+        return [
+            (key, list(self.sources[key]))
+            for candidate in candidates
+            for key in self.normalized[candidate]
+        ]
+
+
+def get_load_lock(code):
+    '''
+    Returns lock used for loading memory for language.
+    '''
+    with MEMORY_LOCK:
+        return LOAD_LOCKS.setdefault(code, threading.Lock())
+
+
+def load_memory(code):
+    '''
+    Loads memory for language and makes it available for lookups.
+    '''
+    memory = TranslationMemory(code)
+    memory.load()
+    with MEMORY_LOCK:
+        MEMORY[code] = memory
+    return memory
+
+
+def refresh_memory(memory):
+    '''
+    Applies changes done by other processes to the memory.
+
+    The current memory is used while other thread is refreshing it.
+    '''
+    load_lock = get_load_lock(memory.code)
+    if not load_lock.acquire(False):
+        return memory
+    try:
+        version = get_version(memory.code)
+        changes = memory.get_changes(version)
+        if changes is None:
+            return load_memory(memory.code)
+        memory.update(changes, version)
+        return memory
+    finally:
+        load_lock.release()
+
+
+def get_memory(code):
+    '''
+    Returns loaded translation memory for language.
+    '''
+    memory = MEMORY.get(code)
+    if memory is None:
+        with get_load_lock(code):
+            memory = MEMORY.get(code)
+            if memory is None:
+                memory = load_memory(code)
+    elif memory.is_outdated():
+        memory = refresh_memory(memory)
+    return memory
+
+
+def lookup(code, text, exact=True, threshold=75):
+    '''
+    Looks up translations in memory for given language.
+    '''
+    return get_memory(code).lookup(text, exact, threshold)
+
+
+def update_memory_unit(unit):
+    '''
+    Updates memory after unit has been changed.
+    '''
+    update_memory_units(unit.translation.language.code, [unit])
+
+
+def update_memory_units(code, units, deleted=()):
+    '''
+    Updates memory after units in single language have been changed or
+    deleted.
+
+    All changes are recorded as single version, the memory is invalidated
+    if there are too many of them.
+    '''
+    ids = [unit.id for unit in units] + list(deleted)
+    if not ids:
+        return
+    if len(ids) > MAX_CHANGES:
+        invalidate_memory(code)
+        return
+    version = next_version(code)
+    cache.set(get_changes_key(code, version), ids, CHANGES_TIMEOUT)
+    memory = MEMORY.get(code)
+    if memory is None:
+        return
+    with memory.lock:
+        for unit in units:
+            if unit.translated:
+                subproject = unit.translation.subproject
+                memory.add(
+                    unit.id,
+                    unit.source,
+                    unit.target,
+                    unicode(subproject),
+                    subproject.project_id,
+                )
+            else:
+                memory.remove(unit.id)
+        for pk in deleted:
+            memory.remove(pk)
+        # Changes done meanwhile by other processes are applied on refresh
+        if memory.version == version - 1:
+            memory.version = version
+
+
+def invalidate_memory(code):
+    '''
+    Invalidates memory for language after bulk changes.
+    '''
+    next_version(code)
+    with MEMORY_LOCK:
+        MEMORY.pop(code, None)
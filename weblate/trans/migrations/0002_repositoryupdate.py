@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trans', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RepositoryUpdate',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('started', models.DateTimeField(db_index=True, null=True, blank=True)),
+                ('subproject', models.ForeignKey(to='trans.SubProject')),
+            ],
+            options={
+            },
+            bases=(models.Model,),
+        ),
+    ]
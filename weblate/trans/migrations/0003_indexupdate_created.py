@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trans', '0002_repositoryupdate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='indexupdate',
+            name='created',
+            field=models.DateTimeField(default=django.utils.timezone.now, auto_now_add=True, db_index=True),
+            preserve_default=False,
+        ),
+    ]
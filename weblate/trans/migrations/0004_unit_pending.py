@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trans', '0003_indexupdate_created'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='unit',
+            name='pending',
+            field=models.BooleanField(default=False, db_index=True),
+            preserve_default=True,
+        ),
+    ]
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trans', '0004_unit_pending'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchResult',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('search_id', models.CharField(unique=True, max_length=40)),
+                ('name', models.TextField(null=True)),
+                ('query', models.TextField(null=True)),
+                ('ids', models.BinaryField()),
+                ('expires', models.DateTimeField(db_index=True)),
+                ('translation', models.ForeignKey(to='trans.Translation')),
+            ],
+            options={
+            },
+            bases=(models.Model,),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+from django.conf import settings
+from django.utils import timezone
+
+
+def fill_daily_activity(apps, schema_editor):
+    '''
+    Counts existing changes into daily activity.
+    '''
+    Change = apps.get_model('trans', 'Change')
+    DailyActivity = apps.get_model('trans', 'DailyActivity')
+    counts = {}
+    changes = Change.objects.order_by().values_list(
+        'timestamp', 'translation_id', 'user_id'
+    )
+    for timestamp, translation_id, user_id in changes.iterator():
+        if settings.USE_TZ:
+            timestamp = timezone.localtime(timestamp)
+        key = (timestamp.date(), translation_id, user_id)
+        counts[key] = counts.get(key, 0) + 1
+    DailyActivity.objects.bulk_create([
+        DailyActivity(
+            date=key[0],
+            translation_id=key[1],
+            user_id=key[2],
+            count=count,
+        )
+        for key, count in counts.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('trans', '0005_searchresult'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyActivity',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('date', models.DateField(db_index=True)),
+                ('count', models.IntegerField(default=0)),
+                ('translation', models.ForeignKey(to='trans.Translation', null=True)),
+                ('user', models.ForeignKey(to=settings.AUTH_USER_MODEL, null=True)),
+            ],
+            options={
+            },
+            bases=(models.Model,),
+        ),
+        migrations.RunPython(fill_daily_activity),
+    ]
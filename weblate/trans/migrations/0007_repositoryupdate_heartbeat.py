@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trans', '0006_dailyactivity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='repositoryupdate',
+            name='heartbeat',
+            field=models.DateTimeField(db_index=True, null=True, blank=True),
+            preserve_default=True,
+        ),
+    ]
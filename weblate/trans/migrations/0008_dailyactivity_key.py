@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+from django.conf import settings
+from django.utils import timezone
+
+
+def clear_daily_activity(apps, schema_editor):
+    '''
+    Removes daily activity, it is counted again with unique keys.
+    '''
+    apps.get_model('trans', 'DailyActivity').objects.all().delete()
+
+
+def fill_daily_activity(apps, schema_editor):
+    '''
+    Counts existing changes into daily activity.
+    '''
+    Change = apps.get_model('trans', 'Change')
+    DailyActivity = apps.get_model('trans', 'DailyActivity')
+    counts = {}
+    changes = Change.objects.order_by().values_list(
+        'timestamp', 'translation_id', 'user_id'
+    )
+    for timestamp, translation_id, user_id in changes.iterator():
+        if settings.USE_TZ:
+            timestamp = timezone.localtime(timestamp)
+        key = (timestamp.date(), translation_id, user_id)
+        counts[key] = counts.get(key, 0) + 1
+    DailyActivity.objects.bulk_create([
+        DailyActivity(
+            key='{0}-{1}-{2}'.format(key[0].isoformat(), key[1], key[2]),
+            date=key[0],
+            translation_id=key[1],
+            user_id=key[2],
+            count=count,
+        )
+        for key, count in counts.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trans', '0007_repositoryupdate_heartbeat'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_daily_activity),
+        migrations.AddField(
+            model_name='dailyactivity',
+            name='key',
+            field=models.CharField(default='', unique=True, max_length=100),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_daily_activity),
+    ]
@@ -21,7 +21,8 @@
 __all__ = [
     'Project', 'SubProject', 'Translation', 'Unit', 'Check', 'Suggestion',
     'Comment', 'Vote', 'IndexUpdate', 'Change', 'Dictionary', 'Source',
-    'Advertisement', 'WhiteboardMessage',
+    'Advertisement', 'WhiteboardMessage', 'RepositoryUpdate', 'SearchResult',
+    'DailyActivity',
 ]
 
 import os
@@ -37,12 +38,15 @@ from weblate.trans.models.unit import Unit
 from weblate.trans.models.unitdata import (
     Check, Suggestion, Comment, Vote
 )
-from weblate.trans.models.search import IndexUpdate
-from weblate.trans.models.changes import Change
+from weblate.trans.models.search import IndexUpdate, SearchResult
+from weblate.trans.models.changes import Change, DailyActivity
 from weblate.trans.models.dictionary import Dictionary
 from weblate.trans.models.source import Source
 from weblate.trans.models.advertisement import Advertisement
 from weblate.trans.models.whiteboard import WhiteboardMessage
+from weblate.trans.models.updates import RepositoryUpdate
+from weblate.trans.glossary import invalidate_glossary
+from weblate.trans.stats import invalidate_stats
 
 
 @receiver(post_delete, sender=Project)
@@ -127,3 +131,29 @@ def update_suggestion_flag(sender, instance, **kwargs):
     for unit in get_related_units(instance):
         # Update unit stats
         unit.update_has_suggestion()
+
+
+@receiver(post_save, sender=Change)
+def update_daily_activity(sender, instance, created, **kwargs):
+    """
+    Counts new change in daily activity.
+    """
+    if created:
+        DailyActivity.objects.add_changes([instance])
+
+
+@receiver(post_delete, sender=Dictionary)
+@receiver(post_save, sender=Dictionary)
+def update_glossary(sender, instance, **kwargs):
+    """
+    Invalidates glossary index on dictionary change.
+    """
+    invalidate_glossary(instance.project_id, instance.language_id)
+
+
+@receiver(post_delete, sender=Translation)
+def delete_translation_stats(sender, instance, **kwargs):
+    """
+    Invalidates stats rollups on translation removal.
+    """
+    invalidate_stats(instance)
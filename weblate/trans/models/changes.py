@@ -18,15 +18,37 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
-from django.db import models
+from django.db import models, connection
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.db.models import Count, Q
+from django.db.models import Count, Sum, Max, Q, F
 from django.utils.translation import ugettext as _, ugettext_lazy
 from django.utils import timezone
+from datetime import date, datetime
 from weblate.trans.models.project import Project
 from weblate.accounts.avatar import get_user_display
 
 
+def to_date(value):
+    '''
+    Converts database day value to date.
+    '''
+    if isinstance(value, datetime):
+        return value.date()
+    elif isinstance(value, date):
+        return value
+    return datetime.strptime(value[:10], '%Y-%m-%d').date()
+
+
+def get_change_date(timestamp):
+    '''
+    Returns date of change timestamp in current timezone.
+    '''
+    if timezone.is_aware(timestamp):
+        timestamp = timezone.localtime(timestamp)
+    return timestamp.date()
+
+
 class ChangeManager(models.Manager):
     def content(self, prefetch=False):
         '''
@@ -47,11 +69,75 @@ class ChangeManager(models.Manager):
             user__isnull=False,
         )
 
+    def last_translation_changes(self, translations):
+        '''
+        Returns dictionary of last content change for translations.
+
+        Only two queries are needed regardless number of translations.
+        '''
+        ids = self.content().filter(
+            translation__in=translations
+        ).order_by().values('translation').annotate(
+            Max('id')
+        ).values_list('id__max', flat=True)
+        changes = self.filter(id__in=list(ids)).select_related('author')
+        return dict([(change.translation_id, change) for change in changes])
+
+    def get_daily_counts(self):
+        '''
+        Returns number of changes grouped by day, translation and user.
+
+        The result is list of tuples (date, translation_id, user_id,
+        count).
+        '''
+        column = '%s.%s' % (
+            connection.ops.quote_name(self.model._meta.db_table),
+            connection.ops.quote_name('timestamp'),
+        )
+        if settings.USE_TZ:
+            day, params = connection.ops.datetime_trunc_sql(
+                'day', column, timezone.get_current_timezone_name()
+            )
+        else:
+            day, params = connection.ops.date_trunc_sql('day', column), []
+
+        counts = self.order_by().extra(
+            select={'day': day},
+            select_params=params,
+        ).values(
+            'day', 'translation', 'user'
+        ).annotate(
+            Count('id')
+        )
+
+        return [
+            (
+                to_date(item['day']),
+                item['translation'],
+                item['user'],
+                item['id__count'],
+            )
+            for item in counts
+        ]
+
     def count_stats(self, days, step, dtstart, base):
         '''
         Counts number of changes in given dataset and period grouped by
         step days.
+
+        The base is queryset of daily activity.
         '''
+        # Get daily counts in single query
+        daily = dict(
+            base.filter(
+                date__gte=dtstart,
+                date__lt=dtstart + timezone.timedelta(days=days),
+            ).values_list(
+                'date'
+            ).annotate(
+                Sum('count')
+            ).order_by()
+        )
 
         # Count number of changes
         result = []
@@ -61,11 +147,13 @@ class ChangeManager(models.Manager):
             int_end = int_start + timezone.timedelta(days=step)
 
             # Count changes
-            int_base = base.filter(timestamp__range=(int_start, int_end))
-            count = int_base.aggregate(Count('id'))
+            count = sum([
+                daily.get(int_start + timezone.timedelta(days=offset), 0)
+                for offset in xrange(step)
+            ])
 
             # Append to result
-            result.append((int_start, count['id__count']))
+            result.append((int_start, count))
 
             # Advance to next interval
             dtstart = int_end
@@ -84,7 +172,7 @@ class ChangeManager(models.Manager):
         dtstart = dtend - timezone.timedelta(days=days)
 
         # Base for filtering
-        base = self.all()
+        base = DailyActivity.objects.all()
 
         # Filter by translation/project
         if translation is not None:
@@ -240,3 +328,83 @@ class Change(models.Model):
                 self.dictionary.language
             )
         return None
+
+
+def get_activity_key(day, translation_id, user_id):
+    '''
+    Returns unique key of daily activity record.
+
+    The key is used instead of unique constraint on the fields as these
+    can be NULL.
+    '''
+    return '{0}-{1}-{2}'.format(day.isoformat(), translation_id, user_id)
+
+
+class DailyActivityManager(models.Manager):
+    def add_changes(self, changes):
+        '''
+        Adds changes to daily activity counts.
+        '''
+        counts = {}
+        for change in changes:
+            key = (
+                get_change_date(change.timestamp),
+                change.translation_id,
+                change.user_id,
+            )
+            counts[key] = counts.get(key, 0) + 1
+
+        for key, count in counts.items():
+            day, translation_id, user_id = key
+            activity_key = get_activity_key(day, translation_id, user_id)
+            # Record usually exists, so try updating it first
+            if self.filter(key=activity_key).update(count=F('count') + count):
+                continue
+            activity, created = self.get_or_create(
+                key=activity_key,
+                defaults={
+                    'date': day,
+                    'translation_id': translation_id,
+                    'user_id': user_id,
+                    'count': count,
+                }
+            )
+            # Created concurrently by other process
+            if not created:
+                self.filter(pk=activity.pk).update(count=F('count') + count)
+
+    def rebuild(self):
+        '''
+        Rebuilds daily activity counts from all changes.
+        '''
+        self.all().delete()
+        self.bulk_create([
+            DailyActivity(
+                key=get_activity_key(day, translation_id, user_id),
+                date=day,
+                translation_id=translation_id,
+                user_id=user_id,
+                count=count,
+            )
+            for day, translation_id, user_id, count
+            in Change.objects.get_daily_counts()
+        ])
+
+
+class DailyActivity(models.Model):
+    '''
+    Number of changes for each day, translation and user.
+    '''
+    key = models.CharField(max_length=100, unique=True)
+    date = models.DateField(db_index=True)
+    translation = models.ForeignKey('Translation', null=True)
+    user = models.ForeignKey(User, null=True)
+    count = models.IntegerField(default=0)
+
+    objects = DailyActivityManager()
+
+    class Meta(object):
+        app_label = 'trans'
+
+    def __unicode__(self):
+        return '%s: %d' % (self.date, self.count)
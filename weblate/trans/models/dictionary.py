@@ -19,13 +19,12 @@
 #
 
 from django.db import models
-from django.db.models import Q
 from weblate.lang.models import Language
 from weblate.trans.formats import AutoFormat, StringIOMode
 from weblate.trans.models.project import Project
 from translate.storage.csvl10n import csvfile
 from django.core.urlresolvers import reverse
-from whoosh.analysis import StandardAnalyzer, StemmingAnalyzer
+from weblate.trans import glossary
 
 
 class DictionaryManager(models.Manager):
@@ -62,47 +61,48 @@ class DictionaryManager(models.Manager):
         ret = 0
         skipped = 0
 
-        # process all units
-        for unit in store.units:
-            # We care only about translated things
-            if not unit.istranslatable() or not unit.istranslated():
-                skipped += 1
-                continue
-
-            # Ignore too long words
-            if len(unit.source) > 200 or len(unit.target) > 200:
-                continue
-
-            # Get object
-            word, created = self.get_or_create(
-                project=project,
-                language=language,
-                source=unit.source
-            )
-
-            # Already existing entry found
-            if not created:
-                # Same as current -> ignore
-                if unit.target == word.target:
-                    continue
-                if method == 'add':
-                    # Add word
-                    word = self.create(
-                        request,
-                        action=Change.ACTION_DICTIONARY_UPLOAD,
-                        project=project,
-                        language=language,
-                        source=unit.source
-                    )
-                elif method != 'overwrite':
-                    # No overwriting or adding
+        # process all units, glossary is invalidated once at the end
+        with glossary.deferred_invalidation():
+            for unit in store.units:
+                # We care only about translated things
+                if not unit.istranslatable() or not unit.istranslated():
+                    skipped += 1
                     continue
 
-            # Store word
-            word.target = unit.target
-            word.save()
+                # Ignore too long words
+                if len(unit.source) > 200 or len(unit.target) > 200:
+                    continue
 
-            ret += 1
+                # Get object
+                word, created = self.get_or_create(
+                    project=project,
+                    language=language,
+                    source=unit.source
+                )
+
+                # Already existing entry found
+                if not created:
+                    # Same as current -> ignore
+                    if unit.target == word.target:
+                        continue
+                    if method == 'add':
+                        # Add word
+                        word = self.create(
+                            request,
+                            action=Change.ACTION_DICTIONARY_UPLOAD,
+                            project=project,
+                            language=language,
+                            source=unit.source
+                        )
+                    elif method != 'overwrite':
+                        # No overwriting or adding
+                        continue
+
+                # Store word
+                word.target = unit.target
+                word.save()
+
+                ret += 1
 
         return ret, skipped
 
@@ -123,40 +123,26 @@ class DictionaryManager(models.Manager):
 
     def get_words(self, unit):
         """
-        Returns list of word pairs for an unit.
-        """
-        words = set()
-
-        # Prepare analyzers
-        # - standard analyzer simply splits words
-        # - stemming extracts stems, to catch things like plurals
-        analyzers = (StandardAnalyzer(), StemmingAnalyzer())
-
-        # Extract words from all plurals and from context
-        for text in unit.get_source_plurals() + [unit.context]:
-            for analyzer in analyzers:
-                words = words.union([token.text for token in analyzer(text)])
-
-        # Grab all words in the dictionary
-        dictionary = self.filter(
-            project=unit.translation.subproject.project,
-            language=unit.translation.language
-        )
+        Returns list of dictionary words for an unit.
 
-        if len(words) == 0:
-            # No extracted words, no dictionary
-            dictionary = dictionary.none()
-        else:
-            # Build the query for fetching the words
-            # Can not use __in as we want case insensitive lookup
-            query = Q()
-            for word in words:
-                query |= Q(source__iexact=word)
-
-            # Filter dictionary
-            dictionary = dictionary.filter(query)
-
-        return dictionary
+        The words are looked up using in memory glossary index, no database
+        query is needed once the index is loaded.
+        """
+        translation = unit.translation
+        project_id = translation.subproject.project_id
+        language_id = translation.language_id
+        return [
+            Dictionary(
+                id=pk,
+                project_id=project_id,
+                language_id=language_id,
+                source=source,
+                target=target,
+            )
+            for pk, source, target in glossary.get_words(
+                project_id, language_id, glossary.get_unit_texts(unit)
+            )
+        ]
 
 
 class Dictionary(models.Model):
@@ -34,6 +34,7 @@ from weblate.lang.models import Language
 from weblate.trans.validators import validate_commit_message
 from weblate.trans.mixins import PercentMixin, URLMixin, PathMixin
 from weblate.trans.util import get_site_url
+from weblate.trans.stats import get_stats
 
 
 DEFAULT_COMMIT_MESSAGE = (
@@ -357,14 +358,7 @@ class Project(models.Model, PercentMixin, URLMixin, PathMixin):
         Calculates total number of strings to translate. This is done based on
         assumption that all languages have same number of strings.
         """
-        from weblate.trans.models.translation import Translation
-        total = 0
-        for resource in self.subproject_set.all():
-            try:
-                total += resource.translation_set.all()[0].total
-            except Translation.DoesNotExist:
-                pass
-        return total
+        return get_stats(project=self)['strings']
 
     def get_languages(self):
         """
@@ -18,15 +18,173 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+from datetime import timedelta
+import hashlib
+import struct
+
 from django.db import models
+from django.db.models import Min
+from django.utils import timezone
+
+# How long are search results kept
+SEARCH_RESULT_TTL = timedelta(days=1)
+
+
+class IndexUpdateManager(models.Manager):
+    def get_stats(self):
+        '''
+        Returns queue statistics as dictionary.
+        '''
+        oldest = self.aggregate(Min('created'))['created__min']
+        if oldest is None:
+            latency = timedelta(0)
+        else:
+            latency = timezone.now() - oldest
+        return {
+            'pending': self.count(),
+            'latency': latency,
+        }
 
 
 class IndexUpdate(models.Model):
     unit = models.ForeignKey('Unit', unique=True)
     source = models.BooleanField(default=True)
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    objects = IndexUpdateManager()
 
     class Meta(object):
         app_label = 'trans'
 
     def __unicode__(self):
         return self.unit.__unicode__()
+
+
+class SearchResultManager(models.Manager):
+    def get_search_id(self, translation, key):
+        '''
+        Returns search ID for search key.
+
+        The key identifies the query, ID is same for identical queries on
+        translation in same state.
+        '''
+        last_change = translation.change_set.order_by(
+            '-pk'
+        ).values_list(
+            'pk', flat=True
+        )[:1]
+        state = (
+            translation.pk,
+            translation.revision,
+            translation.total,
+            translation.translated,
+            translation.fuzzy,
+            translation.failing_checks,
+            translation.have_suggestion,
+            list(last_change),
+            key,
+        )
+        return hashlib.sha1(repr(state)).hexdigest()
+
+    def lookup(self, translation, search_id):
+        '''
+        Returns stored search result or None.
+        '''
+        try:
+            return self.get(
+                search_id=search_id,
+                translation=translation,
+                expires__gt=timezone.now(),
+            )
+        except self.model.DoesNotExist:
+            return None
+
+    def store(self, translation, search_id, name, query, ids):
+        '''
+        Stores search result for later navigation.
+        '''
+        # Remove expired results
+        self.filter(expires__lte=timezone.now()).delete()
+
+        result, dummy = self.get_or_create(
+            search_id=search_id,
+            defaults={
+                'translation': translation,
+                'name': name,
+                'query': query,
+                'ids': pack_ids(ids),
+                'expires': timezone.now() + SEARCH_RESULT_TTL,
+            }
+        )
+        return result
+
+
+def pack_ids(ids):
+    '''
+    Packs list of IDs into compact binary form.
+
+    Fixed width little endian integers are used, so that the data can be
+    read on any platform.
+    '''
+    if ids and max(ids) > 0xffffffff:
+        typecode = 'Q'
+    else:
+        typecode = 'I'
+    return typecode + struct.pack('<%d%s' % (len(ids), typecode), *ids)
+
+
+def unpack_ids(data):
+    '''
+    Unpacks list of IDs created by pack_ids.
+    '''
+    data = str(data)
+    typecode = data[0]
+    count = (len(data) - 1) // struct.calcsize('<' + typecode)
+    return struct.unpack('<%d%s' % (count, typecode), data[1:])
+
+
+class SearchResult(models.Model):
+    '''
+    Search result stored for navigation through results.
+    '''
+    search_id = models.CharField(max_length=40, unique=True)
+    translation = models.ForeignKey('Translation')
+    name = models.TextField(null=True)
+    query = models.TextField(null=True)
+    ids = models.BinaryField()
+    expires = models.DateTimeField(db_index=True)
+
+    objects = SearchResultManager()
+
+    class Meta(object):
+        app_label = 'trans'
+
+    def __unicode__(self):
+        return self.search_id
+
+    def __init__(self, *args, **kwargs):
+        super(SearchResult, self).__init__(*args, **kwargs)
+        self._unpacked = None
+
+    def get_ids(self):
+        '''
+        Returns tuple of unit IDs in result.
+        '''
+        if self._unpacked is None:
+            self._unpacked = unpack_ids(self.ids)
+        return self._unpacked
+
+    def __len__(self):
+        return len(self.get_ids())
+
+    def get_unit_id(self, offset):
+        '''
+        Returns unit ID at given offset.
+        '''
+        return self.get_ids()[offset]
+
+    def get_unit_ids(self, offset, count):
+        '''
+        Returns list of unit IDs starting at given offset.
+        '''
+        return list(self.get_ids()[offset:offset + count])
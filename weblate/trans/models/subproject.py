@@ -28,24 +28,46 @@ from django.core.cache import cache
 from django.utils import timezone
 from glob import glob
 import os
+import multiprocessing
+import functools
 import weblate
-from weblate.trans.formats import FILE_FORMAT_CHOICES, FILE_FORMATS
+from weblate.trans.formats import (
+    FILE_FORMAT_CHOICES, FILE_FORMATS, parse_units
+)
 from weblate.trans.mixins import PercentMixin, URLMixin, PathMixin
 from weblate.trans.filelock import FileLock
+from weblate.trans.lockstats import record_lock
 from weblate.trans.util import is_repo_link, get_site_url
 from weblate.trans.vcs import GitRepository, RepositoryException
 from weblate.trans.models.translation import Translation
+from weblate.trans.models.unit import Unit
 from weblate.trans.validators import (
     validate_repoweb, validate_filemask,
     validate_extra_file, validate_autoaccept,
     validate_check_flags,
 )
 from weblate.lang.models import Language
+from weblate import appsettings
 from weblate.appsettings import SCRIPT_CHOICES
 from weblate.accounts.models import notify_merge_failure
 from weblate.trans.models.changes import Change
 
 
+def parse_diff(format_id, filename, template_filename, language_code,
+               translation_id, dbunits):
+    '''
+    Parses translation file and compares it with database units.
+
+    Used for processing files in separate processes, see
+    SubProject.parse_translations.
+    '''
+    return Unit.objects.diff_units(
+        translation_id,
+        dbunits,
+        parse_units(format_id, filename, template_filename, language_code)
+    )
+
+
 class SubProjectManager(models.Manager):
     def get_linked(self, val):
         '''
@@ -340,7 +362,10 @@ class SubProject(models.Model, PercentMixin, URLMixin, PathMixin):
         if self._lock is None:
             self._lock = FileLock(
                 self.get_git_lock_path(),
-                timeout=20
+                timeout=20,
+                callback=functools.partial(
+                    record_lock, self.get_full_slug()
+                )
             )
         return self._lock
 
@@ -729,8 +754,29 @@ class SubProject(models.Model, PercentMixin, URLMixin, PathMixin):
         '''
         Loads translations from git.
         '''
-        translations = []
         matches = self.get_mask_matches()
+        if langs is None:
+            paths = matches
+        else:
+            paths = [
+                path for path in matches if self.get_lang_code(path) in langs
+            ]
+        pool, parsed = self.parse_translations(paths, force)
+        try:
+            self.sync_translations(matches, parsed, force, langs, request)
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+
+        weblate.logger.info('updating of %s completed', self)
+
+    def sync_translations(self, matches, parsed, force, langs, request):
+        '''
+        Updates translation objects for matched files, using already
+        parsed units if available.
+        '''
+        translations = []
         for pos, path in enumerate(matches):
             code = self.get_lang_code(path)
             if langs is not None and code not in langs:
@@ -745,8 +791,17 @@ class SubProject(models.Model, PercentMixin, URLMixin, PathMixin):
                 pos + 1,
                 len(matches)
             )
+            diff = None
+            if path in parsed:
+                try:
+                    diff = parsed.pop(path).get()
+                except Exception as error:
+                    # Parse it once more to get proper error handling
+                    weblate.logger.warning(
+                        'failed to parse %s in worker: %s', path, error
+                    )
             translation = Translation.objects.check_sync(
-                self, code, path, force, request=request
+                self, code, path, force, request=request, diff=diff
             )
             translations.append(translation.id)
 
@@ -768,7 +823,76 @@ class SubProject(models.Model, PercentMixin, URLMixin, PathMixin):
             )
             subproject.create_translations(force, langs, request=request)
 
-        weblate.logger.info('updating of %s completed', self)
+    def parse_translations(self, paths, force=False):
+        '''
+        Starts parsing of translation files and comparing them with the
+        database in separate processes.
+
+        Returns the process pool and dictionary of pending results for files
+        which need to be updated. The caller is responsible for terminating
+        the pool. Nothing is started unless IMPORT_WORKERS is set.
+        '''
+        if appsettings.IMPORT_WORKERS <= 1:
+            return None, {}
+
+        # Skip files which are already up to date, translations are matched
+        # by language code same as in TranslationManager.check_sync
+        existing = {}
+        translations = self.translation_set.values_list(
+            'language_code', 'id', 'filename', 'revision'
+        )
+        for code, pk, filename, revision in translations:
+            existing[code] = (pk, filename, revision)
+        updates = []
+        for path in paths:
+            pk, filename, revision = existing.get(
+                self.get_lang_code(path), (None, None, None)
+            )
+            if (force or filename != path or
+                    revision != self.get_git_blob_hash(path)):
+                updates.append((path, pk))
+        if len(updates) <= 1:
+            return None, {}
+
+        if self.has_template():
+            template = self.get_template_filename()
+        else:
+            template = None
+
+        pool = multiprocessing.Pool(appsettings.IMPORT_WORKERS)
+        result = {}
+        for path, pk in updates:
+            if pk is None:
+                dbunits = []
+            else:
+                dbunits = list(Unit.objects.filter(translation_id=pk))
+            result[path] = pool.apply_async(
+                parse_diff,
+                (
+                    self.file_format,
+                    os.path.join(self.get_path(), path),
+                    template,
+                    self.get_lang_code(path),
+                    pk,
+                    dbunits,
+                )
+            )
+        # No more tasks will be added
+        pool.close()
+        return pool, result
+
+    def get_git_blob_hash(self, filename):
+        '''
+        Returns current Git blob hash for file (and template if used).
+        '''
+        ret = self.repository.get_object_hash(
+            os.path.join(self.get_path(), filename)
+        )
+
+        if self.has_template():
+            ret += ','
+            ret += self.repository.get_object_hash(self.template)
+        return ret
 
     def get_lang_code(self, path):
         '''
@@ -1062,7 +1186,7 @@ class SubProject(models.Model, PercentMixin, URLMixin, PathMixin):
         '''
         Returns percentages of translation status.
         '''
-        return self.translation_set.get_percents()
+        return Translation.objects.get_percents(subproject=self)
 
     def git_needs_commit(self):
         '''
@@ -20,7 +20,7 @@
 
 from django.db import models
 from django.contrib.auth.models import User
-from django.db.models import Q, Sum, Count
+from django.db.models import Q, Sum, Count, F
 from django.utils.translation import ugettext as _
 from django.utils.safestring import mark_safe
 from django.core.exceptions import ValidationError
@@ -30,32 +30,50 @@ from django.core.urlresolvers import reverse
 import os
 import subprocess
 import traceback
+from contextlib import contextmanager
 from translate.storage import poheader
 from datetime import datetime, timedelta
 
 import weblate
 from weblate import appsettings
 from weblate.lang.models import Language
-from weblate.trans.formats import AutoFormat, StringIOMode
+from weblate.trans.formats import AutoFormat, StringIOMode, STORE_CACHE
 from weblate.trans.checks import CHECKS
 from weblate.trans.models.unit import Unit
+from weblate.trans.models.source import Source
 from weblate.trans.models.unitdata import Check, Suggestion, Comment
 from weblate.trans.util import (
     get_site_url, sleep_while_git_locked, translation_percent, split_plural,
+    iterate_chunks,
 )
 from weblate.trans.vcs import RepositoryException
+from weblate.trans.search import update_index_units
+from weblate.trans.memory import update_memory_units
+from weblate.trans.stats import get_percents, invalidate_stats
 from weblate.accounts.avatar import get_user_display
 from weblate.trans.mixins import URLMixin, PercentMixin
-from weblate.trans.boolean_sum import BooleanSum
+from weblate.trans.boolean_sum import BooleanSum, ConditionalSum
 from weblate.accounts.models import notify_new_string
-from weblate.trans.models.changes import Change
+from weblate.trans.models.changes import Change, DailyActivity
 from weblate.trans.util import get_clean_env
 
+# Unit flag, count field and words field in translation statistics
+STATS_FLAGS = (
+    ('translated', 'translated', 'translated_words'),
+    ('fuzzy', 'fuzzy', 'fuzzy_words'),
+    ('has_failing_check', 'failing_checks', 'failing_checks_words'),
+    ('has_suggestion', 'have_suggestion', None),
+)
+
 
 class TranslationManager(models.Manager):
-    def check_sync(self, subproject, code, path, force=False, request=None):
+    def check_sync(self, subproject, code, path, force=False, request=None,
+                   diff=None):
         '''
         Parses translation meta info and creates/updates translation object.
+
+        Optional diff contains units of the file already compared with the
+        database.
         '''
         lang = Language.objects.auto_get_or_create(code=code)
         translation, dummy = self.get_or_create(
@@ -66,7 +84,7 @@ class TranslationManager(models.Manager):
         if translation.filename != path:
             force = True
             translation.filename = path
-        translation.check_sync(force, request=request)
+        translation.check_sync(force, request=request, diff=diff)
 
         return translation
 
@@ -80,38 +98,10 @@ class TranslationManager(models.Manager):
         '''
         Returns tuple consting of status percents -
         (translated, fuzzy, failing checks)
-        '''
-        # Filter translations
-        translations = self
-        if project is not None:
-            translations = translations.filter(subproject__project=project)
-        if subproject is not None:
-            translations = translations.filter(subproject=subproject)
-        if language is not None:
-            translations = translations.filter(language=language)
-
-        # Aggregate
-        translations = translations.aggregate(
-            Sum('translated'),
-            Sum('fuzzy'),
-            Sum('failing_checks'),
-            Sum('total'),
-        )
-
-        total = translations['total__sum']
 
-        # Catch no translations (division by zero)
-        if total == 0 or total is None:
-            return (0, 0, 0)
-
-        # Fetch values
-        result = [
-            translations['translated__sum'],
-            translations['fuzzy__sum'],
-            translations['failing_checks__sum'],
-        ]
-        # Calculate percent
-        return tuple([translation_percent(value, total) for value in result])
+        The values come from cached stats rollup, see weblate.trans.stats.
+        '''
+        return get_percents(project, subproject, language)
 
 
 class Translation(models.Model, URLMixin, PercentMixin):
@@ -450,17 +440,21 @@ class Translation(models.Model, URLMixin, PercentMixin):
         '''
         Removes stale checks/comments/suggestions for deleted units.
         '''
-        for contentsum in deleted_contentsums:
+        # Content still present in other units
+        remaining = set()
+        for chunk in iterate_chunks(deleted_contentsums):
             units = Unit.objects.filter(
                 translation__language=self.language,
                 translation__subproject__project=self.subproject.project,
-                contentsum=contentsum
+                contentsum__in=chunk
             )
-            if units.exists():
-                # There are other units as well, but some checks
-                # (eg. consistency) needs update now
-                for unit in units:
-                    unit.run_checks()
+            remaining.update(units.values_list('contentsum', flat=True))
+            # There are other units as well, but some checks
+            # (eg. consistency) needs update now
+            Unit.objects.run_checks_units(units)
+
+        for contentsum in deleted_contentsums:
+            if contentsum in remaining:
                 continue
 
             # Last unit referencing to these checks
@@ -500,16 +494,22 @@ class Translation(models.Model, URLMixin, PercentMixin):
                     contentsum=contentsum
                 ).delete()
 
-    def check_sync(self, force=False, request=None, change=None):
+    def check_sync(self, force=False, request=None, change=None,
+                   units=None, diff=None):
         '''
         Checks whether database is in sync with git and possibly does update.
+
+        Optional units contain already parsed units of the file and
+        optional diff contains result of UnitManager.diff_units for them,
+        otherwise the file is parsed and compared here.
         '''
 
         if change is None:
             change = Change.ACTION_UPDATE
 
         # Check if we're not already up to date
-        if self.revision != self.get_git_blob_hash():
+        blob_hash = self.get_git_blob_hash()
+        if self.revision != blob_hash:
             reason = 'revision has changed'
         elif force:
             reason = 'check forced'
@@ -524,75 +524,67 @@ class Translation(models.Model, URLMixin, PercentMixin):
             reason,
         )
 
-        # List of created units (used for cleanup and duplicates detection)
-        created_units = set()
-
-        # Was there change?
-        was_new = False
-        # Position of current unit
-        pos = 1
-
-        for unit in self.store.all_units():
-            if not unit.is_translatable():
-                continue
-
-            newunit, is_new = Unit.objects.update_from_unit(
-                self, unit, pos
-            )
-
-            # Check if unit is new and untranslated
-            was_new = (
-                was_new
-                or (is_new and not newunit.translated)
-                or (
-                    not newunit.translated
-                    and newunit.translated != newunit.old_translated
-                )
-                or (newunit.fuzzy and newunit.fuzzy != newunit.old_fuzzy)
+        # File has been changed outside, parse it again
+        STORE_CACHE.invalidate(self.get_filename())
+
+        # Compare the file with the database unless it was already done
+        # while parsing the file
+        if diff is None:
+            if units is None:
+                units = self.store.all_units()
+            diff = Unit.objects.diff_units(self.id, self.unit_set.all(), units)
+
+        # Units compared in other process are not bound to this translation
+        for unit in diff.new_units:
+            unit.translation = self
+        for unit, changes in diff.changed_units:
+            unit.translation = self
+
+        # Report possible duplicate units
+        for unit in diff.duplicates:
+            weblate.logger.error(
+                'Duplicate string to translate in %s: %s (%s)',
+                self,
+                unit,
+                repr(unit.source)
             )
 
-            # Update position
-            pos += 1
-
-            # Check for possible duplicate units
-            if newunit.id in created_units:
-                weblate.logger.error(
-                    'Duplicate string to translate in %s: %s (%s)',
-                    self,
-                    newunit,
-                    repr(newunit.source)
-                )
-
-            # Store current unit ID
-            created_units.add(newunit.id)
-
-        # Following query can get huge, so we should find better way
-        # to delete stale units, probably sort of garbage collection
-
-        # We should also do cleanup on source stings tracking objects
+        # Write changes to the database
+        self.save_units(diff.new_units, diff.changed_units)
 
         # Get lists of stale units to delete
-        units_to_delete = self.unit_set.exclude(
-            id__in=created_units
+        units_to_delete = self.unit_set.filter(
+            id__in=diff.stale_units.keys()
         )
         # We need to resolve this now as otherwise list will become empty after
         # delete
-        deleted_contentsums = list(
-            units_to_delete.values_list('contentsum', flat=True)
-        )
+        deleted_contentsums = diff.stale_units.values()
         # Actually delete units
-        units_to_delete.delete()
+        if deleted_contentsums:
+            units_to_delete.delete()
 
         # Cleanup checks for deleted units
         self.cleanup_deleted(deleted_contentsums)
 
         # Update revision and stats
+        self.revision = blob_hash
         self.update_stats()
 
         # Cleanup checks cache if there were some deleted units
         if len(deleted_contentsums) > 0:
             self.invalidate_cache()
 
+        # Update translation memory, units untranslated both before and
+        # after the change are not stored there
+        update_memory_units(
+            self.language.code,
+            [
+                unit for unit, changes in diff.changed_units
+                if unit.translated or unit.old_translated
+            ],
+            diff.stale_units.keys()
+        )
+
         # Store change entry
         if request is None:
             user = None
@@ -606,9 +598,98 @@ class Translation(models.Model, URLMixin, PercentMixin):
         )
 
         # Notify subscribed users
-        if was_new:
+        if diff.was_new:
             notify_new_string(self)
 
+    def save_units(self, new_units, changed_units):
+        '''
+        Stores units parsed in check_sync in bulk and processes checks and
+        fulltext index for them in single pass.
+
+        The changed_units is list of tuples (unit, (same_content,
+        same_state)) as returned by Unit.update_unit_attributes.
+        '''
+        if not changed_units:
+            return
+
+        # Ensure we track source strings
+        sources = dict(
+            Source.objects.filter(
+                subproject=self.subproject
+            ).values_list('checksum', 'priority')
+        )
+        new_sources = set()
+        for unit, changes in changed_units:
+            if unit.checksum not in sources:
+                new_sources.add(unit.checksum)
+                sources[unit.checksum] = Source._meta.get_field(
+                    'priority'
+                ).default
+            if unit.priority != sources[unit.checksum]:
+                unit.priority = sources[unit.checksum]
+                unit.changed_fields.add('priority')
+        Source.objects.bulk_create([
+            Source(checksum=checksum, subproject=self.subproject)
+            for checksum in new_sources
+        ])
+
+        # Create new units
+        for unit in new_units:
+            unit.update_num_words()
+        Unit.objects.bulk_create(new_units)
+
+        # Fetch IDs of created units
+        if new_units:
+            ids = dict(self.unit_set.values_list('checksum', 'id'))
+            for unit in new_units:
+                unit.id = ids[unit.checksum]
+        is_new = set([unit.id for unit in new_units])
+
+        # Update changed units grouped by changed fields, checks are done
+        # later
+        updates = {}
+        for unit, (same_content, same_state) in changed_units:
+            if unit.id in is_new:
+                continue
+            if not same_content or not unit.num_words:
+                unit.update_num_words()
+                unit.changed_fields.add('num_words')
+            updates.setdefault(
+                frozenset(unit.changed_fields), []
+            ).append(unit)
+        for fields, units in updates.items():
+            Unit.objects.update_fields_batch(units, fields)
+
+        # Create change objects for new source strings, bulk_create does
+        # not send signals so activity has to be updated here
+        new_changes = [
+            Change(
+                translation=self,
+                action=Change.ACTION_NEW_SOURCE,
+                unit=unit,
+            )
+            for unit, changes in changed_units
+            if unit.checksum in new_sources
+        ]
+        Change.objects.bulk_create(new_changes)
+        DailyActivity.objects.add_changes(new_changes)
+
+        # Update checks on fuzzy update or on content change
+        Unit.objects.run_checks_batch([
+            (unit, same_state, same_content, unit.id in is_new)
+            for unit, (same_content, same_state) in changed_units
+            if not same_content or not same_state
+        ])
+
+        # Update fulltext index for new units or on content change
+        update_index_units(
+            [
+                unit for unit, (same_content, same_state) in changed_units
+                if unit.id in is_new or not same_content
+            ],
+            new_units
+        )
+
     @property
     def repository(self):
         return self.subproject.repository
@@ -632,18 +713,13 @@ class Translation(models.Model, URLMixin, PercentMixin):
         '''
         Returns current Git blob hash for file.
         '''
-        ret = self.repository.get_object_hash(self.get_filename())
-
-        if self.subproject.has_template():
-            ret += ','
-            ret += self.repository.get_object_hash(self.subproject.template)
-        return ret
+        return self.subproject.get_git_blob_hash(self.filename)
 
     def update_stats(self):
         '''
         Updates translation statistics.
         '''
-        # Grab stats
+        # Grab stats in single query
         stats = self.unit_set.aggregate(
             Sum('num_words'),
             BooleanSum('fuzzy'),
@@ -651,6 +727,11 @@ class Translation(models.Model, URLMixin, PercentMixin):
             BooleanSum('has_failing_check'),
             BooleanSum('has_suggestion'),
             Count('id'),
+            translated_words=ConditionalSum('num_words', 'translated'),
+            fuzzy_words=ConditionalSum('num_words', 'fuzzy'),
+            failing_checks_words=ConditionalSum(
+                'num_words', 'has_failing_check'
+            ),
         )
 
         # Check if we have any units
@@ -661,6 +742,9 @@ class Translation(models.Model, URLMixin, PercentMixin):
             self.translated = 0
             self.failing_checks = 0
             self.have_suggestion = 0
+            self.translated_words = 0
+            self.fuzzy_words = 0
+            self.failing_checks_words = 0
         else:
             self.total_words = stats['num_words__sum']
             self.total = stats['id__count']
@@ -668,39 +752,65 @@ class Translation(models.Model, URLMixin, PercentMixin):
             self.translated = int(stats['translated__sum'])
             self.failing_checks = int(stats['has_failing_check__sum'])
             self.have_suggestion = int(stats['has_suggestion__sum'])
+            self.translated_words = int(stats['translated_words'])
+            self.fuzzy_words = int(stats['fuzzy_words'])
+            self.failing_checks_words = int(stats['failing_checks_words'])
 
-        # Count translated words
-        self.translated_words = self.unit_set.filter(
-            translated=True
-        ).aggregate(
-            Sum('num_words')
-        )['num_words__sum']
-        # Nothing matches filter
-        if self.translated_words is None:
-            self.translated_words = 0
+        self.save()
 
-        # Count fuzzy words
-        self.fuzzy_words = self.unit_set.filter(
-            fuzzy=True
-        ).aggregate(
-            Sum('num_words')
-        )['num_words__sum']
-        # Nothing matches filter
-        if self.fuzzy_words is None:
-            self.fuzzy_words = 0
+        # Invalidate rollups
+        invalidate_stats(self)
 
-        # Count words with failing checks
-        self.failing_checks_words = self.unit_set.filter(
-            has_failing_check=True
-        ).aggregate(
-            Sum('num_words')
-        )['num_words__sum']
-        # Nothing matches filter
-        if self.failing_checks_words is None:
-            self.failing_checks_words = 0
+    def update_stats_delta(self, old, new):
+        '''
+        Incrementally updates statistics for change of single unit.
+
+        The old and new are unit states before and after the change.
+        '''
+        self.update_stats_deltas([(old, new)])
+
+    def update_stats_deltas(self, changes):
+        '''
+        Incrementally updates statistics for list of unit changes.
+
+        The changes is list of tuples (old, new) with unit states before
+        and after the change, all of them are stored using single query.
+        '''
+        delta = {}
+        for old, new in changes:
+            for flag, count_field, words_field in STATS_FLAGS:
+                old_flag = int(getattr(old, flag))
+                new_flag = int(getattr(new, flag))
+                if old_flag != new_flag:
+                    delta[count_field] = (
+                        delta.get(count_field, 0) + new_flag - old_flag
+                    )
+                if words_field is not None:
+                    words = new_flag * new.num_words - old_flag * old.num_words
+                    if words != 0:
+                        delta[words_field] = (
+                            delta.get(words_field, 0) + words
+                        )
+
+        delta = dict(
+            (field, value) for field, value in delta.items() if value != 0
+        )
+        if not delta:
+            return
+
+        # Atomic update in database
+        Translation.objects.filter(pk=self.pk).update(
+            **dict(
+                (field, F(field) + value) for field, value in delta.items()
+            )
+        )
+
+        # Keep local copy in sync
+        for field, value in delta.items():
+            setattr(self, field, getattr(self, field) + value)
 
-        # Store hash will save object
-        self.store_hash()
+        # Invalidate rollups
+        invalidate_stats(self)
 
     def store_hash(self):
         '''
@@ -736,6 +846,14 @@ class Translation(models.Model, URLMixin, PercentMixin):
         '''
         Commits any pending changes.
         '''
+        # Write changes so far stored only in the database
+        self.flush_pending(request)
+        self.commit_previous(request, author, skip_push)
+
+    def commit_previous(self, request, author=None, skip_push=False):
+        '''
+        Commits changes done by other author than given one.
+        '''
         # Get author of last changes
         last = self.get_last_author(True)
 
@@ -894,6 +1012,23 @@ class Translation(models.Model, URLMixin, PercentMixin):
 
         return True
 
+    @contextmanager
+    def updating_store(self):
+        '''
+        Context manager for modifying the store with lock acquired.
+
+        The store is shared with other instances through the store cache,
+        so it is removed from the cache before being modified and it is
+        not used anymore if saving fails.
+        '''
+        with self.subproject.git_lock:
+            STORE_CACHE.discard(self.store.store)
+            try:
+                yield
+            except:
+                self._store = None
+                raise
+
     def update_unit(self, unit, request, user=None):
         '''
         Updates backend file and unit.
@@ -901,79 +1036,277 @@ class Translation(models.Model, URLMixin, PercentMixin):
         if user is None:
             user = request.user
         # Save with lock acquired
-        with self.subproject.git_lock:
+        with self.updating_store():
+            saved, pounit = self._update_store_unit(unit)
+            if saved:
+                self._save_store(request, self.get_author_name(user))
 
-            src = unit.get_source_plurals()[0]
-            add = False
+        return saved, pounit
 
-            pounit, add = self.store.find_unit(unit.context, src)
+    def update_units(self, units, request, user=None):
+        '''
+        Updates backend file for list of units.
 
-            # Bail out if we have not found anything
-            if pounit is None or pounit.is_obsolete():
-                return False, None
+        The file is written and committed only once. Returns list of
+        tuples (unit, pounit) for units which were changed in the file.
+        '''
+        if user is None:
+            user = request.user
+        result = []
+        # Save with lock acquired
+        with self.updating_store():
+            for unit in units:
+                saved, pounit = self._update_store_unit(unit)
+                if saved:
+                    result.append((unit, pounit))
+            if result:
+                self._save_store(request, self.get_author_name(user))
 
-            # Check for changes
-            if (not add
-                    and unit.target == pounit.get_target()
-                    and unit.fuzzy == pounit.is_fuzzy()):
-                return False, pounit
+        return result
 
-            # Store translations
-            if unit.is_plural():
-                pounit.set_target(unit.get_target_plurals())
-            else:
-                pounit.set_target(unit.target)
+    def update_store_units(self, units, request, user=None):
+        '''
+        Updates backend file for list of units.
 
-            # Update fuzzy flag
-            pounit.mark_fuzzy(unit.fuzzy)
+        The file is written and committed only once. Returns dictionary
+        of unit IDs and tuples (saved, pounit) as returned by update_unit.
+        '''
+        if user is None:
+            user = request.user
+        result = {}
+        # Save with lock acquired
+        with self.updating_store():
+            for unit in units:
+                result[unit.id] = self._update_store_unit(unit)
+            if any([saved for saved, pounit in result.values()]):
+                self._save_store(request, self.get_author_name(user))
+
+        return result
+
+    def save_backend_units(self, units, request):
+        '''
+        Saves list of changed units with single write to the backend.
+
+        Returns list of units which were saved.
+        '''
+        stored = {}
+        if not appsettings.WRITE_BEHIND:
+            stored = self.update_store_units(units, request)
+
+        return [
+            unit for unit in units
+            if unit.save_backend(request, stored=stored.get(unit.id))
+        ]
+
+    def _update_store_unit(self, unit):
+        '''
+        Updates unit in loaded store without saving it.
+
+        Returns tuple (saved, pounit), pounit is None if the unit was not
+        found in the file.
+        '''
+        src = unit.get_source_plurals()[0]
+        add = False
+
+        pounit, add = self.store.find_unit(unit.context, src)
+
+        # Bail out if we have not found anything
+        if pounit is None or pounit.is_obsolete():
+            return False, None
+
+        # Check for changes
+        if (not add
+                and unit.target == pounit.get_target()
+                and unit.fuzzy == pounit.is_fuzzy()):
+            return False, pounit
+
+        # Store translations
+        if unit.is_plural():
+            pounit.set_target(unit.get_target_plurals())
+        else:
+            pounit.set_target(unit.target)
+
+        # Update fuzzy flag
+        pounit.mark_fuzzy(unit.fuzzy)
 
-            # Optionally add unit to translation file
-            if add:
-                self.store.add_unit(pounit)
+        # Optionally add unit to translation file
+        if add:
+            self.store.add_unit(pounit)
 
-            # We need to update backend now
-            author = self.get_author_name(user)
+        return True, pounit
+
+    def _save_store(self, request, author, force_commit=False):
+        '''
+        Updates file headers, saves the store and commits it.
+        '''
+        # Update po file header
+        po_revision_date = (
+            datetime.now().strftime('%Y-%m-%d %H:%M')
+            + poheader.tzstring()
+        )
 
-            # Update po file header
-            po_revision_date = (
-                datetime.now().strftime('%Y-%m-%d %H:%M')
-                + poheader.tzstring()
+        # Prepare headers to update
+        headers = {
+            'add': True,
+            'last_translator': author,
+            'plural_forms': self.language.get_plural_form(),
+            'language': self.language_code,
+            'PO_Revision_Date': po_revision_date,
+        }
+
+        # Optionally store language team with link to website
+        if self.subproject.project.set_translation_team:
+            headers['language_team'] = '%s <%s>' % (
+                self.language.name,
+                get_site_url(self.get_absolute_url()),
             )
 
-            # Prepare headers to update
-            headers = {
-                'add': True,
-                'last_translator': author,
-                'plural_forms': self.language.get_plural_form(),
-                'language': self.language_code,
-                'PO_Revision_Date': po_revision_date,
-            }
+        # Optionally store email for reporting bugs in source
+        report_source_bugs = self.subproject.report_source_bugs
+        if report_source_bugs != '':
+            headers['report_msgid_bugs_to'] = report_source_bugs
 
-            # Optionally store language team with link to website
-            if self.subproject.project.set_translation_team:
-                headers['language_team'] = '%s <%s>' % (
-                    self.language.name,
-                    get_site_url(self.get_absolute_url()),
-                )
+        # Update genric headers
+        self.store.update_header(
+            **headers
+        )
+
+        # commit possible previous changes (by other author)
+        self.commit_previous(request, author)
+        # save translation changes
+        self.store.save()
+        # commit Git repo if needed
+        self.git_commit(
+            request, author, timezone.now(), force_commit, sync=True
+        )
 
-            # Optionally store email for reporting bugs in source
-            report_source_bugs = self.subproject.report_source_bugs
-            if report_source_bugs != '':
-                headers['report_msgid_bugs_to'] = report_source_bugs
+    def flush_pending(self, request=None):
+        '''
+        Writes units changed only in the database to the file.
 
-            # Update genric headers
-            self.store.update_header(
-                **headers
+        Changes are grouped by author of last change of each unit and
+        committed separately for each author. Units which are not found
+        in the file stay pending. Returns number of written units.
+        '''
+        cache.delete(self.get_pending_cache_key())
+        units = list(self.unit_set.filter(pending=True))
+        if not units:
+            return 0
+
+        # Find out author of last change for each unit
+        authors = {}
+        for chunk in iterate_chunks([unit.id for unit in units]):
+            changes = Change.objects.content().filter(
+                unit_id__in=chunk
+            ).order_by(
+                'timestamp'
+            ).values_list(
+                'unit_id', 'author_id', 'timestamp'
+            )
+            for unit_id, author_id, timestamp in changes:
+                authors[unit_id] = (author_id, timestamp)
+
+        # Group units by authors, ordered by time of last change
+        groups = {}
+        last_change = {}
+        for unit in units:
+            unit.translation = self
+            author_id, timestamp = authors.get(unit.id, (None, None))
+            groups.setdefault(author_id, []).append(unit)
+            if timestamp is not None:
+                last_change[author_id] = max(
+                    timestamp, last_change.get(author_id, timestamp)
+                )
+        users = User.objects.in_bulk(
+            [author_id for author_id in groups if author_id is not None]
+        )
+        order = sorted(
+            [author_id for author_id in groups if author_id in users],
+            key=lambda author_id: last_change[author_id]
+        )
+        # Units without known author are written with the last group
+        unknown = [
+            unit
+            for author_id in groups if author_id not in users
+            for unit in groups[author_id]
+        ]
+        if unknown and order:
+            groups[order[-1]].extend(unknown)
+        elif unknown:
+            groups[None] = unknown
+            order = [None]
+
+        updated = []
+        with self.updating_store():
+            for pos, author_id in enumerate(order):
+                group_saved = False
+                for unit in groups[author_id]:
+                    saved, pounit = self._update_store_unit(unit)
+                    if pounit is None:
+                        weblate.logger.warning(
+                            'pending message %s not found in the file!',
+                            unit
+                        )
+                        continue
+                    updated.append((unit, pounit))
+                    group_saved |= saved
+                if not group_saved:
+                    continue
+                if author_id is None:
+                    author = '%s <%s>' % (
+                        self.subproject.project.committer_name,
+                        self.subproject.project.committer_email,
+                    )
+                else:
+                    author = self.get_author_name(users[author_id])
+                # Only changes of last author can wait for lazy commit
+                self._save_store(request, author, pos < len(order) - 1)
+
+        # Update state from the file, units edited meanwhile stay pending
+        translated_changed = False
+        for unit, pounit in updated:
+            translated = pounit.is_translated()
+            translated_changed |= translated != unit.translated
+            Unit.objects.filter(
+                pk=unit.pk,
+                target=unit.target,
+                fuzzy=unit.fuzzy
+            ).update(
+                pending=False,
+                translated=translated
             )
+        if translated_changed:
+            self.update_stats()
+            self.invalidate_cache()
 
-            # commit possible previous changes (by other author)
-            self.commit_pending(request, author)
-            # save translation changes
-            self.store.save()
-            # commit Git repo if needed
-            self.git_commit(request, author, timezone.now(), sync=True)
+        return len(updated)
 
-        return True, pounit
+    def get_pending_cache_key(self):
+        '''
+        Returns cache key for number of units waiting to be written.
+        '''
+        return 'pending-units-%d' % self.id
+
+    def add_pending(self, request, count=1):
+        '''
+        Records units which started waiting to be written to the file and
+        writes them once there are WRITE_BEHIND_UNITS of them.
+
+        The number is tracked in the cache, pending units are counted in
+        the database only when the limit seems to be reached.
+        '''
+        key = self.get_pending_cache_key()
+        try:
+            pending = cache.incr(key, count)
+        except ValueError:
+            pending = None
+        if pending is not None and pending < appsettings.WRITE_BEHIND_UNITS:
+            return
+        pending = self.unit_set.filter(pending=True).count()
+        if pending >= appsettings.WRITE_BEHIND_UNITS:
+            self.flush_pending(request)
+        else:
+            cache.set(key, pending)
 
     def get_source_checks(self):
         '''
@@ -1131,7 +1464,7 @@ class Translation(models.Model, URLMixin, PercentMixin):
         Merges translate-toolkit store into current translation.
         '''
         # Merge with lock acquired
-        with self.subproject.git_lock:
+        with self.updating_store():
 
             store1 = self.store.store
             store1.require_index()
@@ -1214,6 +1547,9 @@ class Translation(models.Model, URLMixin, PercentMixin):
         '''
         Top level handler for file uploads.
         '''
+        # Merge with file containing all changes
+        self.flush_pending(request)
+
         filecopy = fileobj.read()
         fileobj.close()
         # Load backend file
@@ -1280,24 +1616,102 @@ class Translation(models.Model, URLMixin, PercentMixin):
         '''
         return self.unit_set.count_type(check, self)
 
-    def invalidate_cache(self, cache_type=None):
+    def get_counts_cache_key(self):
         '''
-        Invalidates any cached stats.
+        Returns cache key for counts of failing checks and comments.
         '''
-        # Get parts of key cache
-        slug = self.subproject.get_full_slug()
-        code = self.language.code
+        return 'counts-%s-%s' % (
+            self.subproject.get_full_slug(),
+            self.language.code,
+        )
 
-        # Are we asked for specific cache key?
-        if cache_type is None:
-            keys = list(CHECKS)
-        else:
-            keys = [cache_type]
+    def get_counts(self):
+        '''
+        Returns dictionary with number of units failing each check and
+        units with comments.
+
+        All counts are calculated together and cached in single entry.
+        '''
+        cache_key = self.get_counts_cache_key()
+        result = cache.get(cache_key)
+        if result is not None:
+            return result
+
+        project = self.subproject.project
+        contentsums = self.unit_set.values('contentsum')
+
+        # Translated flags of units (same content can be in more units)
+        units = {}
+        targetcomments = 0
+        unit_values = self.unit_set.values_list(
+            'contentsum', 'translated', 'has_comment'
+        )
+        for contentsum, translated, has_comment in unit_values:
+            units.setdefault(contentsum, []).append(translated)
+            if has_comment:
+                targetcomments += 1
+
+        # Content sums matching each check
+        matches = {}
+        sourcechecks = set()
+        checks = Check.objects.filter(
+            Q(language=self.language) | Q(language=None),
+            project=project,
+            ignore=False,
+            contentsum__in=contentsums,
+        ).values_list(
+            'check', 'language_id', 'contentsum'
+        )
+        for check, language_id, contentsum in checks:
+            if language_id is None:
+                sourcechecks.add(contentsum)
+            if check not in CHECKS:
+                continue
+            if language_id is None and not CHECKS[check].source:
+                continue
+            if language_id is not None and not CHECKS[check].target:
+                continue
+            matches.setdefault(check, set()).add(contentsum)
+
+        sourcecomments = Comment.objects.filter(
+            language=None,
+            project=project,
+            contentsum__in=contentsums,
+        ).values_list(
+            'contentsum', flat=True
+        )
+
+        result = {
+            'targetcomments': targetcomments,
+            'sourcecomments': sum(
+                [len(units[item]) for item in set(sourcecomments)]
+            ),
+            'sourcechecks': sum(
+                [len(units[item]) for item in sourcechecks]
+            ),
+        }
+        for check, matched in matches.items():
+            # Target only checks count just translated units
+            translated_only = not CHECKS[check].source
+            result[check] = sum([
+                len([
+                    flag for flag in units[item]
+                    if flag or not translated_only
+                ])
+                for item in matched
+            ])
+
+        cache.set(cache_key, result)
+        return result
 
-        # Actually delete the cache
-        for rqtype in keys:
-            cache_key = 'counts-%s-%s-%s' % (slug, code, rqtype)
-            cache.delete(cache_key)
+    def invalidate_cache(self, cache_type=None):
+        '''
+        Invalidates any cached stats.
+
+        All counts are cached together, so cache_type is accepted only for
+        compatibility and whole entry is removed.
+        '''
+        cache.delete(self.get_counts_cache_key())
 
     def get_kwargs(self):
         return {
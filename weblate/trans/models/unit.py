@@ -18,31 +18,55 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
-from django.db import models
+from django.db import models, connections
 from weblate import appsettings
-from django.db.models import Q
+from django.db.models import Q, F
 from django.utils.translation import ugettext as _
 from django.utils.safestring import mark_safe
 from django.contrib import messages
-from django.core.cache import cache
 import traceback
-from weblate.trans.checks import CHECKS
+import copy
+from weblate.trans.checks import CHECKS, get_cache_keys
+from weblate.trans.checks.cache import CHECK_CACHE
 from weblate.trans.models.source import Source
 from weblate.trans.models.unitdata import Check, Comment, Suggestion
 from weblate.trans.models.changes import Change
 from weblate.trans.search import update_index_unit, fulltext_search, more_like
+from weblate.trans.memory import update_memory_unit
 from weblate.accounts.models import (
-    notify_new_contributor, notify_new_translation
+    Profile, notify_new_contributor, notify_new_translation
 )
 from weblate.trans.filelock import FileLockException
 from weblate.trans.util import (
-    is_plural, split_plural, join_plural, get_distinct_translations
+    is_plural, split_plural, join_plural, get_distinct_translations,
+    iterate_chunks,
 )
 import weblate
 
+# Types counted by Translation.get_counts
+COUNTED_TYPES = ('sourcechecks', 'sourcecomments', 'targetcomments')
+
 FLAG_TEMPLATE = u'<span title="{0}" class="glyphicon glyphicon-{1}"></span>'
 
 
+class UnitsDiff(object):
+    '''
+    Result of comparing units parsed from file with the database.
+    '''
+
+    def __init__(self):
+        # Units to create
+        self.new_units = []
+        # List of (unit, (same_content, same_state)) for units to store
+        self.changed_units = []
+        # Units no longer present in the file, mapping id to contentsum
+        self.stale_units = {}
+        # Units present in the file more times
+        self.duplicates = []
+        # Whether there is new untranslated or fuzzy unit
+        self.was_new = False
+
+
 class UnitManager(models.Manager):
     def update_from_unit(self, translation, unit, pos):
         """
@@ -81,6 +105,301 @@ class UnitManager(models.Manager):
         # Return result
         return dbunit, created
 
+    def diff_units(self, translation_id, dbunits, units):
+        """
+        Compares units parsed from file with existing database units
+        without accessing the database, so that it can run in other
+        process.
+
+        Returns UnitsDiff with unsaved units updated from the file.
+        """
+        diff = UnitsDiff()
+        existing = {}
+        for dbunit in dbunits:
+            existing[dbunit.checksum] = dbunit
+            diff.stale_units[dbunit.id] = dbunit.contentsum
+
+        # Checksums of processed and changed units
+        processed = set()
+        changed = set()
+        # Position of current unit
+        pos = 1
+
+        for unit in units:
+            if not unit.is_translatable():
+                continue
+
+            checksum = unit.get_checksum()
+            newunit = existing.get(checksum)
+            is_new = newunit is None or newunit.pk is None
+
+            if newunit is None:
+                newunit = self.model(
+                    translation_id=translation_id,
+                    checksum=checksum,
+                    source=unit.get_source(),
+                    context=unit.get_context(),
+                )
+                existing[checksum] = newunit
+                diff.new_units.append(newunit)
+
+            changes = newunit.update_unit_attributes(unit, pos, is_new)
+            if changes is not None and checksum not in changed:
+                changed.add(checksum)
+                diff.changed_units.append((newunit, changes))
+
+            # Check if unit is new and untranslated
+            diff.was_new = (
+                diff.was_new
+                or (is_new and not newunit.translated)
+                or (
+                    not newunit.translated
+                    and newunit.translated != newunit.old_translated
+                )
+                or (newunit.fuzzy and newunit.fuzzy != newunit.old_fuzzy)
+            )
+
+            # Update position
+            pos += 1
+
+            # Check for possible duplicate units
+            if checksum in processed:
+                diff.duplicates.append(newunit)
+
+            # Store current unit checksum
+            processed.add(checksum)
+            diff.stale_units.pop(newunit.id, None)
+
+        return diff
+
+    def run_checks_batch(self, items):
+        """
+        Updates checks for list of units in bulk.
+
+        The items is list of tuples (unit, same_state, same_content, is_new)
+        with same meaning as parameters of Unit.run_checks.
+        """
+        # Checks are stored per project and language
+        groups = {}
+        for item in items:
+            translation = item[0].translation
+            key = (translation.subproject.project_id, translation.language_id)
+            groups.setdefault(key, []).append(item)
+
+        # Fetch cached data for checks at once
+        with CHECK_CACHE.batch(get_cache_keys([item[0] for item in items])):
+            for group in groups.values():
+                self._run_checks_group(group)
+
+    def run_checks_units(self, units, batch=1000):
+        """
+        Updates all checks for units in queryset, processing them in
+        batches using run_checks_batch.
+
+        Returns number of processed units.
+        """
+        ids = list(units.values_list('id', flat=True))
+        for chunk in iterate_chunks(ids, batch):
+            chunk_units = self.filter(
+                id__in=chunk
+            ).select_related(
+                'translation__subproject__project',
+                'translation__language',
+            )
+            self.run_checks_batch([
+                (unit, True, True, False) for unit in chunk_units
+            ])
+        return len(ids)
+
+    def _run_checks_group(self, items):
+        """
+        Updates checks for units within single project and language.
+        """
+        from weblate.trans.models.translation import Translation
+
+        project = items[0][0].translation.subproject.project
+        language = items[0][0].translation.language
+
+        # Load current checks, the state maps (contentsum, language_id)
+        # to dictionary of check names and their ignore flag
+        state = {}
+        existing = {}
+        contentsums = set([item[0].contentsum for item in items])
+        for chunk in iterate_chunks(contentsums):
+            checks = Check.objects.filter(
+                project=project,
+                contentsum__in=chunk,
+            ).filter(
+                Q(language=language) | Q(language=None)
+            ).values_list('id', 'contentsum', 'language_id', 'check', 'ignore')
+            for pk, contentsum, language_id, check, ignore in checks:
+                state.setdefault((contentsum, language_id), {})[check] = ignore
+                existing[(contentsum, language_id, check)] = pk
+
+        # Check whether there are translated messages with same source
+        # for untranslated units
+        lookup = set([
+            unit.contentsum for unit, same_state, same_content, is_new in items
+            if (not same_state or is_new) and not unit.translated
+        ])
+        translated = set()
+        for chunk in iterate_chunks(lookup):
+            translated.update(self.filter(
+                translation__language=language,
+                translation__subproject__project=project,
+                contentsum__in=chunk,
+                translated=True,
+            ).values_list('contentsum', flat=True))
+
+        # Load units needed for consistency check at once
+        if 'inconsistent' in CHECKS:
+            self.prefetch_same([item[0] for item in items])
+
+        # Load languages with failing checks at once
+        if 'multiple_failures' in CHECKS:
+            self.prefetch_failing_languages([item[0] for item in items])
+
+        # Contentsums with changed checks
+        changed = set()
+        # Units which need update of failing checks flag
+        recheck = {}
+
+        for unit, same_state, same_content, is_new in items:
+            target_checks = state.setdefault(
+                (unit.contentsum, language.id), {}
+            )
+            source_checks = state.setdefault((unit.contentsum, None), {})
+            checks_to_run = CHECKS
+            cleanup_checks = True
+            was_change = False
+
+            if (not same_state or is_new) and not unit.translated:
+                # We run only checks which span across more units
+                checks_to_run = {}
+
+                # Delete all checks if only message with this source is fuzzy
+                if unit.contentsum not in translated:
+                    if target_checks:
+                        target_checks.clear()
+                        changed.add(unit.contentsum)
+                        recheck[unit.id] = unit
+                elif 'inconsistent' in CHECKS:
+                    # Consistency check checks across more translations
+                    checks_to_run['inconsistent'] = CHECKS['inconsistent']
+
+                # Run source checks as well
+                for check in CHECKS:
+                    if CHECKS[check].source:
+                        checks_to_run[CHECKS[check].check_id] = CHECKS[check]
+
+                cleanup_checks = False
+
+            if len(checks_to_run) == 0:
+                continue
+
+            src = unit.get_source_plurals()
+            tgt = unit.get_target_plurals()
+            old_target_checks = set(target_checks)
+            old_source_checks = set(source_checks)
+
+            # Run all checks
+            for check in checks_to_run:
+                check_obj = CHECKS[check]
+                # Target check
+                if check_obj.target and check_obj.check_target(src, tgt, unit):
+                    if check in old_target_checks:
+                        old_target_checks.remove(check)
+                    else:
+                        target_checks[check] = False
+                        was_change = True
+                # Source check
+                if check_obj.source and check_obj.check_source(src, unit):
+                    if check in old_source_checks:
+                        old_source_checks.remove(check)
+                    else:
+                        source_checks[check] = False
+                        was_change = True
+
+            # Delete no longer failing checks
+            if cleanup_checks:
+                for check in old_target_checks:
+                    del target_checks[check]
+                    was_change = True
+                for check in old_source_checks:
+                    del source_checks[check]
+                    was_change = True
+
+            if was_change:
+                changed.add(unit.contentsum)
+            if was_change or is_new or not same_content:
+                recheck[unit.id] = unit
+
+        # Store changed checks to the database
+        final = set()
+        for (contentsum, language_id), checks in state.items():
+            for check in checks:
+                final.add((contentsum, language_id, check))
+        deleted = [pk for key, pk in existing.items() if key not in final]
+        for chunk in iterate_chunks(deleted):
+            Check.objects.filter(id__in=chunk).delete()
+        Check.objects.bulk_create([
+            Check(
+                contentsum=contentsum,
+                project=project,
+                language_id=language_id,
+                ignore=False,
+                check=check
+            )
+            for contentsum, language_id, check in final
+            if (contentsum, language_id, check) not in existing
+        ])
+
+        # Changed checks affect all units sharing the content
+        for chunk in iterate_chunks(changed):
+            others = self.filter(
+                translation__language=language,
+                translation__subproject__project=project,
+                contentsum__in=chunk,
+            )
+            for unit in others:
+                if unit.id not in recheck:
+                    recheck[unit.id] = unit
+
+        # Update failing checks flags
+        translations = {}
+        for unit, same_state, same_content, is_new in items:
+            translations[unit.translation_id] = unit.translation
+        failing = {True: [], False: []}
+        needs_stats = set()
+        for unit in recheck.values():
+            checks = state.get((unit.contentsum, language.id), {})
+            has_failing_check = unit.translated and not all(checks.values())
+            if has_failing_check != unit.has_failing_check:
+                unit.has_failing_check = has_failing_check
+                failing[has_failing_check].append(unit.id)
+                needs_stats.add(unit.translation_id)
+        for value, ids in failing.items():
+            for chunk in iterate_chunks(ids):
+                self.filter(id__in=chunk).update(has_failing_check=value)
+
+        # Update translation stats and invalidate checks cache
+        affected = set([unit.translation_id for unit in recheck.values()])
+        missing = affected - set(translations)
+        if missing:
+            translations.update(
+                Translation.objects.in_bulk(list(missing))
+            )
+        for translation_id in affected:
+            translation = translations[translation_id]
+            if translation_id in needs_stats:
+                translation.update_stats()
+            translation.invalidate_cache()
+
+        # Prefetched data would get outdated
+        for item in items:
+            item[0]._same_units = None
+            item[0]._failing_languages = None
+
     def filter_checks(self, rqtype, translation, ignored=False):
         """
         Filtering for checks.
@@ -149,7 +468,8 @@ class UnitManager(models.Manager):
 
     def count_type(self, rqtype, translation):
         """
-        Cached counting of failing checks (and other stats).
+        Counting of failing checks (and other stats), using precalculated
+        or cached values where possible.
         """
         # Use precalculated data if we can
         if rqtype == 'all':
@@ -163,22 +483,11 @@ class UnitManager(models.Manager):
         elif rqtype == 'suggestions':
             return translation.have_suggestion
 
-        # Try to get value from cache
-        cache_key = 'counts-%s-%s-%s' % (
-            translation.subproject.get_full_slug(),
-            translation.language.code,
-            rqtype
-        )
-        ret = cache.get(cache_key)
-        if ret is not None:
-            return ret
+        elif rqtype in COUNTED_TYPES or rqtype in CHECKS:
+            return translation.get_counts().get(rqtype, 0)
 
         # Actually count units
-        ret = self.filter_type(rqtype, translation).count()
-
-        # Update cache
-        cache.set(cache_key, ret)
-        return ret
+        return self.filter_type(rqtype, translation).count()
 
     def review(self, date, user):
         """
@@ -301,6 +610,102 @@ class UnitManager(models.Manager):
             pk=unit.id
         )
 
+    def prefetch_same(self, units):
+        """
+        Loads units with same source for list of units from single project
+        and language, to be used by Unit.get_same_units.
+        """
+        if not units:
+            return
+        translation = units[0].translation
+        groups = {}
+        checksums = set([unit.checksum for unit in units])
+        for chunk in iterate_chunks(checksums):
+            values = self.filter(
+                checksum__in=chunk,
+                translation__subproject__project_id=(
+                    translation.subproject.project_id
+                ),
+                translation__language_id=translation.language_id,
+            ).values_list(
+                'checksum', 'id', 'target', 'translated',
+                'translation__subproject__allow_translation_propagation',
+            )
+            for value in values:
+                groups.setdefault(value[0], []).append(value[1:])
+
+        for unit in units:
+            unit._same_units = [
+                item for item in groups.get(unit.checksum, [])
+                if item[0] != unit.id
+            ]
+
+    def update_fields_batch(self, units, fields):
+        """
+        Stores given fields of existing units using single query for
+        batch of units, the value for every unit is chosen using CASE
+        expression.
+        """
+        if not units or not fields:
+            return
+        db_connection = connections[self.db]
+        quote = db_connection.ops.quote_name
+        fields = [self.model._meta.get_field(name) for name in sorted(fields)]
+        table = quote(self.model._meta.db_table)
+        column = quote(self.model._meta.pk.column)
+        # Keep number of query parameters within SQLite limit
+        size = max(1, 900 // (2 * len(fields) + 1))
+        cursor = db_connection.cursor()
+        for chunk in iterate_chunks(units, size):
+            params = []
+            assignments = []
+            for field in fields:
+                for unit in chunk:
+                    params.append(unit.pk)
+                    params.append(field.get_db_prep_save(
+                        getattr(unit, field.attname), db_connection
+                    ))
+                assignments.append('{0} = CASE {1} {2} END'.format(
+                    quote(field.column),
+                    column,
+                    ' '.join(['WHEN %s THEN %s'] * len(chunk)),
+                ))
+            params.extend([unit.pk for unit in chunk])
+            cursor.execute(
+                'UPDATE {0} SET {1} WHERE {2} IN ({3})'.format(
+                    table,
+                    ', '.join(assignments),
+                    column,
+                    ', '.join(['%s'] * len(chunk)),
+                ),
+                params
+            )
+
+    def prefetch_failing_languages(self, units):
+        """
+        Loads number of languages with failing checks for list of units
+        from single project, to be used by Unit.get_failing_languages.
+        """
+        if not units:
+            return
+        project_id = units[0].translation.subproject.project_id
+        languages = {}
+        contentsums = set([unit.contentsum for unit in units])
+        for chunk in iterate_chunks(contentsums):
+            values = Check.objects.filter(
+                contentsum__in=chunk,
+                project_id=project_id,
+            ).exclude(
+                language__isnull=True
+            ).values_list(
+                'contentsum', 'language_id'
+            ).distinct()
+            for contentsum, language_id in values:
+                languages[contentsum] = languages.get(contentsum, 0) + 1
+
+        for unit in units:
+            unit._failing_languages = languages.get(unit.contentsum, 0)
+
 
 class Unit(models.Model):
     translation = models.ForeignKey('Translation')
@@ -315,6 +720,7 @@ class Unit(models.Model):
     target = models.TextField(default='', blank=True)
     fuzzy = models.BooleanField(default=False, db_index=True)
     translated = models.BooleanField(default=False, db_index=True)
+    pending = models.BooleanField(default=False, db_index=True)
     position = models.IntegerField(db_index=True)
 
     has_suggestion = models.BooleanField(default=False, db_index=True)
@@ -342,6 +748,8 @@ class Unit(models.Model):
         self._all_flags = None
         self._source_info = None
         self._suggestions = None
+        self._same_units = None
+        self._failing_languages = None
         self.old_translated = self.translated
         self.old_fuzzy = self.fuzzy
 
@@ -373,6 +781,42 @@ class Unit(models.Model):
         """
         Updates Unit from ttkit unit.
         """
+        changes = self.update_unit_attributes(unit, pos, created)
+
+        # Check if we actually need to change anything
+        if changes is None:
+            return
+        same_content, same_state = changes
+
+        # Ensure we track source string
+        source_info, source_created = Source.objects.get_or_create(
+            checksum=self.checksum,
+            subproject=self.translation.subproject
+        )
+        self.priority = source_info.priority
+
+        self.save(
+            force_insert=created,
+            backend=True,
+            same_content=same_content,
+            same_state=same_state
+        )
+
+        # Create change object for new source string
+        if source_created:
+            Change.objects.create(
+                translation=self.translation,
+                action=Change.ACTION_NEW_SOURCE,
+                unit=self,
+            )
+
+    def update_unit_attributes(self, unit, pos, created):
+        """
+        Updates attributes from ttkit unit without saving.
+
+        Returns None if nothing has changed, otherwise tuple indicating
+        whether content and state are same.
+        """
         # Store current values for use in Translation.check_sync
         self.old_fuzzy = self.fuzzy
         self.old_translated = self.translated
@@ -401,6 +845,13 @@ class Unit(models.Model):
                 previous_source = self.previous_source
                 fuzzy = self.fuzzy
 
+        # Keep translation not yet written to the file, it is written
+        # later by Translation.flush_pending
+        if self.pending and not created:
+            target = self.target
+            fuzzy = self.fuzzy
+            translated = self.translated
+
         # Update checks on fuzzy update or on content change
         same_content = (
             target == self.target
@@ -422,13 +873,24 @@ class Unit(models.Model):
                 pos == self.position and
                 contentsum == self.contentsum and
                 previous_source == self.previous_source):
-            return
-
-        # Ensure we track source string
-        source_info, source_created = Source.objects.get_or_create(
-            checksum=self.checksum,
-            subproject=self.translation.subproject
-        )
+            return None
+
+        # Remember changed fields for UnitManager.update_fields_batch
+        self.changed_fields = set([
+            name for name, value in (
+                ('position', pos),
+                ('location', location),
+                ('flags', flags),
+                ('source', source),
+                ('target', target),
+                ('fuzzy', fuzzy),
+                ('translated', translated),
+                ('comment', comment),
+                ('contentsum', contentsum),
+                ('previous_source', previous_source),
+            )
+            if getattr(self, name) != value
+        ])
 
         # Store updated values
         self.position = pos
@@ -441,21 +903,8 @@ class Unit(models.Model):
         self.comment = comment
         self.contentsum = contentsum
         self.previous_source = previous_source
-        self.priority = source_info.priority
-        self.save(
-            force_insert=created,
-            backend=True,
-            same_content=same_content,
-            same_state=same_state
-        )
 
-        # Create change object for new source string
-        if source_created:
-            Change.objects.create(
-                translation=self.translation,
-                action=Change.ACTION_NEW_SOURCE,
-                unit=self,
-            )
+        return same_content, same_state
 
     def is_plural(self):
         """
@@ -499,20 +948,18 @@ class Unit(models.Model):
         """
         Propagates current translation to all others.
         """
-        allunits = Unit.objects.same(self).filter(
-            translation__subproject__allow_translation_propagation=True
-        )
-        for unit in allunits:
-            unit.target = self.target
-            unit.fuzzy = self.fuzzy
-            unit.save_backend(request, False, change_action=change_action)
+        from weblate.trans.propagate import start_propagate
+        start_propagate(self, request, change_action)
 
     def save_backend(self, request, propagate=True, gen_change=True,
-                     change_action=None, user=None):
+                     change_action=None, user=None, stored=None):
         """
         Stores unit to backend.
 
         Optional user parameters defines authorship of a change.
+
+        The stored parameter is result of Translation.update_store_units
+        in case the unit was already written to the file in a batch.
         """
         # Update lock timestamp
         self.translation.update_lock(request)
@@ -521,33 +968,46 @@ class Unit(models.Model):
         if user is None:
             user = request.user
 
-        # Store to backend
-        try:
-            (saved, pounit) = self.translation.update_unit(self, request, user)
-        except FileLockException:
-            weblate.logger.error('failed to lock backend for %s!', self)
-            messages.error(
-                request,
-                _(
-                    'Failed to store message in the backend, '
-                    'lock timeout occurred!'
-                )
-            )
-            return False
-
-        # Handle situation when backend did not find the message
-        if pounit is None:
-            weblate.logger.error('message %s disappeared!', self)
-            messages.error(
-                request,
-                _(
-                    'Message not found in backend storage, '
-                    'it is probably corrupted.'
+        if appsettings.WRITE_BEHIND:
+            # Store only to database, file is written later by
+            # Translation.flush_pending
+            saved, pounit = False, None
+        else:
+            if stored is not None:
+                # Already stored in batch
+                saved, pounit = stored
+            else:
+                # Store to backend
+                try:
+                    (saved, pounit) = self.translation.update_unit(
+                        self, request, user
+                    )
+                except FileLockException:
+                    weblate.logger.error(
+                        'failed to lock backend for %s!', self
+                    )
+                    messages.error(
+                        request,
+                        _(
+                            'Failed to store message in the backend, '
+                            'lock timeout occurred!'
+                        )
+                    )
+                    return False
+
+            # Handle situation when backend did not find the message
+            if pounit is None:
+                weblate.logger.error('message %s disappeared!', self)
+                messages.error(
+                    request,
+                    _(
+                        'Message not found in backend storage, '
+                        'it is probably corrupted.'
+                    )
                 )
-            )
-            # Try reloading from backend
-            self.translation.check_sync(True)
-            return False
+                # Try reloading from backend
+                self.translation.check_sync(True)
+                return False
 
         # Get old unit from database (for notifications)
         oldunit = Unit.objects.get(id=self.id)
@@ -563,26 +1023,35 @@ class Unit(models.Model):
                 self.propagate(request, change_action)
             return False
 
-        # Update translated flag
-        self.translated = pounit.is_translated()
-
-        # Update comments as they might have been changed (eg, fuzzy flag
-        # removed)
-        self.flags = pounit.get_flags()
+        if pounit is None:
+            # Update translated flag, it is updated from the file on flush
+            self.translated = (
+                not self.fuzzy and all(self.get_target_plurals())
+            )
+            self.pending = True
+        else:
+            # Update translated flag
+            self.translated = pounit.is_translated()
 
-        # Save updated unit to database
-        self.save(backend=True)
+            # Update comments as they might have been changed (eg, fuzzy
+            # flag removed)
+            self.flags = pounit.get_flags()
 
         # Update translation stats
         old_translated = self.translation.translated
-        self.translation.update_stats()
+        self.translation.update_stats_delta(oldunit, self)
+
+        # Save updated unit to database
+        self.save(backend=True)
 
         # Notify subscribed users about new translation
         notify_new_translation(self, oldunit, request.user)
 
-        # Update user stats
-        user.profile.translated += 1
-        user.profile.save()
+        # Update user stats, profile might be concurrently updated by
+        # background propagation
+        Profile.objects.filter(user=user).update(
+            translated=F('translated') + 1
+        )
 
         # Generate Change object for this change
         if gen_change:
@@ -598,6 +1067,8 @@ class Unit(models.Model):
                 user=request.user,
                 author=user
             )
+        elif self.pending and not oldunit.pending:
+            self.translation.add_pending(request)
 
         # Propagate to other projects
         if propagate:
@@ -663,7 +1134,7 @@ class Unit(models.Model):
 
         # Store number of words
         if not same_content or not self.num_words:
-            self.num_words = len(self.get_source_plurals()[0].split())
+            self.update_num_words()
 
         # Actually save the unit
         super(Unit, self).save(*args, **kwargs)
@@ -676,6 +1147,16 @@ class Unit(models.Model):
         if force_insert or not same_content:
             update_index_unit(self, force_insert)
 
+        # Update translation memory
+        if not same_content or not same_state:
+            update_memory_unit(self)
+
+    def update_num_words(self):
+        """
+        Updates number of words in source string.
+        """
+        self.num_words = len(self.get_source_plurals()[0].split())
+
     def get_location_links(self):
         """
         Generates links to source files where translation was used.
@@ -801,6 +1282,39 @@ class Unit(models.Model):
             language=None,
         )
 
+    def get_same_units(self):
+        """
+        Returns list of (id, target, translated, allow propagation) tuples
+        for units with same source within same project and language.
+
+        Uses data loaded by UnitManager.prefetch_same if available.
+        """
+        if self._same_units is not None:
+            return self._same_units
+        return list(Unit.objects.same(self).values_list(
+            'id', 'target', 'translated',
+            'translation__subproject__allow_translation_propagation',
+        ))
+
+    def get_failing_languages(self):
+        """
+        Returns number of languages with failing checks for this source
+        string within the project.
+
+        Uses data loaded by UnitManager.prefetch_failing_languages if
+        available.
+        """
+        if self._failing_languages is not None:
+            return self._failing_languages
+        return Check.objects.filter(
+            contentsum=self.contentsum,
+            project=self.translation.subproject.project
+        ).exclude(
+            language__isnull=True
+        ).values(
+            'language'
+        ).distinct().count()
+
     def get_checks_to_run(self, same_state, is_new):
         """
         Returns list of checks to run on state change.
@@ -867,39 +1381,40 @@ class Unit(models.Model):
             self.source_checks().values_list('check', flat=True)
         )
 
-        # Run all checks
-        for check in checks_to_run:
-            check_obj = CHECKS[check]
-            # Target check
-            if check_obj.target and check_obj.check_target(src, tgt, self):
-                if check in old_target_checks:
-                    # We already have this check
-                    old_target_checks.remove(check)
-                else:
-                    # Create new check
-                    Check.objects.create(
-                        contentsum=self.contentsum,
-                        project=self.translation.subproject.project,
-                        language=self.translation.language,
-                        ignore=False,
-                        check=check
-                    )
-                    was_change = True
-            # Source check
-            if check_obj.source and check_obj.check_source(src, self):
-                if check in old_source_checks:
-                    # We already have this check
-                    old_source_checks.remove(check)
-                else:
-                    # Create new check
-                    Check.objects.create(
-                        contentsum=self.contentsum,
-                        project=self.translation.subproject.project,
-                        language=None,
-                        ignore=False,
-                        check=check
-                    )
-                    was_change = True
+        # Run all checks, fetching cached data at once
+        with CHECK_CACHE.batch(get_cache_keys([self])):
+            for check in checks_to_run:
+                check_obj = CHECKS[check]
+                # Target check
+                if check_obj.target and check_obj.check_target(src, tgt, self):
+                    if check in old_target_checks:
+                        # We already have this check
+                        old_target_checks.remove(check)
+                    else:
+                        # Create new check
+                        Check.objects.create(
+                            contentsum=self.contentsum,
+                            project=self.translation.subproject.project,
+                            language=self.translation.language,
+                            ignore=False,
+                            check=check
+                        )
+                        was_change = True
+                # Source check
+                if check_obj.source and check_obj.check_source(src, self):
+                    if check in old_source_checks:
+                        # We already have this check
+                        old_source_checks.remove(check)
+                    else:
+                        # Create new check
+                        Check.objects.create(
+                            contentsum=self.contentsum,
+                            project=self.translation.subproject.project,
+                            language=None,
+                            ignore=False,
+                            check=check
+                        )
+                        was_change = True
 
         # Delete no longer failing checks
         if cleanup_checks:
@@ -919,11 +1434,12 @@ class Unit(models.Model):
 
         # Change attribute if it has changed
         if has_failing_check != self.has_failing_check:
+            oldunit = copy.copy(self)
             self.has_failing_check = has_failing_check
             self.save(backend=True, same_content=True, same_state=True)
 
             # Update translation stats
-            self.translation.update_stats()
+            self.translation.update_stats_delta(oldunit, self)
 
         # Invalidate checks cache if there was any change
         # (above code cares only about whether there is failing check
@@ -940,11 +1456,12 @@ class Unit(models.Model):
         """
         has_suggestion = len(self.suggestions()) > 0
         if has_suggestion != self.has_suggestion:
+            oldunit = copy.copy(self)
             self.has_suggestion = has_suggestion
             self.save(backend=True, same_content=True, same_state=True)
 
             # Update translation stats
-            self.translation.update_stats()
+            self.translation.update_stats_delta(oldunit, self)
 
     def update_has_comment(self):
         """
@@ -955,9 +1472,6 @@ class Unit(models.Model):
             self.has_comment = has_comment
             self.save(backend=True, same_content=True, same_state=True)
 
-            # Update translation stats
-            self.translation.update_stats()
-
     def nearby(self):
         """
         Returns list of nearby messages based on location.
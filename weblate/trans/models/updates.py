@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2014 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <http://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from datetime import timedelta
+import threading
+import traceback
+
+from django.db import models, transaction, connection
+from django.db.models import Min, Q
+from django.utils import timezone
+
+import weblate
+
+# Running updates without heartbeat for this long are considered abandoned
+STALE_UPDATE = timedelta(minutes=10)
+
+# Seconds between heartbeats of running update
+HEARTBEAT_INTERVAL = 60
+
+
+class RepositoryUpdateManager(models.Manager):
+    def enqueue(self, subproject):
+        '''
+        Queues update of subproject repository.
+
+        Requests are coalesced with pending update of the same repository.
+        '''
+        from weblate.trans.models.subproject import SubProject
+
+        if subproject.is_repo_link:
+            subproject = subproject.linked_subproject
+        with transaction.atomic():
+            # Lock the subproject to serialize concurrent hooks for it
+            list(SubProject.objects.select_for_update().filter(
+                pk=subproject.pk
+            ))
+            if not self.filter(subproject=subproject, started=None).exists():
+                self.create(subproject=subproject)
+
+    def claim(self):
+        '''
+        Claims oldest pending update for repository which is not being
+        updated right now. Returns None if there is nothing to process.
+        '''
+        from weblate.trans.models.subproject import SubProject
+
+        # Release updates abandoned by crashed workers, running updates
+        # regularly refresh the heartbeat
+        stale = timezone.now() - STALE_UPDATE
+        self.filter(
+            Q(heartbeat__lt=stale) |
+            Q(heartbeat=None, started__lt=stale)
+        ).update(
+            started=None,
+            heartbeat=None
+        )
+
+        running = self.filter(
+            started__isnull=False
+        ).values_list(
+            'subproject_id', flat=True
+        )
+
+        pending = self.filter(
+            started=None
+        ).exclude(
+            subproject_id__in=list(running)
+        ).order_by(
+            'created'
+        )
+
+        for update in pending:
+            with transaction.atomic():
+                # Lock the subproject to serialize claims for it
+                list(SubProject.objects.select_for_update().filter(
+                    pk=update.subproject_id
+                ))
+                if self.filter(
+                        subproject_id=update.subproject_id,
+                        started__isnull=False
+                ).exists():
+                    continue
+                # Mark as started, other worker might be faster
+                now = timezone.now()
+                claimed = self.filter(
+                    pk=update.pk, started=None
+                ).update(
+                    started=now,
+                    heartbeat=now
+                )
+            if claimed:
+                return self.get(pk=update.pk)
+
+        return None
+
+    def get_stats(self):
+        '''
+        Returns queue statistics as dictionary.
+        '''
+        pending = self.filter(started=None)
+        oldest = pending.aggregate(Min('created'))['created__min']
+        if oldest is None:
+            latency = timedelta(0)
+        else:
+            latency = timezone.now() - oldest
+        return {
+            'pending': pending.count(),
+            'running': self.filter(started__isnull=False).count(),
+            'latency': latency,
+        }
+
+
+class RepositoryUpdate(models.Model):
+    subproject = models.ForeignKey('SubProject')
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+    started = models.DateTimeField(null=True, blank=True, db_index=True)
+    heartbeat = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    objects = RepositoryUpdateManager()
+
+    class Meta(object):
+        app_label = 'trans'
+
+    def __unicode__(self):
+        return self.subproject.__unicode__()
+
+    def process(self):
+        '''
+        Performs queued update and removes it from the queue.
+        '''
+        weblate.logger.info(
+            'updating %s, queued for %s',
+            self.subproject,
+            self.started - self.created
+        )
+        stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=self.heartbeat_worker, args=(stop,)
+        )
+        heartbeat.start()
+        try:
+            self.subproject.do_update()
+        except Exception:
+            weblate.logger.error(
+                'failed to update %s: %s',
+                self.subproject,
+                traceback.format_exc()
+            )
+        finally:
+            stop.set()
+            heartbeat.join()
+            self.delete()
+        weblate.logger.info(
+            'updated %s in %s',
+            self.subproject,
+            timezone.now() - self.started
+        )
+
+    def heartbeat_worker(self, stop):
+        '''
+        Regularly marks update as alive until stop event is set.
+        '''
+        try:
+            while not stop.wait(HEARTBEAT_INTERVAL):
+                RepositoryUpdate.objects.filter(pk=self.pk).update(
+                    heartbeat=timezone.now()
+                )
+        finally:
+            connection.close()
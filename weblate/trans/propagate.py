@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2014 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <http://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+'''
+Propagation of translations to other subprojects within project.
+
+Units with same source are grouped by translation, each translation file
+is written and committed only once and database is updated in bulk.
+'''
+
+from django.db import connection
+from django.db.models import F
+from weblate import appsettings
+from weblate.trans.models.changes import Change, DailyActivity
+from weblate.trans.filelock import FileLockException
+from weblate.trans.search import update_index_units
+from weblate.trans.memory import update_memory_units
+from weblate.accounts.models import (
+    Profile, notify_new_translations, notify_new_contributor
+)
+import weblate
+import threading
+import copy
+import time
+
+
+def get_propagate_groups(unit):
+    '''
+    Returns list of (translation, units) which should receive translation
+    of given unit.
+    '''
+    from weblate.trans.models.unit import Unit
+    units = Unit.objects.same(unit).filter(
+        translation__subproject__allow_translation_propagation=True
+    ).select_related(
+        'translation__subproject__project',
+        'translation__language',
+    )
+    groups = {}
+    for target in units:
+        # Skip units which already have the same translation
+        if target.target == unit.target and target.fuzzy == unit.fuzzy:
+            continue
+        if target.translation_id not in groups:
+            groups[target.translation_id] = (target.translation, [])
+        groups[target.translation_id][1].append(target)
+    return groups.values()
+
+
+def propagate_translation(translation, units, target, fuzzy, request, user,
+                          change_action=None):
+    '''
+    Stores translation to units in single translation.
+
+    The request is None when running in background. Returns list of change
+    objects to create.
+    '''
+    from weblate.trans.models.unit import Unit
+    if request is not None:
+        translation.update_lock(request)
+
+    old_units = {}
+    for unit in units:
+        old_units[unit.id] = copy.copy(unit)
+        unit.translation = translation
+        unit.target = target
+        unit.fuzzy = fuzzy
+
+    if appsettings.WRITE_BEHIND:
+        # File is written later by Translation.flush_pending
+        updated = [(unit, None) for unit in units]
+    else:
+        try:
+            stored = translation.update_store_units(units, request, user)
+        except FileLockException:
+            weblate.logger.error(
+                'failed to lock backend for %s!', translation
+            )
+            return []
+        # Units not changed in the file are still changed in the database,
+        # eg. fuzzy flag in monolingual files
+        updated = []
+        for unit in units:
+            pounit = stored[unit.id][1]
+            if pounit is None:
+                weblate.logger.error('message %s disappeared!', unit)
+                continue
+            updated.append((unit, pounit))
+
+    if not updated:
+        return []
+
+    # Notify about new contributor
+    if not Change.objects.filter(
+            translation=translation, user=user
+    ).exists():
+        notify_new_contributor(updated[0][0], user)
+
+    old_translated = translation.translated
+    updated_units = []
+    for unit, pounit in updated:
+        if pounit is None:
+            unit.translated = (
+                not unit.fuzzy and all(unit.get_target_plurals())
+            )
+            unit.pending = True
+        else:
+            unit.translated = pounit.is_translated()
+            unit.flags = pounit.get_flags()
+        updated_units.append(unit)
+
+    translation.update_stats_deltas([
+        (old_units[unit.id], unit) for unit in updated_units
+    ])
+    Unit.objects.update_fields_batch(
+        updated_units,
+        ('target', 'fuzzy', 'translated', 'pending', 'flags')
+    )
+    update_memory_units(translation.language.code, updated_units)
+    notify_new_translations(updated_units, old_units, user)
+
+    changes = []
+    for unit in updated_units:
+        oldunit = old_units[unit.id]
+        if change_action is not None:
+            action = change_action
+        elif oldunit.translated:
+            action = Change.ACTION_CHANGE
+        else:
+            action = Change.ACTION_NEW
+        if translation.subproject.save_history:
+            history_target = unit.target
+        else:
+            history_target = ''
+        changes.append(Change(
+            unit=unit,
+            translation=translation,
+            action=action,
+            user=user,
+            author=user,
+            target=history_target,
+        ))
+
+    Unit.objects.run_checks_batch([
+        (unit, False, False, False) for unit in updated_units
+    ])
+    update_index_units(updated_units, [])
+
+    # Force commiting on completing translation
+    if (old_translated < translation.translated
+            and translation.translated == translation.total):
+        translation.commit_pending(request)
+        changes.append(Change(
+            translation=translation,
+            action=Change.ACTION_COMPLETE,
+            user=user,
+            author=user,
+        ))
+    elif appsettings.WRITE_BEHIND:
+        pending = len([
+            unit for unit in updated_units
+            if not old_units[unit.id].pending
+        ])
+        if pending:
+            translation.add_pending(request, pending)
+
+    return changes
+
+
+def propagate(unit, request, user, change_action=None):
+    '''
+    Propagates translation of unit to all other subprojects in project.
+
+    The request is None when running in background. Returns tuple of
+    number of updated units and translations.
+    '''
+    start = time.time()
+    changes = []
+    translations = 0
+    for translation, units in get_propagate_groups(unit):
+        result = propagate_translation(
+            translation, units, unit.target, unit.fuzzy,
+            request, user, change_action
+        )
+        if result:
+            translations += 1
+            changes.extend(result)
+
+    if not changes:
+        return 0, 0
+
+    # bulk_create does not send signals, so activity is updated here
+    Change.objects.bulk_create(changes)
+    DailyActivity.objects.add_changes(changes)
+
+    count = len([
+        change for change in changes
+        if change.action != Change.ACTION_COMPLETE
+    ])
+    # Profile might be concurrently updated by the request thread
+    Profile.objects.filter(user=user).update(
+        translated=F('translated') + count
+    )
+
+    weblate.logger.info(
+        'propagated %s to %d units in %d translations in %.3f s',
+        unit, count, translations, time.time() - start
+    )
+    return count, translations
+
+
+def propagate_background(unit, user, change_action=None):
+    '''
+    Wrapper for running propagation in separate thread.
+
+    The request is not used as the response might be already sent.
+    '''
+    try:
+        propagate(unit, None, user, change_action)
+    except Exception as error:
+        weblate.logger.error('failed to propagate %s: %s', unit, error)
+    finally:
+        connection.close()
+
+
+def start_propagate(unit, request, change_action=None):
+    '''
+    Propagates translation, optionally in background.
+    '''
+    if appsettings.BACKGROUND_PROPAGATION:
+        thread = threading.Thread(
+            target=propagate_background,
+            args=(unit, request.user, change_action)
+        )
+        thread.start()
+    else:
+        propagate(unit, request, request.user, change_action)
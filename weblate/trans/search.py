@@ -29,7 +29,6 @@ from django.db.models.signals import post_syncdb
 from weblate import appsettings
 from whoosh.writing import AsyncWriter, BufferedWriter
 from django.dispatch import receiver
-from weblate.lang.models import Language
 
 STORAGE = FileStorage(appsettings.WHOOSH_INDEX)
 
@@ -113,40 +112,96 @@ def get_target_index(lang):
     return STORAGE.open_index(name)
 
 
+class IndexUpdater(object):
+    '''
+    Updates fulltext index using buffered writers, which are kept open
+    between batches of updates.
+
+    Writers are created only for languages which need update and hold
+    index locks until closed.
+    '''
+    def __init__(self, period=None, limit=1000):
+        self.period = period
+        self.limit = limit
+        self.writers = {}
+
+    def get_writer(self, lang=None):
+        '''
+        Returns writer for target language index or source index.
+        '''
+        if lang not in self.writers:
+            if lang is None:
+                index = get_source_index()
+            else:
+                index = get_target_index(lang)
+            self.writers[lang] = BufferedWriter(
+                index, period=self.period, limit=self.limit
+            )
+        return self.writers[lang]
+
+    def update(self, units, source_units):
+        '''
+        Adds units to index, units should have translation and language
+        already loaded.
+        '''
+        for unit in source_units:
+            update_source_unit_index(self.get_writer(), unit)
+
+        for unit in units:
+            if unit.target != '':
+                update_target_unit_index(
+                    self.get_writer(unit.translation.language.code),
+                    unit
+                )
+
+    def commit(self):
+        '''
+        Flushes buffered updates to disk.
+        '''
+        for writer in self.writers.values():
+            writer.commit()
+
+    def close(self):
+        '''
+        Commits pending updates and releases index locks.
+        '''
+        for writer in self.writers.values():
+            writer.close()
+        self.writers = {}
+
+    def optimize(self):
+        '''
+        Closes writers and merges segments of used indices.
+        '''
+        langs = self.writers.keys()
+        self.close()
+        for lang in langs:
+            if lang is None:
+                get_source_index().optimize()
+            else:
+                get_target_index(lang).optimize()
+
+
 def update_index(units, source_units=None):
     '''
     Updates fulltext index for given set of units.
     '''
-    languages = Language.objects.all()
-
     # Default to same set for both updates
     if source_units is None:
         source_units = units
 
-    # Update source index
-    index = get_source_index()
-    writer = BufferedWriter(index)
+    updater = IndexUpdater()
     try:
-        for unit in source_units.iterator():
-            update_source_unit_index(writer, unit)
-    finally:
-        writer.close()
-
-    # Update per language indices
-    for lang in languages:
-        index = get_target_index(lang.code)
-        writer = BufferedWriter(index)
-        try:
-            language_units = units.filter(
-                translation__language=lang
-            ).exclude(
+        updater.update(
+            units.exclude(
                 target=''
-            )
-
-            for unit in language_units.iterator():
-                update_target_unit_index(writer, unit)
-        finally:
-            writer.close()
+            ).select_related(
+                'translation__language'
+            ).iterator(),
+            source_units.iterator()
+        )
+    finally:
+        updater.close()
 
 
 def update_index_unit(unit, source=True):
@@ -178,6 +233,58 @@ def update_index_unit(unit, source=True):
             update_target_unit_index(writer, unit)
 
 
+def update_index_units(units, source_units=None):
+    '''
+    Adds list of units to index using single writer for each index.
+    '''
+    if source_units is None:
+        source_units = units
+
+    # Should this happen in background?
+    if appsettings.OFFLOAD_INDEXING:
+        from weblate.trans.models.search import IndexUpdate
+        source_ids = set([unit.id for unit in source_units])
+        existing = dict(
+            IndexUpdate.objects.filter(
+                unit__translation__in=set(
+                    [unit.translation_id for unit in units]
+                )
+            ).values_list('unit_id', 'source')
+        )
+        IndexUpdate.objects.bulk_create([
+            IndexUpdate(unit=unit, source=(unit.id in source_ids))
+            for unit in units if unit.id not in existing
+        ])
+        upgrade = [
+            unit.id for unit in units
+            if unit.id in source_ids
+            and unit.id in existing and not existing[unit.id]
+        ]
+        if upgrade:
+            IndexUpdate.objects.filter(unit_id__in=upgrade).update(source=True)
+        return
+
+    # Update source
+    if source_units:
+        index = get_source_index()
+        with AsyncWriter(index) as writer:
+            for unit in source_units:
+                update_source_unit_index(writer, unit)
+
+    # Update targets, grouped by language
+    languages = {}
+    for unit in units:
+        if unit.target != '':
+            code = unit.translation.language.code
+            languages.setdefault(code, []).append(unit)
+
+    for code, language_units in languages.items():
+        index = get_target_index(code)
+        with AsyncWriter(index) as writer:
+            for unit in language_units:
+                update_target_unit_index(writer, unit)
+
+
 def base_search(searcher, field, schema, query):
     '''
     Wrapper for fulltext search.
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2014 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <http://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+'''
+Cached rollups of translation statistics.
+
+Sums of translation stats are kept in the cache for each project,
+subproject, language and combination of project and language, so that
+listings do not have to aggregate translations for every row. The
+rollups are invalidated whenever stats of translation are updated and
+are recalculated on next use.
+
+The invalidation is visible to other processes only with cache shared
+between them, so the rollups are kept only for STATS_CACHE_TIMEOUT
+seconds.
+'''
+
+from django.core.cache import cache
+from django.db.models import Sum, Max
+from weblate.trans.util import translation_percent
+from weblate import appsettings
+
+# Fields summed in the rollup
+STATS_FIELDS = ('translated', 'fuzzy', 'failing_checks', 'total')
+
+
+def get_stats_key(project_id=None, subproject_id=None, language_id=None):
+    '''
+    Returns cache key for stats rollup.
+    '''
+    return 'stats-%s-%s-%s' % (project_id, subproject_id, language_id)
+
+
+def get_object_key(project=None, subproject=None, language=None):
+    '''
+    Returns cache key for stats rollup of given objects.
+    '''
+    return get_stats_key(*[
+        None if obj is None else obj.pk
+        for obj in (project, subproject, language)
+    ])
+
+
+def get_translation_keys(translation):
+    '''
+    Returns list of rollup keys affected by change in translation.
+    '''
+    project_id = translation.subproject.project_id
+    return [
+        get_stats_key(subproject_id=translation.subproject_id),
+        get_stats_key(project_id=project_id),
+        get_stats_key(language_id=translation.language_id),
+        get_stats_key(
+            project_id=project_id, language_id=translation.language_id
+        ),
+    ]
+
+
+def calculate_stats(project=None, subproject=None, language=None):
+    '''
+    Calculates stats rollup from the database.
+    '''
+    from weblate.trans.models.translation import Translation
+    translations = Translation.objects.all()
+    if project is not None:
+        translations = translations.filter(subproject__project=project)
+    if subproject is not None:
+        translations = translations.filter(subproject=subproject)
+    if language is not None:
+        translations = translations.filter(language=language)
+
+    # Aggregate per subproject to get number of source strings as well
+    rows = translations.order_by().values('subproject').annotate(
+        Sum('translated'),
+        Sum('fuzzy'),
+        Sum('failing_checks'),
+        Sum('total'),
+        Max('total'),
+    )
+
+    result = dict([(field, 0) for field in STATS_FIELDS])
+    result['strings'] = 0
+    for row in rows:
+        for field in STATS_FIELDS:
+            result[field] += row['%s__sum' % field] or 0
+        result['strings'] += row['total__max'] or 0
+    return result
+
+
+def get_stats(project=None, subproject=None, language=None):
+    '''
+    Returns stats rollup, calculating it if it is not cached.
+    '''
+    key = get_object_key(project, subproject, language)
+    result = cache.get(key)
+    if result is None:
+        result = calculate_stats(project, subproject, language)
+        cache.set(key, result, appsettings.STATS_CACHE_TIMEOUT)
+    return result
+
+
+def get_percents(project=None, subproject=None, language=None):
+    '''
+    Returns tuple of (translated, fuzzy, failing checks) percents.
+    '''
+    stats = get_stats(project, subproject, language)
+    total = stats['total']
+
+    # Catch no translations (division by zero)
+    if total == 0:
+        return (0, 0, 0)
+
+    return tuple([
+        translation_percent(stats[field], total)
+        for field in ('translated', 'fuzzy', 'failing_checks')
+    ])
+
+
+def invalidate_stats(translation):
+    '''
+    Invalidates rollups affected by change in translation.
+    '''
+    cache.delete_many(get_translation_keys(translation))
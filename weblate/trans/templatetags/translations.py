@@ -37,6 +37,7 @@ from weblate.trans.util import split_plural
 from weblate.lang.models import Language
 from weblate.trans.models import Project, SubProject, Dictionary, Advertisement
 from weblate.trans.checks import CHECKS
+from weblate.trans.checks.format import highlight_format
 
 register = template.Library()
 
@@ -74,9 +75,25 @@ def fmt_whitespace(value):
     return value
 
 
+def fmt_format(value, flags):
+    '''
+    Escapes value and highlights format strings in it.
+    '''
+    parts = []
+    last = 0
+    for start, end in highlight_format(value, flags):
+        parts.append(escape(value[last:start]))
+        parts.append(
+            u'<span class="hlformat">%s</span>' % escape(value[start:end])
+        )
+        last = end
+    parts.append(escape(value[last:]))
+    return u''.join(parts)
+
+
 @register.inclusion_tag('format-translation.html')
 def format_translation(value, language=None, diff=None, search_match=None,
-                       simple=False):
+                       simple=False, flags=None):
     """
     Nicely formats translation text possibly handling plurals or diff.
     """
@@ -104,8 +121,12 @@ def format_translation(value, language=None, diff=None, search_match=None,
 
     for idx, value in enumerate(plurals):
 
-        # HTML escape
-        value = escape(force_unicode(value))
+        # HTML escape, highlighting format strings if there is no other
+        # markup to apply
+        if flags and diff is None and search_match is None:
+            value = fmt_format(force_unicode(value), flags)
+        else:
+            value = escape(force_unicode(value))
 
         # Format diff if there is any
         if diff is not None:
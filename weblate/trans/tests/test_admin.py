@@ -101,6 +101,22 @@ class AdminTest(ViewTestCase):
         response = self.client.get(reverse('admin-performance'))
         self.assertContains(response, 'Django caching')
 
+    def test_performace_locks(self):
+        self.edit_unit('Hello, world!\n', 'Nazdar svete!\n')
+        response = self.client.get(reverse('admin-performance'))
+        self.assertContains(response, 'Repository locks')
+        self.assertContains(response, self.subproject.get_full_slug())
+
+    def test_performace_machine(self):
+        unit = self.get_unit()
+        self.client.get(
+            reverse('js-translate', kwargs={'unit_id': unit.id}),
+            {'service': 'dummy'}
+        )
+        response = self.client.get(reverse('admin-performance'))
+        self.assertContains(response, 'Machine translation')
+        self.assertContains(response, 'Dummy')
+
     def test_error(self):
         add_configuration_error('Test error', 'FOOOOOOOOOOOOOO')
         response = self.client.get(reverse('admin-performance'))
@@ -23,7 +23,9 @@ Tests for changes browsing.
 """
 
 from weblate.trans.tests.test_views import ViewTestCase
+from weblate.trans.models import Change, DailyActivity
 from django.core.urlresolvers import reverse
+from django.utils import timezone
 
 
 class ChangesTest(ViewTestCase):
@@ -74,3 +76,58 @@ class ChangesTest(ViewTestCase):
         )
         self.assertContains(response, 'New translation')
         self.assertNotContains(response, 'Invalid search string!')
+
+
+class ActivityTest(ViewTestCase):
+    def get_activity(self):
+        return sorted(
+            DailyActivity.objects.values_list(
+                'date', 'translation', 'user', 'count'
+            )
+        )
+
+    def test_rollup(self):
+        self.edit_unit(
+            'Hello, world!\n',
+            'Nazdar svete!\n'
+        )
+        expected = sorted(Change.objects.get_daily_counts())
+        self.assertEqual(
+            sum([item[3] for item in expected]),
+            Change.objects.count()
+        )
+        self.assertEqual(expected, self.get_activity())
+        DailyActivity.objects.rebuild()
+        self.assertEqual(expected, self.get_activity())
+
+    def test_anonymous(self):
+        DailyActivity.objects.all().delete()
+        for dummy in range(2):
+            Change.objects.create(
+                translation=self.get_translation(),
+                action=Change.ACTION_UPDATE,
+            )
+        # Records without user are counted together as well
+        self.assertEqual(
+            DailyActivity.objects.values_list('user', 'count').get(),
+            (None, 2)
+        )
+
+    def test_stats(self):
+        self.edit_unit(
+            'Hello, world!\n',
+            'Nazdar svete!\n'
+        )
+        # Move activity to yesterday as current day is not included
+        DailyActivity.objects.update(
+            date=timezone.now().date() - timezone.timedelta(days=1)
+        )
+        total = Change.objects.filter(
+            translation__subproject__project=self.project
+        ).count()
+        stats = Change.objects.month_stats(self.project)
+        self.assertEqual(len(stats), 30)
+        self.assertEqual(stats[-1][1], total)
+        self.assertEqual(sum([item[1] for item in stats]), total)
+        stats = Change.objects.year_stats(user=self.user)
+        self.assertEqual(stats[-1][1], 1)
@@ -22,7 +22,11 @@
 Helpers for quality checks tests.
 """
 
+from django.core.cache import cache
 from django.test import TestCase
+from weblate.trans.checks.cache import CheckCache, LRUCache
+from weblate.trans.checks.markup import BBCodeCheck
+from weblate.trans.checks.same import SameCheck
 import uuid
 
 
@@ -200,3 +204,54 @@ class CheckTestCase(TestCase):
                 MockUnit(None, self.test_ignore_check[2])
             )
         )
+
+
+class CheckCacheTest(TestCase):
+    '''
+    Testing of cache for source string data.
+    '''
+    def test_lru(self):
+        lru = LRUCache(2)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        self.assertEqual(lru.get('a'), 1)
+        lru.set('c', 3)
+        self.assertEqual(len(lru), 2)
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(lru.get('a'), 1)
+        self.assertEqual(lru.get('c'), 3)
+
+    def test_batch(self):
+        check_cache = CheckCache()
+        prefix = 'check-test-%s-' % uuid.uuid1()
+        cache.set(prefix + 'shared', 'value')
+        with check_cache.batch([prefix + 'shared', prefix + 'missing']):
+            self.assertEqual(check_cache.get(prefix + 'shared'), 'value')
+            self.assertIsNone(check_cache.get(prefix + 'missing'))
+            # Missing key is not looked up again
+            cache.set(prefix + 'missing', 'value')
+            self.assertIsNone(check_cache.get(prefix + 'missing'))
+            # Writes are delayed
+            check_cache.set(prefix + 'new', 'new')
+            self.assertIsNone(cache.get(prefix + 'new'))
+            self.assertEqual(check_cache.get(prefix + 'new'), 'new')
+        self.assertEqual(cache.get(prefix + 'new'), 'new')
+        self.assertEqual(check_cache.get(prefix + 'missing'), 'value')
+
+    def test_keys(self):
+        check = BBCodeCheck()
+        unit = MockUnit(source='[b]string[/b]')
+        self.assertEqual(
+            check.get_cache_keys(unit),
+            [check.get_cache_key('[b]string[/b]', unit)]
+        )
+        # Keys do not depend on unit, but on flags for same check
+        check = SameCheck()
+        self.assertEqual(
+            check.get_cache_key('string', MockUnit()),
+            check.get_cache_key('string', MockUnit()),
+        )
+        self.assertNotEqual(
+            check.get_cache_key('string', MockUnit()),
+            check.get_cache_key('string', MockUnit(flags='python-format')),
+        )
@@ -23,8 +23,16 @@ Tests for management commands.
 """
 
 from django.test import TestCase
+from django.contrib.auth.models import User
 from weblate.trans.tests.test_models import RepoTestCase
-from weblate.trans.models import SubProject
+from weblate.trans.models import (
+    SubProject, IndexUpdate, Unit, Check, Change
+)
+from weblate.trans.search import fulltext_search, IndexUpdater
+from weblate.trans.management.commands.update_index import (
+    Command as UpdateIndexCommand
+)
+from weblate.accounts.models import Profile
 from django.core.management import call_command
 from django.core.management.base import CommandError
 import django
@@ -195,6 +203,42 @@ class PeriodicCommandTest(RepoTestCase):
             'update_index'
         )
 
+    def test_update_index_batch(self):
+        IndexUpdate.objects.bulk_create([
+            IndexUpdate(unit=unit) for unit in Unit.objects.all()
+        ])
+        call_command(
+            'update_index',
+            stats=True
+        )
+        call_command(
+            'update_index',
+            batch=2
+        )
+        self.assertFalse(IndexUpdate.objects.exists())
+        unit = Unit.objects.filter(source='Thank you for using Weblate.')[0]
+        self.assertIn(
+            unit.checksum,
+            fulltext_search('Thank', 'cs', context=False, target=False)
+        )
+
+    def test_update_index_commit(self):
+        IndexUpdate.objects.bulk_create([
+            IndexUpdate(unit=unit) for unit in Unit.objects.all()
+        ])
+        total = IndexUpdate.objects.count()
+        command = UpdateIndexCommand()
+        command.processed = []
+        command.last_id = 0
+        updater = IndexUpdater(limit=2)
+        self.assertEqual(command.process_batch(updater, 2), 2)
+        # Updates stay in queue until index is committed
+        self.assertEqual(IndexUpdate.objects.count(), total)
+        self.assertEqual(command.process_batch(updater, total), total - 2)
+        self.assertEqual(command.process_batch(updater, total), 0)
+        command.commit(updater.close)
+        self.assertFalse(IndexUpdate.objects.exists())
+
     def test_list_checks(self):
         call_command(
             'list_ignored_checks'
@@ -261,6 +305,31 @@ class CommitPendingTest(CheckGitTest):
     command_name = 'commit_pending'
 
 
+class FlushPendingTest(CheckGitTest):
+    command_name = 'flush_pending'
+
+    def test_pending(self):
+        Unit.objects.filter(
+            translation__language_code='cs',
+            source='Thank you for using Weblate.'
+        ).update(
+            target=u'Děkujeme za použití Weblate.',
+            translated=True,
+            pending=True
+        )
+        self.do_test(all=True)
+        self.assertFalse(Unit.objects.filter(pending=True).exists())
+        unit = Unit.objects.get(
+            translation__language_code='cs',
+            source='Thank you for using Weblate.'
+        )
+        with open(unit.translation.get_filename()) as handle:
+            self.assertIn(
+                u'Děkujeme za použití Weblate.',
+                handle.read().decode('utf-8')
+            )
+
+
 class CommitGitTest(CheckGitTest):
     command_name = 'commitgit'
 
@@ -276,6 +345,139 @@ class LoadTest(CheckGitTest):
 class UpdateChecksTest(CheckGitTest):
     command_name = 'updatechecks'
 
+    def get_checks(self):
+        return set(
+            Check.objects.values_list('contentsum', 'language', 'check')
+        )
+
+    def test_same_checks(self):
+        # Translations triggering checks
+        Unit.objects.filter(
+            source='Thank you for using Weblate.'
+        ).update(
+            target='Thank you for using Weblate.',
+            translated=True
+        )
+        Unit.objects.filter(
+            source='Try Weblate at <http://demo.weblate.org/>!\n'
+        ).update(
+            target='Zkuste Weblate na <http://demo.weblate.org/>',
+            translated=True
+        )
+        Check.objects.all().delete()
+        for unit in Unit.objects.all():
+            unit.run_checks()
+        expected = self.get_checks()
+        self.assertTrue(expected)
+        failing = set(
+            Unit.objects.filter(
+                has_failing_check=True
+            ).values_list('id', flat=True)
+        )
+        Check.objects.all().delete()
+        Unit.objects.update(has_failing_check=False)
+        self.do_test(all=True)
+        self.assertEqual(expected, self.get_checks())
+        self.assertEqual(
+            failing,
+            set(
+                Unit.objects.filter(
+                    has_failing_check=True
+                ).values_list('id', flat=True)
+            )
+        )
+
+
+class AutoTranslateTest(RepoTestCase):
+    def setUp(self):
+        super(AutoTranslateTest, self).setUp()
+        self.subproject = self.create_subproject()
+        SubProject.objects.create(
+            name='Test2',
+            slug='test2',
+            project=self.subproject.project,
+            repo='weblate://test/test',
+            file_format='po',
+            filemask='po-link/*.po',
+        )
+        self.user = User.objects.create_user(
+            'testuser',
+            'noreply@weblate.org',
+            'testpassword'
+        )
+        Profile.objects.create(user=self.user)
+
+    def test_command(self):
+        Unit.objects.filter(
+            translation__subproject__slug='test',
+            translation__language_code='cs',
+            source='Thank you for using Weblate.'
+        ).update(
+            target=u'Děkujeme za použití Weblate.',
+            translated=True
+        )
+        call_command('auto_translate', 'test/test2', user='testuser')
+        unit = Unit.objects.get(
+            translation__subproject__slug='test2',
+            translation__language_code='cs',
+            source='Thank you for using Weblate.'
+        )
+        self.assertTrue(unit.translated)
+        self.assertEqual(unit.target, u'Děkujeme za použití Weblate.')
+        translation = unit.translation
+        self.assertEqual(translation.translated, 2)
+        with open(translation.get_filename()) as handle:
+            self.assertIn(
+                u'Děkujeme za použití Weblate.',
+                handle.read().decode('utf-8')
+            )
+        self.assertEqual(
+            Profile.objects.get(user=self.user).translated,
+            1
+        )
+
+    def test_command_anonymous(self):
+        Unit.objects.filter(
+            translation__subproject__slug='test',
+            translation__language_code='cs',
+            source='Thank you for using Weblate.'
+        ).update(
+            target=u'Děkujeme za použití Weblate.',
+            translated=True
+        )
+        call_command('auto_translate', 'test/test2')
+        unit = Unit.objects.get(
+            translation__subproject__slug='test2',
+            translation__language_code='cs',
+            source='Thank you for using Weblate.'
+        )
+        self.assertTrue(unit.translated)
+        self.assertEqual(unit.translation.translated, 2)
+        self.assertEqual(
+            Change.objects.filter(
+                translation=unit.translation,
+                action=Change.ACTION_AUTO
+            ).count(),
+            1
+        )
+
+    def test_invalid(self):
+        self.assertRaises(
+            COMMAND_EXCEPTION,
+            call_command,
+            'auto_translate',
+            'test/test2',
+            user='nonexisting'
+        )
+        self.assertRaises(
+            COMMAND_EXCEPTION,
+            call_command,
+            'auto_translate',
+            'test/test2',
+            user='testuser',
+            source='test/nonexisting'
+        )
+
 
 class UpdateGitTest(CheckGitTest):
     command_name = 'updategit'
@@ -24,11 +24,26 @@ Tests for quality checks.
 
 from django.test import TestCase
 from weblate.trans.checks.consistency import (
-    PluralsCheck,
+    PluralsCheck, ConsistencyCheck,
 )
 from weblate.trans.tests.test_checks import MockUnit
 
 
+class MockSameUnit(MockUnit):
+    '''
+    Mock unit object with units with same source.
+    '''
+    def __init__(self, target, same_units, translated=True):
+        super(MockSameUnit, self).__init__('consistency')
+        self.translation.subproject.allow_translation_propagation = True
+        self.target = target
+        self.translated = translated
+        self.same_units = same_units
+
+    def get_same_units(self):
+        return self.same_units
+
+
 class PluralsCheckTest(TestCase):
     def setUp(self):
         self.check = PluralsCheck()
@@ -53,3 +68,39 @@ class PluralsCheckTest(TestCase):
             ['string', ''],
             MockUnit('plural_partial_empty'),
         ))
+
+
+class ConsistencyCheckTest(TestCase):
+    def setUp(self):
+        self.check = ConsistencyCheck()
+
+    def do_test(self, unit):
+        return self.check.check_target(
+            ['string'], [unit.target], unit
+        )
+
+    def test_alone(self):
+        self.assertFalse(self.do_test(MockSameUnit('string', [])))
+
+    def test_consistent(self):
+        self.assertFalse(self.do_test(
+            MockSameUnit('string', [(1, 'string', True, True)])
+        ))
+
+    def test_inconsistent(self):
+        self.assertTrue(self.do_test(
+            MockSameUnit('string', [(1, 'other', True, True)])
+        ))
+
+    def test_no_propagation(self):
+        self.assertFalse(self.do_test(
+            MockSameUnit('string', [(1, 'other', True, False)])
+        ))
+
+    def test_untranslated(self):
+        self.assertFalse(self.do_test(
+            MockSameUnit('', [(1, '', False, True)], False)
+        ))
+        self.assertTrue(self.do_test(
+            MockSameUnit('', [(1, 'other', True, True)], False)
+        ))
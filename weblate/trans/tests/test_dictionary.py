@@ -26,6 +26,7 @@ from weblate.trans.tests.test_views import ViewTestCase
 from weblate.trans.models import Dictionary
 from django.core.urlresolvers import reverse
 from weblate.trans.tests.test_util import get_test_file
+from weblate.trans import glossary
 
 TEST_TBX = get_test_file('terms.tbx')
 TEST_CSV = get_test_file('terms.csv')
@@ -179,6 +180,126 @@ class DictionaryTest(ViewTestCase):
         # Check number of objects
         self.assertEqual(Dictionary.objects.count(), 0)
 
+    def add_word(self, source, target):
+        word = Dictionary(
+            project=self.project,
+            language=self.get_translation().language,
+            source=source,
+            target=target,
+        )
+        word.save()
+        return word
+
+    def get_glossary(self, source):
+        return [
+            word.source
+            for word in Dictionary.objects.get_words(self.get_unit(source))
+        ]
+
+    def test_get_words(self):
+        '''
+        Test for matching glossary words in units.
+        '''
+        self.add_word('world', u'svět')
+        self.add_word('banana', u'banán')
+        self.add_word('using Weblate', u'používání Weblate')
+        self.add_word('for using', u'pro používání')
+        self.add_word('Weblate demo', u'ukázka Weblate')
+
+        self.assertEqual(
+            self.get_glossary('Hello, world!\n'),
+            ['world']
+        )
+        # Stemmed match
+        self.assertEqual(
+            self.get_glossary('Orangutan has %d banana.\n'),
+            ['banana']
+        )
+        # Multi word terms
+        self.assertEqual(
+            self.get_glossary('Thank you for using Weblate.'),
+            ['for using', 'using Weblate']
+        )
+
+        # Index is updated on change
+        word = Dictionary.objects.get(source='world')
+        word.source = 'hello'
+        word.save()
+        self.assertEqual(
+            self.get_glossary('Hello, world!\n'),
+            ['hello']
+        )
+        word.delete()
+        self.assertEqual(
+            self.get_glossary('Hello, world!\n'),
+            []
+        )
+
+    def test_import_invalidate(self):
+        '''
+        Test that glossary is invalidated only once on import.
+        '''
+        calls = []
+        orig = glossary.cache.set
+
+        def record_set(key, *args, **kwargs):
+            calls.append(key)
+            return orig(key, *args, **kwargs)
+
+        glossary.cache.set = record_set
+        try:
+            self.import_file(TEST_TBX)
+        finally:
+            glossary.cache.set = orig
+        self.assertEqual(len(calls), 1)
+
+    def test_glossary_lru(self):
+        '''
+        Test that only limited number of glossaries is kept in memory.
+        '''
+        self.add_word('world', u'svět')
+        orig = glossary.GLOSSARY_SIZE
+        glossary.GLOSSARY_SIZE = 1
+        try:
+            self.assertEqual(
+                self.get_glossary('Hello, world!\n'),
+                ['world']
+            )
+            glossary.get_words(self.project.id + 1, 1, [u'world'])
+            self.assertEqual(len(glossary.GLOSSARY), 1)
+            self.assertEqual(
+                self.get_glossary('Hello, world!\n'),
+                ['world']
+            )
+            self.assertEqual(len(glossary.GLOSSARY), 1)
+        finally:
+            glossary.GLOSSARY_SIZE = orig
+
+    def test_glossary_ttl(self):
+        '''
+        Test that glossary is reloaded after TTL even without cache.
+        '''
+        self.add_word('world', u'svět')
+        self.assertEqual(
+            self.get_glossary('Hello, world!\n'),
+            ['world']
+        )
+        # Bulk update does not invalidate the glossary
+        Dictionary.objects.filter(source='world').update(source='hello')
+        self.assertEqual(
+            self.get_glossary('Hello, world!\n'),
+            ['world']
+        )
+        orig = glossary.GLOSSARY_TTL
+        glossary.GLOSSARY_TTL = -1
+        try:
+            self.assertEqual(
+                self.get_glossary('Hello, world!\n'),
+                ['hello']
+            )
+        finally:
+            glossary.GLOSSARY_TTL = orig
+
     def test_download_csv(self):
         '''
         Test for downloading CVS file.
@@ -70,3 +70,12 @@ class DiffTest(TestCase):
             )['items'][0]['content'],
             u'<span class="hlmatch">Hello</span> world!'
         )
+
+    def test_fmtformat(self):
+        self.assertEqual(
+            format_translation(
+                'Hello %s <b>!',
+                flags=set(['python-format']),
+            )['items'][0]['content'],
+            u'Hello <span class="hlformat">%s</span> &lt;b&gt;!'
+        )
@@ -58,6 +58,19 @@ class ExportsViewTest(ViewTestCase):
         )
         parsed = json.loads(response.content)
         self.assertEqual(parsed[0]['name'], 'Czech')
+        self.assertEqual(parsed[0]['last_author'], None)
+
+        # Last change is included
+        self.edit_unit(
+            'Hello, world!\n',
+            'Nazdar svete!\n'
+        )
+        response = self.client.get(
+            reverse('export_stats', kwargs=self.kw_subproject)
+        )
+        parsed = json.loads(response.content)
+        self.assertEqual(parsed[0]['last_author'], 'testuser')
+        self.assertNotEqual(parsed[0]['last_change'], None)
 
     def test_data(self):
         response = self.client.get(
@@ -25,6 +25,7 @@ Tests for quality checks.
 from unittest import TestCase
 from weblate.trans.checks.format import (
     PythonFormatCheck, PHPFormatCheck, CFormatCheck, PythonBraceFormatCheck,
+    highlight_format, get_unit_formats,
 )
 from weblate.trans.tests.test_checks import MockUnit
 
@@ -434,3 +435,42 @@ class PythonBraceFormatCheckTest(TestCase):
             0,
             False
         ))
+
+
+class FormatParserTest(TestCase):
+    def test_parse(self):
+        check = PythonFormatCheck()
+        parsed = check.parse_format(u'%(name)s has %(count)d%%')
+        self.assertEqual(parsed.names, ('(name)s', '(count)d'))
+        self.assertEqual(parsed.spans, ((0, 8), (13, 22)))
+        self.assertFalse(parsed.uses_position)
+        self.assertTrue(check.parse_format(u'%s has %d').uses_position)
+        # Parsed strings are cached
+        self.assertIs(
+            check.parse_format(u'%(name)s has %(count)d%%'),
+            parsed
+        )
+
+    def test_unit_formats(self):
+        unit = MockUnit(flags='python-format,c-format')
+        tgt_formats = get_unit_formats(unit, [u'%s'], [u'%d'])[1]
+        self.assertEqual(
+            set(tgt_formats[0].keys()), set(['python-format', 'c-format'])
+        )
+        # Parsed only once for all checks
+        self.assertIs(get_unit_formats(unit, [u'%s'], [u'%d'])[1], tgt_formats)
+        # Changed strings are parsed again
+        self.assertIsNot(
+            get_unit_formats(unit, [u'%s'], [u'%s'])[1], tgt_formats
+        )
+
+    def test_highlight(self):
+        text = u'%s and {0} and %d'
+        self.assertEqual(highlight_format(text, ['python-format']), [
+            (0, 2), (15, 17),
+        ])
+        self.assertEqual(
+            highlight_format(text, ['python-format', 'python-brace-format']),
+            [(0, 2), (7, 10), (15, 17)]
+        )
+        self.assertEqual(highlight_format(text, []), [])
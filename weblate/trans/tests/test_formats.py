@@ -21,9 +21,11 @@
 File format specific behavior.
 '''
 import tempfile
+import shutil
 from unittest import TestCase
+from weblate import appsettings
 from weblate.trans.formats import (
-    AutoFormat, PoFormat, AndroidFormat,
+    AutoFormat, PoFormat, AndroidFormat, STORE_CACHE,
 )
 from weblate.trans.tests.test_util import get_test_file
 
@@ -89,3 +91,49 @@ class AndroidFormatTest(AutoFormatTest):
     MATCH = '<resources></resources>'
     MASK = 'res/values-*/strings.xml'
     EXPECTED_PATH = '/path/res/values-cs-rCZ/strings.xml'
+
+
+class StoreCacheTest(TestCase):
+    def setUp(self):
+        STORE_CACHE.clear()
+        self.out = tempfile.NamedTemporaryFile(suffix='.po')
+        shutil.copyfile(TEST_PO, self.out.name)
+
+    def tearDown(self):
+        self.out.close()
+        appsettings.STORE_CACHE_SIZE = 10 * 1024 * 1024
+
+    def test_cached(self):
+        stats = STORE_CACHE.get_stats()
+        first = PoFormat(self.out.name)
+        second = PoFormat(self.out.name)
+        self.assertTrue(first.store is second.store)
+        new_stats = STORE_CACHE.get_stats()
+        self.assertEqual(new_stats['hits'], stats['hits'] + 1)
+        self.assertEqual(new_stats['misses'], stats['misses'] + 1)
+        self.assertEqual(new_stats['stores'], 1)
+
+    def test_save(self):
+        storage = PoFormat(self.out.name)
+        unit, add = storage.find_unit('', 'Hello, world!\n')
+        unit.set_target('Nazdar svete!\n')
+        storage.save()
+        storage = PoFormat(self.out.name)
+        unit, add = storage.find_unit('', 'Hello, world!\n')
+        self.assertEqual(unit.get_target(), 'Nazdar svete!\n')
+
+    def test_changed(self):
+        first = PoFormat(self.out.name)
+        with open(self.out.name, 'a') as handle:
+            handle.write('\n')
+        second = PoFormat(self.out.name)
+        self.assertFalse(first.store is second.store)
+        STORE_CACHE.invalidate(self.out.name)
+        self.assertEqual(STORE_CACHE.get_stats()['stores'], 0)
+
+    def test_limit(self):
+        appsettings.STORE_CACHE_SIZE = 10
+        first = PoFormat(self.out.name)
+        second = PoFormat(self.out.name)
+        self.assertFalse(first.store is second.store)
+        self.assertEqual(STORE_CACHE.get_stats()['stores'], 0)
@@ -23,7 +23,11 @@ Tests for notification hooks.
 """
 
 from django.core.urlresolvers import reverse
+from django.core.management import call_command
+from django.utils import timezone
+from datetime import timedelta
 from weblate.trans.tests.test_views import ViewTestCase
+from weblate.trans.models import RepositoryUpdate
 from weblate import appsettings
 
 GITHUB_PAYLOAD = '''
@@ -232,6 +236,55 @@ class HooksViewTest(ViewTestCase):
         )
         self.assertContains(response, 'update triggered')
 
+    def test_view_hook_offload(self):
+        appsettings.OFFLOAD_UPDATES = True
+        appsettings.ENABLE_HOOKS = True
+        try:
+            for i in range(3):
+                response = self.client.get(
+                    reverse('hook-subproject', kwargs={
+                        'project': self.subproject.project.slug,
+                        'subproject': self.subproject.slug,
+                    })
+                )
+                self.assertContains(response, 'update triggered')
+        finally:
+            appsettings.OFFLOAD_UPDATES = False
+
+        # Requests are coalesced
+        self.assertEqual(
+            RepositoryUpdate.objects.get_stats()['pending'],
+            1
+        )
+
+        # Running update blocks another one for same repository
+        update = RepositoryUpdate.objects.claim()
+        self.assertEqual(update.subproject, self.subproject)
+        RepositoryUpdate.objects.enqueue(self.subproject)
+        self.assertIsNone(RepositoryUpdate.objects.claim())
+
+        update.process()
+        call_command('process_updates', workers=1)
+        self.assertFalse(RepositoryUpdate.objects.exists())
+
+    def test_claim_stale(self):
+        RepositoryUpdate.objects.enqueue(self.subproject)
+        update = RepositoryUpdate.objects.claim()
+        RepositoryUpdate.objects.enqueue(self.subproject)
+
+        # Long running update with heartbeat is not released
+        RepositoryUpdate.objects.filter(pk=update.pk).update(
+            started=timezone.now() - timedelta(hours=2)
+        )
+        self.assertIsNone(RepositoryUpdate.objects.claim())
+
+        # Update without heartbeat is released and claimed again
+        RepositoryUpdate.objects.filter(pk=update.pk).update(
+            heartbeat=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(RepositoryUpdate.objects.claim().pk, update.pk)
+        self.assertIsNone(RepositoryUpdate.objects.claim())
+
     def test_view_hook_github(self):
         appsettings.BACKGROUND_HOOKS = False
         appsettings.ENABLE_HOOKS = True
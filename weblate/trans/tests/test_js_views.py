@@ -23,7 +23,9 @@ Tests for AJAX/JS views.
 """
 
 from weblate.trans.tests.test_views import ViewTestCase
+from weblate.trans.machine.pool import POOL
 from django.core.urlresolvers import reverse
+import httpretty
 import json
 
 
@@ -90,6 +92,42 @@ class JSViewsTest(ViewTestCase):
         )
         self.assertEqual(response.status_code, 400)
 
+    @httpretty.activate
+    def test_translate_all(self):
+        # Do not keep connections to fake server
+        self.addCleanup(POOL.clear)
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://datamarket.accesscontrol.windows.net/v2/OAuth2-13',
+            body='{"access_token":"TOKEN"}'
+        )
+        httpretty.register_uri(
+            httpretty.GET,
+            'http://api.microsofttranslator.com/V2/Ajax.svc/'
+            'GetLanguagesForTranslate',
+            body='["en","cs"]'
+        )
+        httpretty.register_uri(
+            httpretty.GET,
+            'http://api.microsofttranslator.com/V2/Ajax.svc/Translate',
+            body=u'"svět"'.encode('utf-8')
+        )
+        unit = self.get_unit()
+        response = self.client.get(
+            reverse('js-translate-all', kwargs={'unit_id': unit.id}),
+        )
+        services = dict([
+            (service['service'], service)
+            for service in [
+                json.loads(line)
+                for line in ''.join(response.streaming_content).splitlines()
+            ]
+        ])
+        self.assertEqual(services['Dummy']['lang'], 'cs')
+        self.assertEqual(services['Dummy']['responseStatus'], 200)
+        self.assertEqual(len(services['Dummy']['translations']), 2)
+        self.assertIn('Microsoft Translator', services)
+
     def test_get_unit_changes(self):
         unit = self.get_unit()
         response = self.client.get(
@@ -24,7 +24,13 @@ Tests for locking.
 
 from weblate.trans.tests.test_views import ViewTestCase
 from weblate.trans.models.subproject import SubProject
+from weblate.trans.filelock import FileLock, FileLockException
+from weblate.trans.lockstats import record_lock, get_lock_stats
 from django.core.urlresolvers import reverse
+from django.test import TestCase
+import tempfile
+import shutil
+import os
 
 
 class LockTest(ViewTestCase):
@@ -132,3 +138,40 @@ class LockTest(ViewTestCase):
             reverse('js-lock', kwargs=self.kw_translation)
         )
         self.assertFalse(self.get_translation().is_user_locked())
+
+
+class FileLockTest(TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tempdir, 'test')
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_lock(self):
+        times = []
+        lock = FileLock(
+            self.filename,
+            callback=lambda wait, hold: times.append((wait, hold))
+        )
+        with lock:
+            self.assertTrue(lock.is_locked)
+            # Second lock on same file times out
+            other = FileLock(self.filename, timeout=0.1)
+            self.assertRaises(FileLockException, other.acquire)
+            self.assertFalse(other.is_locked)
+        self.assertFalse(lock.is_locked)
+        self.assertEqual(len(times), 1)
+
+        # Lock is free again
+        with FileLock(self.filename, timeout=0.1) as other:
+            self.assertTrue(other.is_locked)
+
+    def test_stats(self):
+        record_lock('test-lock', 0, 0.5)
+        record_lock('test-lock', 20, 0.5)
+        stats = get_lock_stats(['test-lock', 'unused-lock'])
+        self.assertEqual(
+            stats,
+            [('test-lock', [1, 0, 0, 0, 0, 1], [0, 0, 0, 2, 0, 0])]
+        )
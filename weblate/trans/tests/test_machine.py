@@ -19,10 +19,19 @@
 #
 
 import httpretty
+import threading
+import time
+import urllib2
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from django.core.cache import cache
 from django.test import TestCase
 from weblate.trans.tests.test_views import ViewTestCase
 from weblate.trans.models.unit import Unit
-from weblate.trans.machine.base import MachineTranslationError
+from weblate.trans.machine.base import (
+    MachineTranslationError, translate_services, iterate_services
+)
+from weblate.trans.machine.pool import ConnectionPool
+from weblate.trans.machine.stats import get_machine_stats
 from weblate.trans.machine.dummy import DummyTranslation
 from weblate.trans.machine.glosbe import GlosbeTranslation
 from weblate.trans.machine.mymemory import MyMemoryTranslation
@@ -36,6 +45,11 @@ from weblate.trans.machine.google import (
 from weblate.trans.machine.weblatetm import (
     WeblateSimilarTranslation, WeblateTranslation
 )
+from weblate.trans import memory
+from weblate.trans.memory import (
+    TranslationMemory, lookup, get_memory, next_version, get_changes_key,
+)
+from django.core.cache import cache
 
 GLOSBE_JSON = u'''
 {
@@ -124,6 +138,95 @@ OPENTRAN_JSON = u'''
 '''.encode('utf-8')
 
 
+class SlowTranslation(DummyTranslation):
+    '''
+    Dummy machine translation which does not reply in time.
+    '''
+    name = 'Slow'
+
+    def download_translations(self, language, text, unit, user):
+        time.sleep(1)
+        return []
+
+
+class FakeServerHandler(BaseHTTPRequestHandler):
+    '''
+    Handler for fake translation service keeping connections alive.
+    '''
+    protocol_version = 'HTTP/1.1'
+    connections = 0
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        FakeServerHandler.connections += 1
+
+    def do_GET(self):
+        if self.path.startswith('/missing'):
+            body = 'Not found'
+            self.send_response(404)
+        else:
+            body = '["svet"]'
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        # Close connection without telling client
+        if self.path.startswith('/close'):
+            self.close_connection = 1
+
+    def log_message(self, *args):
+        return
+
+
+class ConnectionPoolTest(TestCase):
+    '''
+    Testing of persistent connections to translation services.
+    '''
+    def setUp(self):
+        FakeServerHandler.connections = 0
+        self.server = HTTPServer(('127.0.0.1', 0), FakeServerHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.url = 'http://127.0.0.1:%d' % self.server.server_port
+        self.pool = ConnectionPool()
+
+    def tearDown(self):
+        self.pool.clear()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_reuse(self):
+        for dummy in range(3):
+            self.assertEqual(
+                self.pool.request('GET', self.url + '/translate', timeout=1),
+                '["svet"]'
+            )
+        self.assertEqual(self.pool.created, 1)
+        self.assertEqual(self.pool.reused, 2)
+        self.assertEqual(FakeServerHandler.connections, 1)
+
+    def test_error(self):
+        self.assertRaises(
+            urllib2.HTTPError,
+            self.pool.request,
+            'GET', self.url + '/missing', timeout=1
+        )
+        # Connection is still usable after error response
+        self.pool.request('GET', self.url + '/translate', timeout=1)
+        self.assertEqual(FakeServerHandler.connections, 1)
+
+    def test_closed(self):
+        self.pool.request('GET', self.url + '/close', timeout=1)
+        time.sleep(0.1)
+        self.assertEqual(
+            self.pool.request('GET', self.url + '/translate', timeout=1),
+            '["svet"]'
+        )
+        self.assertEqual(self.pool.created, 2)
+        self.assertEqual(FakeServerHandler.connections, 2)
+
+
 class MachineTranslationTest(TestCase):
     '''
     Testing of machine translation core.
@@ -148,6 +251,66 @@ class MachineTranslationTest(TestCase):
             2
         )
 
+    def test_translate_cache(self):
+        machine_translation = DummyTranslation()
+        cache.delete(
+            machine_translation.get_cache_key('cs', 'Hello, world!')
+        )
+        before = get_machine_stats([machine_translation])
+        first = machine_translation.translate(
+            'cs', 'Hello, world!', None, None
+        )
+        second = machine_translation.translate(
+            'cs', 'Hello, world!', None, None
+        )
+        self.assertEqual(first, second)
+        after = get_machine_stats([machine_translation])
+        if before:
+            hits = before[0]['hits']
+            requests = before[0]['requests']
+        else:
+            hits = requests = 0
+        self.assertEqual(after[0]['hits'], hits + 1)
+        self.assertEqual(after[0]['requests'], requests + 1)
+
+    def test_translate_services(self):
+        machine_translation = DummyTranslation()
+        slow_translation = SlowTranslation()
+        results = translate_services(
+            [machine_translation, slow_translation],
+            'cs', 'Hello, world!', None, None, timeout=0.2
+        )
+        self.assertEqual(len(results[0][1]), 2)
+        self.assertIsNone(results[0][2])
+        self.assertEqual(results[1][1], [])
+        self.assertIn('timed out', results[1][2])
+
+    def test_translate_empty_cache(self):
+        machine_translation = DummyTranslation()
+        cache.delete(machine_translation.get_cache_key('cs', 'Hello'))
+        self.assertEqual(
+            machine_translation.translate('cs', 'Hello', None, None),
+            []
+        )
+        # Empty result is not cached
+        self.assertIsNone(
+            cache.get(machine_translation.get_cache_key('cs', 'Hello'))
+        )
+
+    def test_iterate_services(self):
+        machine_translation = DummyTranslation()
+        slow_translation = SlowTranslation()
+        slow_translation.local = False
+        results = iterate_services(
+            [slow_translation, machine_translation],
+            'cs', 'Hello, world!', None, None, timeout=2
+        )
+        # Results are returned as they arrive
+        self.assertEqual(
+            [result[0].name for result in results],
+            ['Dummy', 'Slow']
+        )
+
     def assertTranslate(self, machine, lang='cs', word='world', empty=False):
         translation = machine.translate(lang, word, None, None)
         self.assertIsInstance(translation, list)
@@ -319,3 +482,110 @@ class WeblateTranslationTest(ViewTestCase):
             self.user
         )
         self.assertEqual(results, [])
+
+    def test_memory_update(self):
+        unit = Unit.objects.get(
+            translation__language_code='cs',
+            source='Thank you for using Weblate.'
+        )
+        # Load memory
+        self.assertEqual(lookup('cs', 'Thank you for using Weblate!'), [])
+        unit.target = u'Děkujeme za použití Weblate.'
+        unit.translated = True
+        unit.save(backend=True)
+        results = lookup('cs', 'Thank you for using Weblate!', exact=False)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0][1], unit.id)
+        self.assertEqual(results[0][3], u'Děkujeme za použití Weblate.')
+        results = lookup('cs', 'Thank you for using Weblate.')
+        self.assertEqual(results[0][0], 100)
+        # Exact matches are case sensitive
+        self.assertEqual(lookup('cs', 'thank you  for using Weblate.'), [])
+        unit.translated = False
+        unit.save(backend=True)
+        self.assertEqual(lookup('cs', 'Thank you for using Weblate.'), [])
+
+    def change_other_process(self, target, record=True):
+        '''
+        Changes unit in database as it would be done by other process.
+        '''
+        unit = Unit.objects.get(
+            translation__language_code='cs',
+            source='Thank you for using Weblate.'
+        )
+        Unit.objects.filter(pk=unit.pk).update(
+            target=target,
+            translated=True
+        )
+        version = next_version('cs')
+        if record:
+            cache.set(get_changes_key('cs', version), [unit.id])
+        # Skip reload interval
+        get_memory('cs').timestamp = 0
+        return unit
+
+    def test_memory_refresh(self):
+        memory = get_memory('cs')
+        unit = self.change_other_process(u'Děkujeme za použití Weblate.')
+        results = lookup('cs', 'Thank you for using Weblate.')
+        self.assertEqual(results[0][1], unit.id)
+        # Changes were applied to already loaded memory
+        self.assertIs(get_memory('cs'), memory)
+
+    def test_memory_reload(self):
+        memory = get_memory('cs')
+        unit = self.change_other_process(
+            u'Děkujeme za použití Weblate.', False
+        )
+        results = lookup('cs', 'Thank you for using Weblate.')
+        self.assertEqual(results[0][1], unit.id)
+        # Memory was loaded again as changes are not known
+        self.assertIsNot(get_memory('cs'), memory)
+
+
+class TranslationMemoryTest(TestCase):
+    def setUp(self):
+        self.memory = TranslationMemory('cs')
+        self.memory.add(1, 'Hello, world!', 'Ahoj svete!', 'Test/Test', 1)
+        self.memory.add(2, 'Hello, World!', 'Ahoj!', 'Test/Second', 1)
+        self.memory.add(3, 'Try Weblate', 'Zkuste Weblate', 'Test/Test', 1)
+
+    def test_exact(self):
+        results = self.memory.lookup('Hello, world!')
+        self.assertEqual([result[1] for result in results], [1])
+        self.assertEqual(results[0][0], 100)
+        self.assertEqual(self.memory.lookup('hello,  world!'), [])
+
+    def test_fuzzy(self):
+        results = self.memory.lookup('Hello, world', exact=False)
+        self.assertEqual(
+            sorted([result[1] for result in results]),
+            [1, 2]
+        )
+        self.assertTrue(results[0][0] < 100)
+        self.assertEqual(self.memory.lookup('Hello', exact=False), [])
+
+    def test_fuzzy_case(self):
+        results = self.memory.lookup('Hello, world!', exact=False)
+        self.assertEqual([result[1] for result in results], [2])
+        self.assertTrue(results[0][0] < 100)
+
+    def test_fuzzy_postings(self):
+        # Common trigrams are skipped when rare ones were found
+        for pk in range(10, 100):
+            self.memory.add(
+                pk, 'Hello, number %d' % pk, 'Ahoj', 'Test/Test', 1
+            )
+        backup = memory.FUZZY_POSTINGS
+        memory.FUZZY_POSTINGS = 10
+        try:
+            results = self.memory.lookup('Try Weblate!', exact=False)
+        finally:
+            memory.FUZZY_POSTINGS = backup
+        self.assertEqual([result[1] for result in results], [3])
+
+    def test_remove(self):
+        self.memory.remove(1)
+        self.memory.remove(2)
+        self.assertEqual(self.memory.lookup('Hello, world!'), [])
+        self.assertEqual(self.memory.lookup('Hello, world', exact=False), [])
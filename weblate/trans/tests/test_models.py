@@ -29,8 +29,15 @@ from django.contrib.auth.models import Permission, User
 from django.core.exceptions import ValidationError
 import shutil
 import os
-from weblate.trans.models import Project, SubProject, Unit, WhiteboardMessage
+from weblate.trans.models import (
+    Project, SubProject, Unit, WhiteboardMessage, Translation,
+)
 from weblate.trans.models.source import Source
+from weblate.trans.models.search import pack_ids, unpack_ids
+from weblate.lang.models import Language
+from weblate.trans.models.unitdata import Check
+from weblate.trans.models.unit import COUNTED_TYPES
+from weblate.trans.checks import CHECKS
 from weblate import appsettings
 from weblate.trans.tests.test_util import get_test_file
 from weblate.trans.vcs import GitRepository
@@ -322,6 +329,31 @@ class SubProjectTest(RepoTestCase):
         self.verify_subproject(project, 3, 'cs', 4)
         self.assertTrue(os.path.exists(project.get_path()))
 
+    def test_create_parallel(self):
+        appsettings.IMPORT_WORKERS = 2
+        try:
+            project = self.create_subproject()
+        finally:
+            appsettings.IMPORT_WORKERS = 1
+        self.verify_subproject(project, 3, 'cs', 4)
+
+    def test_update_parallel(self):
+        project = self.create_subproject()
+        Unit.objects.filter(translation__subproject=project).update(
+            target='Changed', translated=True
+        )
+        appsettings.IMPORT_WORKERS = 2
+        try:
+            project.create_translations(force=True)
+        finally:
+            appsettings.IMPORT_WORKERS = 1
+        self.verify_subproject(project, 3, 'cs', 4)
+        self.assertFalse(
+            Unit.objects.filter(
+                translation__subproject=project, target='Changed'
+            ).exists()
+        )
+
     def test_create_dot(self):
         project = self._create_subproject(
             'auto',
@@ -646,6 +678,163 @@ class TranslationTest(RepoTestCase):
         translation = project.translation_set.get(language_code='cs')
         translation.full_clean()
 
+    def test_stats_rollup(self):
+        """
+        Stats rollups follow translation stats.
+        """
+        subproject = self.create_subproject()
+        translation = subproject.translation_set.get(language_code='cs')
+        project = Project.objects.get(pk=subproject.project_id)
+        self.assertEqual(project.get_total(), 4)
+        percent = project.get_translated_percent()
+        self.assertNotEqual(
+            project.get_translated_percent(translation.language), 100
+        )
+        # Change stats
+        translation.unit_set.update(translated=True)
+        translation.update_stats()
+        # Fresh objects to avoid per instance caching
+        project = Project.objects.get(pk=subproject.project_id)
+        subproject = SubProject.objects.get(pk=subproject.pk)
+        language = Language.objects.get(pk=translation.language_id)
+        self.assertEqual(language.get_translated_percent(), 100)
+        self.assertEqual(project.get_translated_percent(language), 100)
+        self.assertTrue(project.get_translated_percent() > percent)
+        self.assertEqual(
+            project.get_translated_percent(),
+            subproject.get_translated_percent()
+        )
+
+    def test_check_sync(self):
+        """
+        Forced rescan keeps existing units and removes stale ones.
+        """
+        project = self.create_subproject()
+        translation = project.translation_set.get(language_code='cs')
+        ids = set(translation.unit_set.values_list('id', flat=True))
+        Unit(
+            translation=translation,
+            checksum='stale',
+            contentsum='stale',
+            source='Stale string',
+            position=100,
+        ).save(backend=True)
+        translation.check_sync(force=True)
+        self.assertEqual(
+            ids,
+            set(translation.unit_set.values_list('id', flat=True))
+        )
+        self.assertEqual(translation.total, 4)
+        self.assertEqual(
+            Source.objects.filter(subproject=project).count(),
+            4
+        )
+
+    def test_check_sync_changed(self):
+        """
+        Forced rescan restores changed units from the file.
+        """
+        project = self.create_subproject()
+        translation = project.translation_set.get(language_code='cs')
+        expected = list(translation.unit_set.values_list(
+            'id', 'position', 'target', 'fuzzy', 'translated', 'num_words'
+        ))
+        translation.unit_set.update(
+            position=0, target='Changed', fuzzy=True, translated=True,
+            num_words=0
+        )
+        translation.check_sync(force=True)
+        self.assertEqual(
+            expected,
+            list(translation.unit_set.values_list(
+                'id', 'position', 'target', 'fuzzy', 'translated',
+                'num_words'
+            ))
+        )
+
+    def test_counts(self):
+        """
+        Cached counts match filtering of units.
+        """
+        project = self.create_subproject()
+        translation = project.translation_set.get(language_code='cs')
+        units = translation.unit_set.all()
+        for check, language in (('same', translation.language),
+                                ('ellipsis', None),
+                                ('end_stop', None)):
+            for unit in units[:2]:
+                Check.objects.get_or_create(
+                    project=project.project,
+                    language=language,
+                    contentsum=unit.contentsum,
+                    check=check,
+                )
+        translation.invalidate_cache()
+        counts = translation.get_counts()
+        for rqtype in list(CHECKS) + list(COUNTED_TYPES):
+            self.assertEqual(
+                counts.get(rqtype, 0),
+                translation.unit_set.filter_type(rqtype, translation).count(),
+                rqtype
+            )
+        self.assertEqual(counts['ellipsis'], 2)
+
+    def test_stats_delta(self):
+        """
+        Incremental statistics match full recalculation.
+        """
+        project = self.create_subproject()
+        translation = project.translation_set.get(language_code='cs')
+        unit = translation.unit_set.filter(translated=False)[0]
+        oldunit = Unit.objects.get(pk=unit.pk)
+        translated_words = translation.translated_words
+        unit.translated = True
+        unit.fuzzy = True
+        unit.save(backend=True, same_content=True, same_state=True)
+        translation.update_stats_delta(oldunit, unit)
+
+        expected = Translation.objects.get(pk=translation.pk)
+        self.assertEqual(expected.translated, translation.translated)
+        expected.update_stats()
+        for field in ('translated', 'translated_words', 'fuzzy',
+                      'fuzzy_words', 'failing_checks', 'have_suggestion'):
+            self.assertEqual(
+                getattr(expected, field),
+                getattr(translation, field)
+            )
+        self.assertEqual(
+            expected.translated_words,
+            translated_words + unit.num_words
+        )
+
+    def test_store_failure(self):
+        """
+        Failed save does not leave modified store in the cache.
+        """
+        project = self.create_subproject()
+        translation = project.translation_set.get(language_code='cs')
+        unit = translation.unit_set.get(source='Hello, world!\n')
+        target = unit.target
+        unit.target = 'Nazdar svete!\n'
+
+        def failing_save(*args, **kwargs):
+            raise IOError('Testing failure')
+
+        translation._save_store = failing_save
+        self.assertRaises(
+            IOError,
+            translation.update_unit,
+            unit,
+            None,
+            User.objects.create_user('testuser', 'noreply@weblate.org')
+        )
+
+        translation = Translation.objects.get(pk=translation.pk)
+        pounit, add = translation.store.find_unit(
+            unit.context, unit.get_source_plurals()[0]
+        )
+        self.assertEqual(pounit.get_target(), target)
+
 
 class WhiteboardMessageTest(TestCase):
     """Test(s) for WhiteboardMessage model."""
@@ -681,3 +870,25 @@ class SourceTest(RepoTestCase):
         source.save()
         unit2 = Unit.objects.get(pk=unit.pk)
         self.assertEquals(unit2.priority, 200)
+
+
+class SearchResultTest(TestCase):
+    """
+    Packing of search results testing.
+    """
+    def test_pack(self):
+        data = pack_ids([1, 2, 258])
+        self.assertEqual(
+            data,
+            'I\x01\x00\x00\x00\x02\x00\x00\x00\x02\x01\x00\x00'
+        )
+        self.assertEqual(unpack_ids(data), (1, 2, 258))
+
+    def test_pack_large(self):
+        ids = [1, 0x100000000]
+        data = pack_ids(ids)
+        self.assertEqual(len(data), 17)
+        self.assertEqual(list(unpack_ids(data)), ids)
+
+    def test_pack_empty(self):
+        self.assertEqual(unpack_ids(pack_ids([])), ())
@@ -20,7 +20,9 @@
 '''
 Tests for changes done in remote repository.
 '''
-from weblate.trans.models import SubProject
+from weblate.trans.models import SubProject, Change
+from weblate.trans.propagate import propagate
+from weblate.accounts.models import Profile
 from weblate.trans.tests.test_models import REPOWEB_URL
 from weblate.trans.tests.test_views import ViewTestCase
 from django.utils import timezone
@@ -119,6 +121,72 @@ class MultiRepoTest(ViewTestCase):
         )
         self.assertEqual(translation.translated, 1)
 
+    def test_propagate_changes(self):
+        '''
+        Tests that propagating updates file, unit and history.
+        '''
+        self.push_first()
+
+        translation = self.subproject2.translation_set.get(
+            language_code='cs'
+        )
+        unit = translation.unit_set.get(source='Hello, world!\n')
+        self.assertEqual(unit.target, 'Nazdar svete!\n')
+        self.assertTrue(unit.translated)
+        self.assertEqual(
+            Change.objects.filter(
+                translation=translation,
+                unit=unit,
+                action=Change.ACTION_CHANGE,
+            ).count(),
+            1
+        )
+        with open(translation.get_filename()) as handle:
+            self.assertIn('msgstr "Nazdar svete!\\n"', handle.read())
+
+    def test_propagate_without_request(self):
+        '''
+        Tests propagating as done in background, without request.
+        '''
+        unit = self.get_unit()
+        unit.target = 'Nazdar svete!\n'
+        unit.translated = True
+        unit.save(backend=True)
+        translated = Profile.objects.get(user=self.user).translated
+
+        self.assertEqual(propagate(unit, None, self.user), (1, 1))
+
+        translation = self.subproject2.translation_set.get(
+            language_code='cs'
+        )
+        unit = translation.unit_set.get(source='Hello, world!\n')
+        self.assertEqual(unit.target, 'Nazdar svete!\n')
+        self.assertEqual(
+            Change.objects.filter(unit=unit, user=self.user).count(),
+            1
+        )
+        self.assertEqual(
+            Profile.objects.get(user=self.user).translated,
+            translated + 1
+        )
+
+    def test_propagate_database_only(self):
+        '''
+        Tests propagating change which is not needed in the file.
+        '''
+        translation = self.subproject2.translation_set.get(
+            language_code='cs'
+        )
+        translation.unit_set.filter(source='Hello, world!\n').update(
+            target='Nazdar svete!\n'
+        )
+        unit = self.get_unit()
+
+        self.assertEqual(propagate(unit, None, self.user), (1, 1))
+
+        unit = translation.unit_set.get(source='Hello, world!\n')
+        self.assertEqual(unit.target, u'Ahoj světe!\n')
+
     def test_update(self):
         '''
         Tests handling update in case remote has changed.
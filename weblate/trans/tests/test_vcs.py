@@ -159,6 +159,23 @@ class VCSGitTest(RepoTestCase):
             40
         )
 
+    def test_head(self):
+        self.assertEquals(
+            self.repo.get_head(),
+            self.repo.execute(['rev-parse', 'HEAD']).strip()
+        )
+
+    def test_object_hash_commit(self):
+        self.repo.set_committer('Foo Bar', 'foo@example.net')
+        obj_hash = self.repo.get_object_hash('po/cs.po')
+        with open(os.path.join(self._tempdir, 'po', 'cs.po'), 'a') as handle:
+            handle.write('\n')
+        self.repo.commit('Test commit', files=['po/cs.po'])
+        self.assertNotEquals(
+            obj_hash,
+            self.repo.get_object_hash('po/cs.po')
+        )
+
     def test_configure_remote(self):
         self.repo.configure_remote('pullurl', 'pushurl', 'branch')
         self.assertEquals(
@@ -24,6 +24,7 @@ Tests for translation views.
 
 import re
 import time
+import json
 from urlparse import urlsplit
 from cStringIO import StringIO
 
@@ -724,6 +725,75 @@ class EditTSTest(EditTest):
         return self.create_ts()
 
 
+class EditWriteBehindTest(EditTest):
+    def setUp(self):
+        super(EditWriteBehindTest, self).setUp()
+        appsettings.WRITE_BEHIND = True
+        appsettings.WRITE_BEHIND_UNITS = 1
+
+    def tearDown(self):
+        super(EditWriteBehindTest, self).tearDown()
+        appsettings.WRITE_BEHIND = False
+        appsettings.WRITE_BEHIND_UNITS = 100
+
+    def test_pending(self):
+        appsettings.WRITE_BEHIND_UNITS = 100
+        self.edit_unit(
+            'Hello, world!\n',
+            'Nazdar svete!\n'
+        )
+        unit = self.get_unit()
+        self.assertTrue(unit.pending)
+        self.assertTrue(unit.translated)
+        self.assertEqual(self.translation.flush_pending(), 1)
+        unit = self.get_unit()
+        self.assertFalse(unit.pending)
+        self.assertBackend(1)
+        self.assertEqual(self.translation.flush_pending(), 0)
+
+    def test_pending_sync(self):
+        appsettings.WRITE_BEHIND_UNITS = 100
+        self.edit_unit(
+            'Hello, world!\n',
+            'Nazdar svete!\n'
+        )
+        # Forced sync must not overwrite change not yet in the file
+        self.translation.check_sync(force=True)
+        unit = self.get_unit()
+        self.assertTrue(unit.pending)
+        self.assertEqual(unit.target, 'Nazdar svete!\n')
+        self.assertEqual(self.translation.flush_pending(), 1)
+        self.assertBackend(1)
+
+    def test_pending_missing(self):
+        appsettings.WRITE_BEHIND_UNITS = 100
+        source = 'Thank you for using Weblate.'
+        self.edit_unit(source, u'Děkujeme, že používáte Weblate.')
+        self.translation.unit_set.filter(
+            pk=self.get_unit(source).pk
+        ).update(
+            context='missing'
+        )
+        # Unit not present in the file stays pending
+        self.assertEqual(self.translation.flush_pending(), 0)
+        self.assertTrue(self.get_unit(source).pending)
+        self.assertBackend(1)
+
+    def test_pending_limit(self):
+        appsettings.WRITE_BEHIND_UNITS = 2
+        self.edit_unit(
+            'Hello, world!\n',
+            'Nazdar svete!\n'
+        )
+        self.assertTrue(self.get_unit().pending)
+        self.edit_unit(
+            'Thank you for using Weblate.',
+            u'Děkujeme, že používáte Weblate.'
+        )
+        self.assertFalse(self.get_unit().pending)
+        self.assertBackend(2)
+
+
 class SuggestionsTest(ViewTestCase):
     def add_suggestion_1(self):
         return self.edit_unit(
@@ -1065,11 +1135,29 @@ class SearchViewTest(ViewTestCase):
             response,
             self.translation.get_absolute_url()
         )
-        # Try invalid SID (should be deleted above)
+        # Search results are kept for further navigation
         response = self.client.get(
             self.translate_url,
             {'sid': search_id, 'offset': 1}
         )
+        self.assertContains(
+            response,
+            'Thank you for using Weblate.',
+        )
+        # Identical search shares results
+        response = self.do_search(
+            {'q': 'weblate'},
+            'Fulltext search for'
+        )
+        self.assertEqual(
+            search_id,
+            re.findall(r'sid=([0-9a-f-]*)&amp', response.content)[0]
+        )
+        # Invalid SID
+        response = self.client.get(
+            self.translate_url,
+            {'sid': 'invalid', 'offset': 1}
+        )
         self.assertRedirects(
             response,
             self.translation.get_absolute_url()
@@ -1267,6 +1355,96 @@ class ZenViewTest(ViewTestCase):
             'You have reached end of translating.'
         )
 
+    def test_load_zen_json(self):
+        response = self.client.get(
+            reverse('load_zen_json', kwargs=self.kw_translation)
+        )
+        data = json.loads(response.content)
+        units = data['units']
+        while data['next']:
+            response = self.client.get(
+                reverse('load_zen_json', kwargs=self.kw_translation),
+                {'cursor': data['next']}
+            )
+            data = json.loads(response.content)
+            units.extend(data['units'])
+        self.assertEqual(len(units), data['total'])
+        self.assertIn(
+            'Orangutan has %d banana.\n',
+            [unit['source'][0] for unit in units]
+        )
+
+    def test_load_zen_json_invalid(self):
+        response = self.client.get(
+            reverse('load_zen_json', kwargs=self.kw_translation),
+            {'cursor': 'invalid'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_save_zen_batch(self):
+        unit = self.get_unit()
+        response = self.client.post(
+            reverse('save_zen_batch', kwargs=self.kw_translation),
+            {
+                'payload': json.dumps([
+                    {
+                        'checksum': unit.checksum,
+                        'target': ['Nazdar svete!\n'],
+                        'fuzzy': False,
+                    },
+                    {
+                        'checksum': 'invalid',
+                        'target': ['Foo'],
+                        'fuzzy': False,
+                    },
+                ])
+            }
+        )
+        data = json.loads(response.content)
+        self.assertTrue(data['units'][unit.checksum]['saved'])
+        self.assertFalse(data['units']['invalid']['saved'])
+        unit = self.get_unit()
+        self.assertEqual(unit.target, 'Nazdar svete!\n')
+        self.assertBackend(1)
+
+    def test_save_zen_batch_invalid(self):
+        response = self.client.post(
+            reverse('save_zen_batch', kwargs=self.kw_translation),
+            {'payload': 'invalid'}
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            reverse('save_zen_batch', kwargs=self.kw_translation),
+            {
+                'payload': json.dumps([{
+                    'checksum': self.get_unit().checksum,
+                    'target': 'Nazdar svete!\n',
+                    'fuzzy': False,
+                }])
+            }
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_save_zen_batch_plurals(self):
+        unit = self.get_unit('Orangutan')
+        response = self.client.post(
+            reverse('save_zen_batch', kwargs=self.kw_translation),
+            {
+                'payload': json.dumps([{
+                    'checksum': unit.checksum,
+                    'target': ['Opice má %d banán.\n'],
+                    'fuzzy': False,
+                }])
+            }
+        )
+        data = json.loads(response.content)
+        self.assertTrue(data['units'][unit.checksum]['saved'])
+        unit = self.get_unit('Orangutan')
+        self.assertEqual(
+            len(unit.get_target_plurals()),
+            unit.translation.language.nplurals
+        )
+
 
 class HomeViewTest(ViewTestCase):
     """Tests for home/inidex view."""
@@ -102,3 +102,36 @@ class WidgetsTest(ViewTestCase):
                     self.assertEquals(response.status_code, 302)
                 else:
                     self.assertPNG(response)
+
+    def test_view_widget_conditional(self):
+        url = reverse(
+            'widget-image',
+            kwargs={
+                'project': self.project.slug,
+                'widget': '287x66',
+                'color': 'white',
+                'extension': 'png',
+            }
+        )
+        response = self.client.get(url)
+        self.assertPNG(response)
+        etag = response['ETag']
+        last_modified = response['Last-Modified']
+
+        # Matching ETag
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEquals(response.status_code, 304)
+        self.assertEquals(response['ETag'], etag)
+
+        # Not modified since rendering
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEquals(response.status_code, 304)
+
+        # Changed stats change ETag
+        self.edit_unit(
+            'Thank you for using Weblate.',
+            u'Děkujeme, že používáte Weblate.',
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertPNG(response)
+        self.assertNotEquals(response['ETag'], etag)
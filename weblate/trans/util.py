@@ -121,6 +121,15 @@ def get_distinct_translations(units):
     return result
 
 
+def iterate_chunks(values, size=500):
+    '''
+    Splits values into chunks small enough to be used in IN database lookups.
+    '''
+    values = list(values)
+    for pos in xrange(0, len(values), size):
+        yield values[pos:pos + size]
+
+
 def translation_percent(translated, total):
     '''
     Returns translation percentage.
@@ -128,6 +137,19 @@ def translation_percent(translated, total):
     return (1000 * translated / total) / 10.0
 
 
+def increment_counter(key, timeout, delta=1):
+    '''
+    Increments counter stored in the cache, used for statistics shared
+    between processes.
+    '''
+    cache.add(key, 0, timeout)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # Counter expired in the meantime
+        cache.set(key, delta, timeout)
+
+
 def add_configuration_error(name, message):
     """
     Logs configuration error.
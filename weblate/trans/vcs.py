@@ -222,6 +222,8 @@ class GitRepository(Repository):
     ]
     _cmd_update_remote = ['remote', 'update', 'origin']
     _cmd_push = ['push', 'origin']
+    # Object hashes in HEAD for each repository path
+    _tree_cache = {}
 
     def is_valid(self):
         return (
@@ -408,8 +410,65 @@ class GitRepository(Repository):
             raise ValueError('Too many symlinks or link outside tree')
 
         real_path = real_path[len(repository_path):].lstrip('/')
+        if isinstance(real_path, unicode):
+            real_path = real_path.encode('utf-8')
+
+        try:
+            return self.get_tree_hashes()[real_path]
+        except KeyError:
+            # Not a file tracked in HEAD (eg. directory)
+            return self.execute(['ls-tree', 'HEAD', real_path]).split()[2]
+
+    def get_head(self):
+        """
+        Returns revision of HEAD, reading it from the repository without
+        invoking git when possible.
+        """
+        git_dir = os.path.join(self.path, '.git')
+        if not os.path.isdir(git_dir):
+            git_dir = self.path
+        try:
+            with open(os.path.join(git_dir, 'HEAD')) as handle:
+                head = handle.read().strip()
+            if not head.startswith('ref: '):
+                return head
+            ref = head[5:]
+            ref_file = os.path.join(git_dir, ref)
+            if os.path.exists(ref_file):
+                with open(ref_file) as handle:
+                    return handle.read().strip()
+            with open(os.path.join(git_dir, 'packed-refs')) as handle:
+                for line in handle:
+                    parts = line.split()
+                    if len(parts) == 2 and parts[1] == ref:
+                        return parts[0]
+        except IOError:
+            pass
+        return self.execute(['rev-parse', 'HEAD']).strip()
+
+    def get_tree_hashes(self):
+        """
+        Returns dictionary of object hashes for all files in HEAD.
+
+        The tree is listed once for each HEAD revision and shared by
+        all objects using the same repository.
+        """
+        key = os.path.realpath(self.path)
+        head = self.get_head()
+        cached = self._tree_cache.get(key)
+        if cached is not None and cached[0] == head:
+            return cached[1]
+
+        hashes = {}
+        output = self.execute(['ls-tree', '-r', '-z', head])
+        for item in output.split('\0'):
+            if not item:
+                continue
+            info, name = item.split('\t', 1)
+            hashes[name] = info.split()[2]
 
-        return self.execute(['ls-tree', 'HEAD', real_path]).split()[2]
+        self._tree_cache[key] = (head, hashes)
+        return hashes
 
     def configure_remote(self, pull_url, push_url, branch):
         """
@@ -24,7 +24,7 @@ from django.http import (
     HttpResponse, HttpResponseNotAllowed, HttpResponseBadRequest
 )
 
-from weblate.trans.models import SubProject
+from weblate.trans.models import SubProject, RepositoryUpdate, Change
 from weblate.trans.views.helper import get_project, get_subproject
 from weblate.trans.util import get_site_url
 
@@ -67,7 +67,13 @@ def perform_update(obj):
     '''
     Triggers update of given object.
     '''
-    if appsettings.BACKGROUND_HOOKS:
+    if appsettings.OFFLOAD_UPDATES:
+        if isinstance(obj, SubProject):
+            RepositoryUpdate.objects.enqueue(obj)
+        else:
+            for subproject in obj.subproject_set.all():
+                RepositoryUpdate.objects.enqueue(subproject)
+    elif appsettings.BACKGROUND_HOOKS:
         thread = threading.Thread(target=obj.do_update)
         thread.start()
     else:
@@ -263,15 +269,29 @@ def export_stats(request, project, subproject):
     except (ValueError, KeyError):
         indent = None
 
+    translations = subprj.translation_set.select_related(
+        'language', 'subproject__project'
+    )
+    last_changes = Change.objects.last_translation_changes(
+        translations
+    )
+
     response = []
-    for trans in subprj.translation_set.all():
+    for trans in translations:
+        change = last_changes.get(trans.id)
+        if change is None:
+            last_change = None
+            last_author = None
+        else:
+            last_change = change.timestamp
+            last_author = trans.get_author_name(change.author, False)
         response.append({
             'code': trans.language.code,
             'name': trans.language.name,
             'total': trans.total,
             'total_words': trans.total_words,
-            'last_change': trans.last_change,
-            'last_author': trans.get_last_author(),
+            'last_change': last_change,
+            'last_author': last_author,
             'translated': trans.translated,
             'translated_words': trans.translated_words,
             'translated_percent': trans.get_translated_percent(),
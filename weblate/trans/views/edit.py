@@ -20,17 +20,21 @@
 
 from django.shortcuts import render, get_object_or_404, redirect
 from django.utils.translation import ugettext as _
-from django.http import HttpResponseRedirect, HttpResponse
+from django.http import (
+    HttpResponseRedirect, HttpResponse, HttpResponseBadRequest,
+    HttpResponseForbidden,
+)
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, permission_required
+from django.core import signing
 from django.utils import formats
-import uuid
-import time
+from django.views.decorators.http import require_POST
 
 from weblate.trans.models import (
-    SubProject, Unit, Change, Comment, Suggestion, Dictionary
+    SubProject, Unit, Change, Comment, Suggestion, Dictionary, SearchResult
 )
 from weblate.trans.autofixes import fix_target
+from weblate.trans.autotranslate import auto_translate
 from weblate.trans.forms import (
     TranslationForm, SearchForm,
     MergeForm, AutoForm, ReviewForm,
@@ -38,7 +42,16 @@ from weblate.trans.forms import (
 )
 from weblate.trans.views.helper import get_translation
 from weblate.trans.checks import CHECKS
-from weblate.trans.util import join_plural
+from weblate.trans.filelock import FileLockException
+from weblate.trans.util import join_plural, split_plural, is_plural
+
+import json
+
+# Number of units loaded at once in zen mode
+ZEN_BATCH = 20
+
+# Salt for signing zen mode cursors
+ZEN_CURSOR_SALT = 'weblate.zen'
 
 
 def get_filter_name(rqtype):
@@ -69,18 +82,6 @@ def get_search_name(search_type, search_query):
         return _('Substring search for "%s"') % search_query
 
 
-def cleanup_session(session):
-    '''
-    Deletes old search results from session storage.
-    '''
-    now = int(time.time())
-    for key in session.keys():
-        value = session[key]
-        if (key.startswith('search_')
-                and (not isinstance(value, dict) or value['ttl'] < now)):
-            del session[key]
-
-
 def show_form_errors(request, form):
     '''
     Shows all form errors as a message.
@@ -98,22 +99,42 @@ def show_form_errors(request, form):
             )
 
 
+def get_search_key(request):
+    '''
+    Returns key identifying search parameters.
+    '''
+    params = sorted([
+        (key, request.GET.getlist(key))
+        for key in request.GET
+        if key not in ('sid', 'offset', 'checksum')
+    ])
+    # Review results depend on user
+    if 'date' in request.GET:
+        params.append(('user', request.user.pk))
+    return params
+
+
 def search(translation, request):
     '''
-    Performs search or returns cached search results.
+    Performs search or returns stored search results.
+
+    The results are stored in the database and shared with other
+    identical searches.
     '''
 
     # Already performed search
     if 'sid' in request.GET:
-        # Grab from session storage
-        search_id = 'search_%s' % request.GET['sid']
+        search_result = SearchResult.objects.lookup(
+            translation, request.GET['sid']
+        )
 
         # Check if we know the search
-        if search_id not in request.session:
+        if search_result is None:
             messages.error(request, _('Invalid search string!'))
             return redirect(translation)
 
-        return request.session[search_id]
+        search_result.offset = 0
+        return search_result
 
     # Possible new search
     rqtype = request.GET.get('type', 'all')
@@ -161,43 +182,41 @@ def search(translation, request):
 
         name = get_filter_name(rqtype)
 
-    # Grab unit IDs
-    unit_ids = list(allunits.values_list('id', flat=True))
+    # Reuse results of identical search
+    search_id = SearchResult.objects.get_search_id(
+        translation, get_search_key(request)
+    )
+    search_result = SearchResult.objects.lookup(translation, search_id)
 
-    # Check empty search results
-    if len(unit_ids) == 0:
-        messages.warning(request, _('No string matched your search!'))
-        return redirect(translation)
+    if search_result is None:
+        # Grab unit IDs
+        unit_ids = list(allunits.values_list('id', flat=True))
+
+        # Check empty search results
+        if len(unit_ids) == 0:
+            messages.warning(request, _('No string matched your search!'))
+            return redirect(translation)
+
+        if name is not None:
+            name = unicode(name)
+
+        # Store results
+        search_result = SearchResult.objects.store(
+            translation, search_id, name, search_query, unit_ids
+        )
 
     # Checksum unit access
-    offset = 0
+    search_result.offset = 0
     if 'checksum' in request.GET:
         try:
             unit = allunits.filter(checksum=request.GET['checksum'])[0]
-            offset = unit_ids.index(unit.id)
-        except (Unit.DoesNotExist, IndexError):
+            search_result.offset = list(
+                search_result.get_ids()
+            ).index(unit.id)
+        except (Unit.DoesNotExist, IndexError, ValueError):
             messages.warning(request, _('No string matched your search!'))
             return redirect(translation)
 
-    # Remove old search results
-    cleanup_session(request.session)
-
-    if name is not None:
-        name = unicode(name)
-
-    # Store in cache and return
-    search_id = str(uuid.uuid1())
-    search_result = {
-        'query': search_query,
-        'name': name,
-        'ids': unit_ids,
-        'search_id': search_id,
-        'ttl': int(time.time()) + 86400,
-        'offset': offset,
-    }
-
-    request.session['search_%s' % search_id] = search_result
-
     return search_result
 
 
@@ -510,26 +529,24 @@ def translate(request, project, subproject, lang):
         return search_result
 
     # Get numer of results
-    num_results = len(search_result['ids'])
+    num_results = len(search_result)
 
     # Search offset
     try:
-        offset = int(request.GET.get('offset', search_result.get('offset', 0)))
+        offset = int(request.GET.get('offset', search_result.offset))
     except ValueError:
         offset = 0
 
     # Check boundaries
     if offset < 0 or offset >= num_results:
         messages.info(request, _('You have reached end of translating.'))
-        # Delete search
-        del request.session['search_%s' % search_result['search_id']]
         # Redirect to translation
         return redirect(translation)
 
     # Some URLs we will most likely use
     base_unit_url = '%s?sid=%s&offset=' % (
         translation.get_translate_url(),
-        search_result['search_id'],
+        search_result.search_id,
     )
     this_unit_url = base_unit_url + str(offset)
     next_unit_url = base_unit_url + str(offset + 1)
@@ -571,7 +588,9 @@ def translate(request, project, subproject, lang):
 
     # Grab actual unit
     try:
-        unit = translation.unit_set.get(pk=search_result['ids'][offset])
+        unit = translation.unit_set.get(
+            pk=search_result.get_unit_id(offset)
+        )
     except Unit.DoesNotExist:
         # Can happen when using SID for other translation
         messages.error(request, _('Invalid search string!'))
@@ -602,10 +621,10 @@ def translate(request, project, subproject, lang):
             'unit': unit,
             'others': Unit.objects.same(unit).exclude(target=unit.target),
             'total': translation.unit_set.all().count(),
-            'search_id': search_result['search_id'],
-            'search_query': search_result['query'],
+            'search_id': search_result.search_id,
+            'search_query': search_result.query,
             'offset': offset,
-            'filter_name': search_result['name'],
+            'filter_name': search_result.name,
             'filter_count': num_results,
             'filter_pos': offset + 1,
             'form': form,
@@ -626,57 +645,24 @@ def translate(request, project, subproject, lang):
 @permission_required('trans.automatic_translation')
 def auto_translation(request, project, subproject, lang):
     translation = get_translation(request, project, subproject, lang)
-    translation.commit_pending(request)
     autoform = AutoForm(translation, request.POST)
-    change = None
     if not translation.subproject.locked and autoform.is_valid():
-        if autoform.cleaned_data['inconsistent']:
-            units = translation.unit_set.filter_type(
-                'inconsistent', translation
-            )
-        elif autoform.cleaned_data['overwrite']:
-            units = translation.unit_set.all()
-        else:
-            units = translation.unit_set.filter(translated=False)
-
-        sources = Unit.objects.filter(
-            translation__language=translation.language,
-            translated=True
-        )
         if autoform.cleaned_data['subproject'] == '':
-            sources = sources.filter(
-                translation__subproject__project=translation.subproject.project
-            ).exclude(
-                translation=translation
-            )
+            subprj = None
         else:
             subprj = SubProject.objects.get(
                 project=translation.subproject.project,
                 slug=autoform.cleaned_data['subproject']
             )
-            sources = sources.filter(translation__subproject=subprj)
-
-        for unit in units.iterator():
-            update = sources.filter(checksum=unit.checksum)
-            if update.exists():
-                # Get first entry
-                update = update[0]
-                # No save if translation is same
-                if unit.fuzzy == update.fuzzy and unit.target == update.target:
-                    continue
-                # Copy translation
-                unit.fuzzy = update.fuzzy
-                unit.target = update.target
-                # Create signle change object for whole merge
-                if change is None:
-                    change = Change.objects.create(
-                        action=Change.ACTION_AUTO,
-                        translation=unit.translation,
-                        user=request.user,
-                        author=request.user
-                    )
-                # Save unit to backend
-                unit.save_backend(request, False, False)
+
+        auto_translate(
+            translation,
+            request.user,
+            request,
+            subprj,
+            autoform.cleaned_data['inconsistent'],
+            autoform.cleaned_data['overwrite'],
+        )
 
         messages.success(request, _('Automatic translation completed.'))
     else:
@@ -730,10 +716,10 @@ def get_zen_unitdata(translation, request):
     if isinstance(search_result, HttpResponse):
         return search_result, None
 
-    search_result['last_section'] = offset + 20 >= len(search_result['ids'])
+    search_result.last_section = offset + ZEN_BATCH >= len(search_result)
 
     units = translation.unit_set.filter(
-        pk__in=search_result['ids'][offset:offset + 20]
+        pk__in=search_result.get_unit_ids(offset, ZEN_BATCH)
     )
 
     unitdata = [
@@ -765,11 +751,12 @@ def zen(request, project, subproject, lang):
         {
             'object': translation,
             'unitdata': unitdata,
-            'search_query': search_result['query'],
-            'filter_name': search_result['name'],
-            'filter_count': len(search_result['ids']),
-            'last_section': search_result['last_section'],
-            'search_id': search_result['search_id'],
+            'search_query': search_result.query,
+            'filter_name': search_result.name,
+            'filter_count': len(search_result),
+            'last_section': search_result.last_section,
+            'search_id': search_result.search_id,
+            'zen_cursor': get_zen_cursor(search_result, ZEN_BATCH),
         }
     )
 
@@ -791,8 +778,8 @@ def load_zen(request, project, subproject, lang):
         {
             'object': translation,
             'unitdata': unitdata,
-            'search_query': search_result['query'],
-            'last_section': search_result['last_section'],
+            'search_query': search_result.query,
+            'last_section': search_result.last_section,
         }
     )
 
@@ -814,3 +801,188 @@ def save_zen(request, project, subproject, lang):
         request,
         'zen-response.html',
     )
+
+
+def get_zen_cursor(search_result, offset):
+    '''
+    Returns token for loading units from offset or None at the end.
+    '''
+    if offset >= len(search_result):
+        return None
+    return signing.dumps(
+        [search_result.search_id, offset],
+        salt=ZEN_CURSOR_SALT
+    )
+
+
+def get_zen_units(translation, ids):
+    '''
+    Returns compact representation of units for zen editor.
+    '''
+    nplurals = translation.language.nplurals
+    base_url = translation.get_translate_url()
+    units = translation.unit_set.filter(pk__in=ids).values_list(
+        'checksum', 'position', 'context', 'source', 'target', 'fuzzy',
+    )
+    result = []
+    for checksum, position, context, source, target, fuzzy in units:
+        if is_plural(source):
+            target = split_plural(target)
+            target = (target + [''] * nplurals)[:nplurals]
+        else:
+            target = [target]
+        result.append({
+            'checksum': checksum,
+            'position': position,
+            'context': context,
+            'source': split_plural(source),
+            'target': target,
+            'fuzzy': fuzzy,
+            'url': '%s?checksum=%s' % (base_url, checksum),
+        })
+    return result
+
+
+def load_zen_json(request, project, subproject, lang):
+    '''
+    Loads batch of units for zen editor as JSON.
+
+    Batches are addressed by cursor tokens, so the search is not
+    performed again while scrolling.
+    '''
+    translation = get_translation(request, project, subproject, lang)
+
+    if 'cursor' in request.GET:
+        try:
+            search_id, offset = signing.loads(
+                request.GET['cursor'], salt=ZEN_CURSOR_SALT
+            )
+        except (signing.BadSignature, ValueError, TypeError):
+            return HttpResponseBadRequest('Invalid cursor!')
+        search_result = SearchResult.objects.lookup(translation, search_id)
+        if search_result is None:
+            return HttpResponseBadRequest('Expired cursor!')
+    else:
+        search_result = search(translation, request)
+        # Handle redirects
+        if isinstance(search_result, HttpResponse):
+            return search_result
+        offset = 0
+
+    response = {
+        'units': get_zen_units(
+            translation,
+            search_result.get_unit_ids(offset, ZEN_BATCH)
+        ),
+        'next': get_zen_cursor(search_result, offset + ZEN_BATCH),
+        'total': len(search_result),
+        'lang': translation.language.code,
+        'dir': translation.language.direction,
+    }
+
+    return HttpResponse(
+        json.dumps(response),
+        content_type='application/json'
+    )
+
+
+@require_POST
+@login_required
+def save_zen_batch(request, project, subproject, lang):
+    '''
+    Saves several translations from zen editor at once.
+
+    The payload is JSON list of dictionaries with checksum, target and
+    fuzzy keys, the translation file is written only once.
+    '''
+    translation = get_translation(request, project, subproject, lang)
+
+    try:
+        edits = json.loads(request.POST['payload'])
+        targets = {}
+        for edit in edits:
+            if not isinstance(edit['target'], list):
+                raise ValueError('Target has to be a list')
+            targets[edit['checksum']] = (
+                [unicode(x) for x in edit['target']],
+                bool(edit['fuzzy'])
+            )
+    except (KeyError, ValueError, TypeError):
+        return HttpResponseBadRequest('Invalid payload!')
+
+    if not request.user.has_perm('trans.save_translation'):
+        return HttpResponseForbidden(
+            _('You don\'t have privileges to save translations!')
+        )
+
+    results = {}
+    changed = []
+    units = translation.unit_set.filter(checksum__in=targets.keys())
+    for unit in units:
+        if unit.only_vote_suggestions():
+            results[unit.checksum] = {
+                'saved': False,
+                'messages': [
+                    _('Only suggestions are allowed in this translation!')
+                ],
+            }
+            continue
+        target, fuzzy = targets[unit.checksum]
+        # Use same number of plurals as the editor does
+        if unit.is_plural():
+            nplurals = translation.language.nplurals
+            target = (target + [''] * nplurals)[:nplurals]
+        else:
+            target = target[:1]
+        # Run AutoFixes on user input
+        new_target, fixups = fix_target(target, unit)
+        unit.target = join_plural(new_target)
+        unit.fuzzy = fuzzy
+        oldchecks = set(unit.active_checks().values_list('check', flat=True))
+        changed.append((unit, fixups, oldchecks))
+
+    try:
+        saved = translation.save_backend_units(
+            [unit for unit, fixups, oldchecks in changed],
+            request
+        )
+    except FileLockException:
+        return HttpResponseBadRequest(
+            _('Failed to store message in the backend, '
+              'lock timeout occurred!')
+        )
+
+    for unit, fixups, oldchecks in changed:
+        unit_messages = []
+        if fixups:
+            unit_messages.append(
+                _('Following fixups were applied to translation: %s') %
+                ', '.join([unicode(f) for f in fixups])
+            )
+        newchecks = set(unit.active_checks().values_list('check', flat=True))
+        if unit in saved and newchecks > oldchecks:
+            unit_messages.append(
+                _(
+                    'Some checks have failed on your translation: {0}'
+                ).format(
+                    ', '.join(
+                        [unicode(CHECKS[check].name) for check in newchecks]
+                    )
+                )
+            )
+        results[unit.checksum] = {
+            'saved': unit in saved,
+            'messages': unit_messages,
+        }
+
+    for checksum in targets:
+        if checksum not in results:
+            results[checksum] = {
+                'saved': False,
+                'messages': [_('Message not found!')],
+            }
+
+    return HttpResponse(
+        json.dumps({'units': results}),
+        content_type='application/json'
+    )
@@ -32,6 +32,9 @@ from weblate.trans.views.helper import get_translation
 def download_translation(request, project, subproject, lang):
     obj = get_translation(request, project, subproject, lang)
 
+    # Write changes which are not yet in the file
+    obj.flush_pending(request)
+
     srcfilename = obj.get_filename()
 
     # Construct file name (do not use real filename as it is usually not
@@ -56,6 +59,9 @@ def download_language_pack(request, project, subproject, lang):
     if not obj.supports_language_pack():
         raise Http404('Language pack download not supported')
 
+    # Write changes which are not yet in the file
+    obj.flush_pending(request)
+
     filename, mime = obj.store.get_language_pack_meta()
 
     # Create response
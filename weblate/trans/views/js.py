@@ -19,12 +19,15 @@
 #
 
 from django.shortcuts import render, get_object_or_404
-from django.http import HttpResponse, HttpResponseBadRequest
+from django.http import (
+    HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
+)
 from django.contrib.auth.decorators import permission_required
 from django.core.urlresolvers import reverse
 
 from weblate.trans.models import Unit, Check
 from weblate.trans.machine import MACHINE_TRANSLATION_SERVICES
+from weblate.trans.machine.base import iterate_services
 from weblate.trans.decorators import any_permission_required
 from weblate.trans.views.helper import (
     get_project, get_subproject, get_translation
@@ -92,6 +95,51 @@ def translate(request, unit_id):
     )
 
 
+@permission_required('trans.use_mt')
+def translate_all(request, unit_id):
+    '''
+    AJAX handler for translating using all enabled services at once.
+
+    Results are streamed as single JSON object per line as the services
+    reply, so that fast services do not have to wait for slow ones.
+    '''
+    unit = get_object_or_404(Unit, pk=int(unit_id))
+    unit.check_acl(request)
+
+    results = iterate_services(
+        [
+            MACHINE_TRANSLATION_SERVICES[name]
+            for name in sorted(MACHINE_TRANSLATION_SERVICES)
+        ],
+        unit.translation.language.code,
+        unit.get_source_plurals()[0],
+        unit,
+        request.user
+    )
+
+    def stream():
+        '''
+        Formats single line for every service.
+        '''
+        for service, translations, error in results:
+            yield json.dumps({
+                'responseStatus': 500 if error else 200,
+                'service': service.name,
+                'responseDetails': error or '',
+                'translations': translations,
+                'lang': unit.translation.language.code,
+                'dir': unit.translation.language.direction,
+            }) + '\n'
+
+    response = StreamingHttpResponse(
+        stream(),
+        content_type='application/x-json-stream'
+    )
+    # Disable buffering in nginx
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 def get_unit_changes(request, unit_id):
     '''
     Returns unit's recent changes.
@@ -18,10 +18,10 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
-from django.http import HttpResponse, Http404
+from django.http import HttpResponse, HttpResponseNotModified, Http404
 from django.shortcuts import render, redirect
 from django.core.urlresolvers import reverse
-from django.views.decorators.cache import cache_page
+from django.utils.http import http_date, parse_http_date_safe
 
 from weblate.trans.util import get_site_url
 from weblate.lang.models import Language
@@ -115,7 +115,6 @@ def widgets(request, project):
     )
 
 
-@cache_page(3600)
 def render_widget(request, project, widget='287x66', color=None, lang=None,
                   extension='png'):
     obj = get_project(request, project)
@@ -137,13 +136,27 @@ def render_widget(request, project, widget='287x66', color=None, lang=None,
     if hasattr(widget, 'redirect'):
         return redirect(widget.redirect())
 
-    # Render widget
-    widget.render()
+    # Conditional GET based on ETag, no need to render anything
+    etag = '"{0}"'.format(widget.get_cache_key())
+    if etag in request.META.get('HTTP_IF_NONE_MATCH', ''):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
 
-    # Get image data
-    data = widget.get_image()
+    # Get image data, rendering widget only if not cached
+    last_modified, data = widget.get_cached_image()
 
-    return HttpResponse(
-        content_type=widget.content_type,
-        content=data
+    # Conditional GET based on time of rendering
+    modified_since = parse_http_date_safe(
+        request.META.get('HTTP_IF_MODIFIED_SINCE', '')
     )
+    if modified_since is not None and modified_since >= last_modified:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(
+            content_type=widget.content_type,
+            content=data
+        )
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
@@ -19,13 +19,20 @@
 #
 
 from django.conf import settings
-from django.utils.translation import ugettext as _
+from django.core.cache import cache
+from django.utils.translation import ugettext as _, get_language
 from PIL import Image, ImageDraw
 from weblate.trans.fonts import is_base, get_font
 from weblate.appsettings import ENABLE_HTTPS
 from cStringIO import StringIO
 import os.path
 import urllib
+import hashlib
+import time
+
+# How long are rendered widgets kept in the cache, the key includes
+# translation stats, so stale images simply expire
+WIDGET_CACHE_TIMEOUT = 7 * 24 * 3600
 
 
 COLOR_DATA = {
@@ -133,6 +140,45 @@ class Widget(object):
             }
         )
 
+    def get_cache_key(self):
+        '''
+        Returns key identifying rendered image, it is also used as ETag.
+
+        The key includes all values which affect rendering, so it changes
+        whenever translation stats change.
+        '''
+        if self.lang is None:
+            lang = ''
+        else:
+            lang = self.lang.code
+        md5 = hashlib.md5()
+        md5.update(
+            u'|'.join((
+                self.name,
+                self.color,
+                lang,
+                get_language() or '',
+                self.obj.name,
+                unicode(self.total),
+                unicode(self.languages),
+                u'{0:.1f}'.format(self.percent),
+            )).encode('utf-8')
+        )
+        return md5.hexdigest()
+
+    def get_cached_image(self):
+        '''
+        Returns tuple of render timestamp and image data, rendering
+        the widget only if it is not in the cache.
+        '''
+        key = 'widget-{0}'.format(self.get_cache_key())
+        result = cache.get(key)
+        if result is None:
+            self.render()
+            result = (int(time.time()), self.get_image())
+            cache.set(key, result, WIDGET_CACHE_TIMEOUT)
+        return result
+
     def render(self):
         '''
         Renders widget.
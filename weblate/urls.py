@@ -581,6 +581,11 @@ urlpatterns = patterns(
         'weblate.trans.views.js.translate',
         name='js-translate',
     ),
+    url(
+        r'^js/translate-all/(?P<unit_id>[0-9]+)/$',
+        'weblate.trans.views.js.translate_all',
+        name='js-translate-all',
+    ),
     url(
         r'^js/changes/(?P<unit_id>[0-9]+)/$',
         'weblate.trans.views.js.get_unit_changes',
@@ -616,6 +621,16 @@ urlpatterns = patterns(
         'weblate.trans.views.edit.save_zen',
         name='save_zen',
     ),
+    url(
+        r'^js/zen-units/' + TRANSLATION + '$',
+        'weblate.trans.views.edit.load_zen_json',
+        name='load_zen_json',
+    ),
+    url(
+        r'^js/save-zen-batch/' + TRANSLATION + '$',
+        'weblate.trans.views.edit.save_zen_batch',
+        name='save_zen_batch',
+    ),
 
     # Admin interface
     url(r'^admin/doc/', include('django.contrib.admindocs.urls')),